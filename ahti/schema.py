@@ -5,6 +5,7 @@ from graphene_django.debug import DjangoDebug
 
 import categories.schema
 import features.schema
+from utils.graphene import CachedDocumentBackend
 
 _query_debug = {"debug": graphene.Field(DjangoDebug, name="_debug")}
 _query_default = {
@@ -26,3 +27,6 @@ Query = type(
 
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
+
+# Parsed query documents are cached and shared by the requests of a worker
+backend = CachedDocumentBackend()
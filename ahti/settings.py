@@ -1,10 +1,7 @@
 import os
-import subprocess
 
 import environ
-import sentry_sdk
 from django.utils.translation import gettext_lazy as _
-from sentry_sdk.integrations.django import DjangoIntegration
 
 checkout_dir = environ.Path(__file__) - 2
 assert os.path.exists(checkout_dir("manage.py"))
@@ -31,6 +28,7 @@ env = environ.Env(
     MAIL_MAILGUN_KEY=(str, ""),
     MAIL_MAILGUN_DOMAIN=(str, ""),
     MAIL_MAILGUN_API=(str, ""),
+    APP_VERSION=(str, ""),
     SENTRY_DSN=(str, ""),
     SENTRY_ENVIRONMENT=(str, ""),
     CORS_ORIGIN_WHITELIST=(list, []),
@@ -39,6 +37,14 @@ env = environ.Env(
     TOKEN_AUTH_ACCEPTED_SCOPE_PREFIX=(str, "ahti"),
     TOKEN_AUTH_REQUIRE_SCOPE_PREFIX=(bool, True),
     TOKEN_AUTH_AUTHSERVER_URL=(str, ""),
+    GRAPHQL_SLOW_OPERATION_THRESHOLD=(float, 1.0),
+    WARM_UP_ON_START=(bool, True),
+    IMPORTER_HTTP_CACHE_DIR=(str, ""),
+    IMPORTER_HTTP_CACHE_REPLAY=(bool, False),
+    IMPORTER_HTTP_RETRIES=(int, 3),
+    IMPORTER_HTTP_BACKOFF=(float, 1.0),
+    IMPORTER_STALE_ACTION=(str, "hide"),
+    IMPORTER_STALE_MAX_RATIO=(float, 0.2),
 )
 if os.path.exists(env_file):
     env.read_env(env_file)
@@ -59,17 +65,24 @@ DATABASES["default"]["ENGINE"] = "django.contrib.gis.db.backends.postgis"
 
 CACHES = {"default": env.cache()}
 
-try:
-    version = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"]).strip()
-except Exception:
-    version = "n/a"
-
-sentry_sdk.init(
-    dsn=env.str("SENTRY_DSN"),
-    release=version,
-    environment=env("SENTRY_ENVIRONMENT"),
-    integrations=[DjangoIntegration()],
-)
+# The version is given at build time, either in the environment or in a file
+version = env.str("APP_VERSION")
+if not version and os.path.exists(checkout_dir("VERSION")):
+    with open(checkout_dir("VERSION")) as fp:
+        version = fp.read().strip()
+version = version or "n/a"
+
+# Sentry is imported only when it is configured
+if env.str("SENTRY_DSN"):
+    import sentry_sdk
+    from sentry_sdk.integrations.django import DjangoIntegration
+
+    sentry_sdk.init(
+        dsn=env.str("SENTRY_DSN"),
+        release=version,
+        environment=env("SENTRY_ENVIRONMENT"),
+        integrations=[DjangoIntegration()],
+    )
 
 MEDIA_ROOT = env("MEDIA_ROOT")
 STATIC_ROOT = env("STATIC_ROOT")
@@ -161,11 +174,31 @@ PARLER_SUPPORTED_LANGUAGE_CODES = [lang["code"] for lang in PARLER_LANGUAGES[Non
 
 GRAPHENE = {
     "SCHEMA": "ahti.schema.schema",
-    "MIDDLEWARE": ["graphql_jwt.middleware.JSONWebTokenMiddleware"],
+    "MIDDLEWARE": [
+        "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "utils.instrumentation.ResolverTimingMiddleware",
+    ],
 }
 if DEBUG:
     GRAPHENE["MIDDLEWARE"].append("graphene_django.debug.DjangoDebugMiddleware")
 
+# GraphQL operations taking longer than this (in seconds) are logged
+GRAPHQL_SLOW_OPERATION_THRESHOLD = env.float("GRAPHQL_SLOW_OPERATION_THRESHOLD")
+# Warm up workers on start and report them not ready until done
+WARM_UP_ON_START = env.bool("WARM_UP_ON_START")
+
+# Directory for caching the responses of the APIs features are imported from
+IMPORTER_HTTP_CACHE_DIR = env.str("IMPORTER_HTTP_CACHE_DIR")
+# Use the cached responses without requesting the APIs (for debugging)
+IMPORTER_HTTP_CACHE_REPLAY = env.bool("IMPORTER_HTTP_CACHE_REPLAY")
+# Retries of failed API requests and the initial delay (in seconds) between them
+IMPORTER_HTTP_RETRIES = env.int("IMPORTER_HTTP_RETRIES")
+IMPORTER_HTTP_BACKOFF = env.float("IMPORTER_HTTP_BACKOFF")
+# What to do with imported features missing from the source: "hide", "delete" or
+# "keep", and the maximum share of the features of a source that can be removed
+IMPORTER_STALE_ACTION = env.str("IMPORTER_STALE_ACTION")
+IMPORTER_STALE_MAX_RATIO = env.float("IMPORTER_STALE_MAX_RATIO")
+
 
 GRAPHQL_JWT = {"JWT_AUTH_HEADER_PREFIX": "Bearer"}
 
@@ -173,7 +206,11 @@ LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {"console": {"class": "logging.StreamHandler"}},
-    "loggers": {"django": {"handlers": ["console"], "level": "ERROR"}},
+    "loggers": {
+        "django": {"handlers": ["console"], "level": "ERROR"},
+        "utils.instrumentation": {"handlers": ["console"], "level": "WARNING"},
+        "ahti.warmup": {"handlers": ["console"], "level": "INFO"},
+    },
 }
 
 # local_settings.py can be used to override environment-specific settings
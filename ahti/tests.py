@@ -1,8 +1,179 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+from graphql import validate
+
+from ahti.schema import backend, schema
+from ahti.warmup import get_known_operations, warm_up
+from utils.graphene import CachedDocumentBackend
+from utils.instrumentation import get_operation_name, operation_stats
+from utils.management.commands.startup_timings import parse_import_times
+
+
 def test_healthz(client):
     response = client.get("/healthz")
     assert response.status_code == 200
 
 
-def test_readiness(client):
+@pytest.fixture
+def clean_warm_up():
+    warm_up.reset()
+    yield
+    warm_up.reset()
+
+
+@pytest.mark.django_db
+def test_readiness(client, clean_warm_up):
+    response = client.get("/readiness")
+    assert response.status_code == 503
+
+    warm_up.run()
+
+    response = client.get("/readiness")
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_readiness_without_warm_up(client, settings, clean_warm_up):
+    settings.WARM_UP_ON_START = False
+
     response = client.get("/readiness")
     assert response.status_code == 200
+
+
+def test_readiness_database_unavailable(client, settings, clean_warm_up):
+    settings.WARM_UP_ON_START = False
+
+    with mock.patch("ahti.warmup.check_database", side_effect=OperationalError):
+        response = client.get("/readiness")
+    assert response.status_code == 503
+
+
+@pytest.mark.django_db
+def test_warm_up_primes_caches(clean_warm_up):
+    backend.clear()
+
+    warm_up.run()
+
+    assert warm_up.done
+    # Every known operation is parsed and valid
+    assert len(backend) == len(get_known_operations()) > 0
+    for query in get_known_operations():
+        document = backend.document_from_string(schema, query)
+        assert not validate(schema, document.document_ast)
+
+
+def test_cached_document_backend():
+    cached_backend = CachedDocumentBackend(max_size=2)
+
+    tags = cached_backend.document_from_string(schema, "query Tags { tags { id } }")
+    assert (
+        cached_backend.document_from_string(schema, "query Tags { tags { id } }")
+        is tags
+    )
+    cached_backend.document_from_string(schema, "query A { tags { id } }")
+    cached_backend.document_from_string(schema, "query B { tags { id } }")
+
+    # The least recently used document is evicted
+    assert len(cached_backend) == 2
+    assert (
+        cached_backend.document_from_string(schema, "query Tags { tags { id } }")
+        is not tags
+    )
+
+
+@pytest.fixture
+def clean_operation_stats():
+    operation_stats.reset()
+    yield
+    operation_stats.reset()
+
+
+@pytest.mark.parametrize(
+    "query,operation_name,expected",
+    [
+        ("query Tags { tags { id } }", None, "Tags"),
+        ("query Tags { tags { id } }", "Other", "Other"),
+        ("mutation CreateFeature { x }", None, "CreateFeature"),
+        ("{ tags { id } }", None, "<anonymous>"),
+    ],
+)
+def test_get_operation_name(query, operation_name, expected):
+    assert get_operation_name(query, operation_name) == expected
+
+
+@pytest.mark.django_db
+def test_graphql_operations_are_measured(admin_client, clean_operation_stats):
+    query = "query Tags { tags { id } }"
+
+    admin_client.post("/graphql", {"query": query}, content_type="application/json")
+    admin_client.post("/graphql", {"query": query}, content_type="application/json")
+
+    response = admin_client.get("/graphql/stats")
+    stats = response.json()
+    assert response.status_code == 200
+    assert stats["Tags"]["count"] == 2
+    assert stats["Tags"]["sql_count_total"] >= 2
+    assert stats["Tags"]["duration_max"] > 0
+
+
+@pytest.mark.django_db
+def test_graphql_stats_require_staff(client):
+    response = client.get("/graphql/stats")
+
+    assert response.status_code == 302
+    assert response.url.startswith("/admin/login/")
+
+
+@pytest.mark.django_db
+def test_slow_graphql_operations_are_logged(
+    client, settings, caplog, clean_operation_stats
+):
+    settings.GRAPHQL_SLOW_OPERATION_THRESHOLD = 0
+    query = "query Tags { tags { id } }"
+
+    client.post("/graphql", {"query": query}, content_type="application/json")
+
+    assert "Slow GraphQL operation Tags" in caplog.text
+    assert "Query.tags" in caplog.text
+
+
+@pytest.mark.django_db
+def test_metrics(client):
+    query = "query Tags { tags { id } }"
+    client.post("/graphql", {"query": query}, content_type="application/json")
+
+    response = client.get("/metrics")
+
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert 'ahti_graphql_request_duration_seconds_count{operation="Tags"}' in content
+    assert 'ahti_graphql_db_queries_count{operation="Tags"}' in content
+    assert 'ahti_graphql_response_size_bytes_count{operation="Tags"}' in content
+
+
+def test_parse_import_times():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:      1000 |       1000 |   features.enums",
+        "import time:      2500 |       3500 | features.models",
+        "import time:       500 |        500 |     django",
+    ]
+
+    assert parse_import_times(lines) == pytest.approx(
+        {"features": 0.0035, "django": 0.0005}
+    )
+
+
+def test_startup_timings():
+    out = StringIO()
+
+    call_command("startup_timings", "--target", "import_features", stdout=out)
+
+    output = out.getvalue()
+    assert "import_features: started in" in output
+    assert "features" in output
+    assert "django" in output
@@ -1,12 +1,21 @@
-from django.http import HttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 from helusers.admin_site import admin
 
+from ahti.schema import backend
+from ahti.warmup import is_ready
+from features.views import import_runs
+from utils.instrumentation import InstrumentedGraphQLView, operation_stats
+from utils.metrics import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("graphql", csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path(
+        "graphql",
+        csrf_exempt(InstrumentedGraphQLView.as_view(graphiql=True, backend=backend)),
+    ),
 ]
 
 
@@ -18,7 +27,22 @@ def healthz(*args, **kwargs):
 
 
 def readiness(*args, **kwargs):
-    return HttpResponse(status=200)
+    return HttpResponse(status=200 if is_ready() else 503)
 
 
 urlpatterns += [path("healthz", healthz), path("readiness", readiness)]
+
+
+#
+# Performance monitoring
+#
+@staff_member_required
+def graphql_stats(*args, **kwargs):
+    return JsonResponse(operation_stats.snapshot())
+
+
+urlpatterns += [
+    path("graphql/stats", graphql_stats),
+    path("metrics", metrics),
+    path("import-runs", import_runs),
+]
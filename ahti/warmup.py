@@ -0,0 +1,126 @@
+"""Warm-up of the application in a freshly started worker.
+
+The first requests handled by a worker would otherwise pay for opening the
+database connection, building the GraphQL schema, filling the translation caches
+and parsing the queries. The warm-up is run in a background thread when the WSGI
+application is loaded and the readiness probe reports the worker as not ready
+until the warm-up has finished.
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from graphql import validate
+
+logger = logging.getLogger(__name__)
+
+# Queries of the known clients, one operation per file
+OPERATIONS_DIR = Path(__file__).parent / "operations"
+
+
+def check_database():
+    """Raise an exception if the database can't be queried."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def build_schema():
+    """Build the GraphQL schema and run the introspection query against it."""
+    from ahti.schema import schema
+
+    schema.introspect()
+
+
+def prime_translation_caches():
+    """Load the translations of tags and categories into the parler cache."""
+    from categories.models import Category
+    from features.models import Tag
+
+    for model in (Tag, Category):
+        for obj in model.objects.prefetch_related("translations"):
+            # Translations read from the prefetched objects are cached by parler
+            for translation in obj.translations.all():
+                obj.safe_translation_getter(
+                    "name", language_code=translation.language_code
+                )
+
+
+def get_known_operations():
+    return [path.read_text() for path in sorted(OPERATIONS_DIR.glob("*.graphql"))]
+
+
+def prime_query_cache():
+    """Parse and validate the queries of the known operations."""
+    from ahti.schema import backend, schema
+
+    for query in get_known_operations():
+        document = backend.document_from_string(schema, query)
+        errors = validate(schema, document.document_ast)
+        if errors:
+            logger.warning(f"Invalid known operation: {errors[0].message}")
+
+
+class WarmUp:
+    """Warm-up of the current worker process.
+
+    The warm-up is best effort: failing steps are logged and the worker becomes
+    ready anyway. Database connectivity is checked by the readiness probe itself.
+    """
+
+    steps = (build_schema, prime_translation_caches, prime_query_cache)
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def start(self):
+        """Run the warm-up in a background thread, if it hasn't been started."""
+        with self._lock:
+            if self._thread is not None or self.done:
+                return
+            self._thread = threading.Thread(
+                target=self.run, name="warm-up", daemon=True
+            )
+            self._thread.start()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            for step in self.steps:
+                try:
+                    step()
+                except Exception:
+                    logger.exception(f"Warm-up step {step.__name__} failed")
+        finally:
+            # The connection of this thread is not used after the warm-up
+            if self._thread is threading.current_thread():
+                connection.close()
+            self._done.set()
+        logger.info(f"Warm-up finished in {time.perf_counter() - start:.3f}s")
+
+    def reset(self):
+        with self._lock:
+            self._thread = None
+            self._done.clear()
+
+
+warm_up = WarmUp()
+
+
+def is_ready() -> bool:
+    if settings.WARM_UP_ON_START and not warm_up.done:
+        return False
+    try:
+        check_database()
+    except Exception as e:
+        logger.warning(f"Database connection check failed: {e}")
+        return False
+    return True
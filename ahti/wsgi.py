@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from ahti.warmup import warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ahti.settings")
 
 application = get_wsgi_application()
+
+if settings.WARM_UP_ON_START:
+    warm_up.start()
@@ -2,6 +2,7 @@ from django.contrib import admin
 from parler.admin import TranslatableAdmin
 
 from categories.models import Category
+from features.cards import refresh_feature_cards
 
 
 @admin.register(Category)
@@ -11,3 +12,8 @@ class CategoryAdmin(TranslatableAdmin):
 
     def get_queryset(self, request):
         return super().get_queryset(request).prefetch_related("translations")
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # The cards include the name of the category
+        refresh_feature_cards(form.instance.features.values_list("pk", flat=True))
@@ -11,6 +11,12 @@ if [ -z "$SKIP_DATABASE_CHECK" -o "$SKIP_DATABASE_CHECK" = "0" ]; then
   echo "Database is up!"
 fi
 
+# Remove metrics left over by the previous processes
+if [[ -n "$prometheus_multiproc_dir" ]]; then
+    mkdir -p "$prometheus_multiproc_dir"
+    rm -f "$prometheus_multiproc_dir"/*.db
+fi
+
 # Restore a DB dump
 if [[ "$RESTORE_DB_DUMP_DEV" = "1" ]]; then
     echo "Restoring a database dump over the current db..."
@@ -33,8 +39,12 @@ fi
 
 # Import / update feature data in the DB
 if [[ "$IMPORT_FEATURES" = "1" ]]; then
-    ./manage.py import_features
-    echo "Imported features from configured sources"
+    # A failing importer should not prevent the server from starting
+    if ./manage.py import_features --parallel 2; then
+        echo "Imported features from configured sources"
+    else
+        echo "Importing features failed, see the log for details"
+    fi
 fi
 
 # Start server
@@ -2,6 +2,7 @@ from django.contrib.gis import admin
 from django.db.models.functions import Concat
 from parler.admin import TranslatableAdmin, TranslatableTabularInline
 
+from features.cards import refresh_feature_cards
 from features.enums import Visibility
 from features.models import (
     ContactInfo,
@@ -9,6 +10,7 @@ from features.models import (
     FeatureTag,
     FeatureTeaser,
     Image,
+    ImportRun,
     License,
     Link,
     OpeningHours,
@@ -18,6 +20,7 @@ from features.models import (
     SourceType,
     Tag,
 )
+from features.opening_hours import refresh_opening_hours_intervals
 
 
 class ContactInfoInline(admin.StackedInline):
@@ -95,6 +98,7 @@ class FeatureAdmin(TranslatableAdmin, admin.OSMGeoAdmin):
         "source_type__type",
         "source_id",
         "translations__name",
+        "translations__effective_name",
     )
     ordering = ("source_type__system", "source_type__type", "source_id")
     autocomplete_fields = ("category", "parents")
@@ -117,7 +121,9 @@ class FeatureAdmin(TranslatableAdmin, admin.OSMGeoAdmin):
     )
 
     def hide_features(self, request, queryset):
+        feature_ids = list(queryset.values_list("pk", flat=True))
         features_hidden = queryset.update(visibility=Visibility.HIDDEN)
+        refresh_feature_cards(feature_ids)
         if features_hidden == 1:
             message = "1 feature was hidden"
         else:
@@ -127,6 +133,35 @@ class FeatureAdmin(TranslatableAdmin, admin.OSMGeoAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).prefetch_related("category__translations")
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        refresh_opening_hours_intervals([form.instance.pk])
+        refresh_feature_cards([form.instance.pk])
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "importer",
+        "started_at",
+        "status",
+        "duration",
+        "records_seen",
+        "records_created",
+        "records_updated",
+        "records_unchanged",
+        "records_removed",
+        "sql_statements",
+    )
+    list_filter = ("importer", "status")
+    date_hierarchy = "started_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(License)
 class LicenseAdmin(TranslatableAdmin):
@@ -158,6 +193,10 @@ class OpeningHoursPeriodAdmin(TranslatableAdmin):
     def feature_name(self, obj):
         return obj.feature.name
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        refresh_opening_hours_intervals([form.instance.feature_id])
+
     def get_queryset(self, request):
         return (
             super()
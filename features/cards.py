@@ -0,0 +1,69 @@
+"""Feature cards, the denormalized summaries of features for list views.
+
+The cards of a feature are refreshed whenever the feature or its related objects
+are written: by the importers, on admin saves and by the mutations. A card is
+stored for each supported language, and only for visible features.
+"""
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import translation
+
+from features.enums import Visibility
+from features.models import Feature, FeatureCard, get_name_overrides
+
+
+def get_card_language(language_code: Optional[str] = None) -> str:
+    """Return the language of the cards, the active language by default."""
+    language_code = language_code or translation.get_language()
+    if language_code in settings.PARLER_SUPPORTED_LANGUAGE_CODES:
+        return language_code
+    return settings.PARLER_DEFAULT_LANGUAGE_CODE
+
+
+def get_cards(
+    feature: Feature, name_overrides: Optional[dict] = None
+) -> Iterable[FeatureCard]:
+    """Return the cards of the feature in each supported language."""
+    category = feature.category
+    images = feature.images.all()
+    location = feature.geometry.point_on_surface
+    location.srid = feature.geometry.srid
+    for language_code in settings.PARLER_SUPPORTED_LANGUAGE_CODES:
+        yield FeatureCard(
+            feature=feature,
+            language_code=language_code,
+            name=feature.get_effective_name_in(language_code, name_overrides),
+            category=category,
+            category_name=category.safe_translation_getter(
+                "name", "", language_code=language_code
+            )
+            if category
+            else "",
+            tag_ids=[tag.pk for tag in feature.tags.all()],
+            image_url=images[0].url if images else "",
+            location=location,
+        )
+
+
+@transaction.atomic
+def refresh_feature_cards(feature_ids: Iterable[int]):
+    """Rewrite the cards of the features, deleting the cards of hidden features."""
+    feature_ids = list(feature_ids)
+    FeatureCard.objects.filter(feature_id__in=feature_ids).delete()
+    features = list(
+        Feature.objects.filter(pk__in=feature_ids, visibility=Visibility.VISIBLE)
+        .select_related("category")
+        .prefetch_related("translations", "category__translations", "tags", "images")
+    )
+    name_overrides = get_name_overrides(
+        [feature.pk for feature in features if feature.overrides_modified_at]
+    )
+    FeatureCard.objects.bulk_create(
+        [
+            card
+            for feature in features
+            for card in get_cards(feature, name_overrides.get(feature.pk, {}))
+        ]
+    )
@@ -28,6 +28,18 @@ class HarborMooringType(models.TextChoices):
     SEA_BUOY = "SEA_BUOY", _("Sea buoy")
 
 
+class ImportRunStatus(models.TextChoices):
+    """Outcome of a run of an importer."""
+
+    RUNNING = "RUNNING", _("Running")
+    SUCCEEDED = "SUCCEEDED", _("Succeeded")
+    # Some of the API calls failed, the data of the other calls was imported
+    INCOMPLETE = "INCOMPLETE", _("Incomplete")
+    FAILED = "FAILED", _("Failed")
+    # Another import of the same source was in progress
+    SKIPPED = "SKIPPED", _("Skipped")
+
+
 class OverrideFieldType(models.TextChoices):
     """Enumeration for overridable fields."""
 
@@ -40,6 +52,8 @@ class Visibility(models.IntegerChoices):
     HIDDEN = 0, _("Hidden")
     VISIBLE = 1, _("Visible")
     DRAFT = 2, _("Draft")
+    # Hidden by an importer because the feature is no longer in the source
+    REMOVED = 3, _("Removed from source")
 
 
 class Weekday(models.IntegerChoices):
@@ -1,11 +1,106 @@
+import logging
+import time
 from abc import ABCMeta, abstractmethod
-from typing import Optional
+from collections import Counter, defaultdict
+from contextlib import contextmanager, ExitStack
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
 
 from categories.models import Category
-from features.models import SourceType, Tag
+from features.cards import refresh_feature_cards
+from features.enums import ImportRunStatus, Visibility
+from features.importers import http
+from features.models import Feature, ImportRun, SourceType, Tag
+from utils import metrics
+from utils.instrumentation import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+# Namespace of the advisory locks held by importers, the source type is the 2nd key
+IMPORT_LOCK_NAMESPACE = 0x41485449  # "AHTI"
+
+# Actions for the features which are no longer available in the source
+STALE_ACTIONS = ("hide", "delete", "keep")
+
+
+class ImportSkipped(Exception):
+    """Raised when an import is skipped because another run is in progress."""
+
+
+class ImportIncomplete(Exception):
+    """Raised after an import in which some of the API calls failed."""
+
+
+class ApiCallResult(NamedTuple):
+    label: str
+    duration: float
+    error: Optional[str] = None
+
+
+@contextmanager
+def import_lock(source_type: SourceType, timeout: float = 0):
+    """Hold a PostgreSQL advisory lock for importing the source type.
+
+    The lock is held by the database session, so it is released also when the
+    process running the import dies. Raises ImportSkipped if the lock isn't
+    acquired within `timeout` seconds.
+    """
+    keys = [IMPORT_LOCK_NAMESPACE, source_type.pk]
+    deadline = time.monotonic() + timeout
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", keys)
+            if cursor.fetchone()[0]:
+                break
+            if time.monotonic() >= deadline:
+                raise ImportSkipped(
+                    f"Another import of {source_type} is in progress, "
+                    f"lock not acquired in {timeout:g} s"
+                )
+            time.sleep(min(1.0, max(deadline - time.monotonic(), 0)))
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s, %s)", keys)
+
+
+def get_stale_action() -> str:
+    """Return the configured action for features missing from the source."""
+    action = settings.IMPORTER_STALE_ACTION
+    if action not in STALE_ACTIONS:
+        raise ImproperlyConfigured(
+            f"IMPORTER_STALE_ACTION must be one of {', '.join(STALE_ACTIONS)}, "
+            f"not {action!r}"
+        )
+    return action
 
 
 class FeatureImporterBase(metaclass=ABCMeta):
+    def __init__(self, full: bool = False, lock_timeout: float = 0):
+        # Import all the data, including data unchanged since the previous import
+        self.full = full
+        # Seconds to wait for another import of the same source type to finish
+        self.lock_timeout = lock_timeout
+        # Accumulated wall time (in seconds) of each import stage
+        self.stage_durations = defaultdict(float)
+        # Context manager factories entered around each stage, called with
+        # the name of the stage.
+        self.stage_hooks = []
+        # Number of processed, created, updated and skipped records, bytes
+        # received from the source etc.
+        self.counts = Counter()
+        # Results of the API calls in the order they were made
+        self.api_calls = []
+        # Ids of the features written or whose visibility changed in the import,
+        # their cards are refreshed at the end of the import
+        self.changed_feature_ids = set()
+
     @property
     @abstractmethod
     def source_system(self):
@@ -22,12 +117,214 @@ class FeatureImporterBase(metaclass=ABCMeta):
         )
         return st
 
+    def run(self, identifier: str):
+        """Import the features and record metrics and an ImportRun of the import.
+
+        Only one import of a source type can run at a time. ImportSkipped is
+        raised if another import doesn't finish within `lock_timeout`.
+
+        :param identifier: identifier of the importer in the registry
+        """
+        # Fail before importing anything if reconciliation is misconfigured
+        get_stale_action()
+        source_type = self.get_source_type()
+        import_run = ImportRun.objects.create(
+            importer=identifier, source_type=source_type
+        )
+        try:
+            with import_lock(source_type, self.lock_timeout):
+                self._run(identifier, import_run)
+        except ImportSkipped as e:
+            metrics.observe_import_skipped(identifier)
+            import_run.status = ImportRunStatus.SKIPPED
+            import_run.error = str(e)
+            import_run.finished_at = timezone.now()
+            import_run.save()
+            raise
+
+    def _run(self, identifier: str, import_run: ImportRun):
+        queries = QueryRecorder()
+        start = time.perf_counter()
+        started_at = timezone.now()
+        status = ImportRunStatus.FAILED
+        error = ""
+        try:
+            with connection.execute_wrapper(queries):
+                self.import_features()
+                failed_calls = [call for call in self.api_calls if call.error]
+                if not failed_calls:
+                    with self.stage("reconcile"):
+                        self.reconcile_features(started_at)
+                with self.stage("write"):
+                    self.refresh_feature_cards()
+                if failed_calls:
+                    raise ImportIncomplete(
+                        f"{len(failed_calls)} of {len(self.api_calls)} API calls "
+                        "failed: " + ", ".join(call.label for call in failed_calls)
+                    )
+            status = ImportRunStatus.SUCCEEDED
+        except ImportIncomplete as e:
+            status = ImportRunStatus.INCOMPLETE
+            error = str(e)
+            raise
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            for call in self.api_calls:
+                metrics.observe_import_api_call(identifier, call.label, call.duration)
+            metrics.observe_import(
+                identifier,
+                duration=duration,
+                stage_durations=self.stage_durations,
+                records=self.counts["processed"],
+                rows_written=queries.rows_written,
+                failed=status != ImportRunStatus.SUCCEEDED,
+            )
+            self.save_import_run(import_run, status, error, duration, queries)
+
+    def save_import_run(
+        self,
+        import_run: ImportRun,
+        status: ImportRunStatus,
+        error: str,
+        duration: float,
+        queries: QueryRecorder,
+    ):
+        """Record the outcome, timings and counts of a finished import."""
+        import_run.status = status
+        import_run.error = error
+        import_run.finished_at = timezone.now()
+        import_run.duration = duration
+        import_run.fetch_duration = self.stage_durations["fetch"]
+        import_run.map_duration = self.stage_durations["map"]
+        import_run.write_duration = self.stage_durations["write"]
+        import_run.reconcile_duration = self.stage_durations["reconcile"]
+        import_run.records_seen = self.counts["processed"] + self.counts["skipped"]
+        import_run.records_created = self.counts["created"]
+        import_run.records_updated = self.counts["updated"]
+        import_run.records_unchanged = self.counts["skipped"]
+        import_run.records_removed = self.counts["removed"]
+        import_run.http_bytes = self.counts["http_bytes"]
+        import_run.sql_statements = queries.count
+        import_run.api_calls = [call._asdict() for call in self.api_calls]
+        import_run.save()
+
+    def reconcile_features(self, started_at: datetime):
+        """Hide or delete the visible features which were not seen in the import.
+
+        Features are seen when they are mapped, i.e. their `mapped_at` is updated.
+        The features seen again after being removed are made visible. Features
+        hidden by moderators and drafts are left as they are.
+
+        Reconciliation is skipped when some of the data was not processed (API
+        calls with unchanged responses) and when more than
+        `IMPORTER_STALE_MAX_RATIO` of the features would be removed, as it is more
+        likely caused by a problem in the source than by removed data.
+        """
+        source_type = self.get_source_type()
+        features = Feature.objects.filter(source_type=source_type)
+        restored_ids = list(
+            features.filter(
+                mapped_at__gte=started_at, visibility=Visibility.REMOVED
+            ).values_list("pk", flat=True)
+        )
+        if restored_ids:
+            Feature.objects.filter(pk__in=restored_ids).update(
+                visibility=Visibility.VISIBLE
+            )
+            self.changed_feature_ids.update(restored_ids)
+            self.counts["restored"] += len(restored_ids)
+
+        action = get_stale_action()
+        if action == "keep" or self.counts["not_modified"]:
+            return
+
+        visible = features.filter(visibility=Visibility.VISIBLE)
+        stale = visible.filter(mapped_at__lt=started_at)
+        stale_count = stale.count()
+        if not stale_count:
+            return
+        total_count = visible.count()
+        if stale_count > settings.IMPORTER_STALE_MAX_RATIO * total_count:
+            logger.warning(
+                f"Not removing {stale_count} of {total_count} features of "
+                f"{source_type} missing from the source, "
+                f"IMPORTER_STALE_MAX_RATIO exceeded"
+            )
+            return
+
+        if action == "hide":
+            stale_ids = list(stale.values_list("pk", flat=True))
+            Feature.objects.filter(pk__in=stale_ids).update(
+                visibility=Visibility.REMOVED
+            )
+            self.changed_feature_ids.update(stale_ids)
+            self.counts["removed"] += len(stale_ids)
+        else:
+            # The cards of the deleted features are deleted with them
+            stale.delete()
+            self.counts["removed"] += stale_count
+
+    def refresh_feature_cards(self):
+        """Refresh the cards of the features changed in the import.
+
+        The cards of the features hidden or removed from the source are deleted.
+        Features which were only seen in the import keep their cards.
+        """
+        if self.changed_feature_ids:
+            refresh_feature_cards(self.changed_feature_ids)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mark a stage of the import (i.e. "fetch", "map", "write" or "reconcile").
+
+        A stage can be entered several times during an import (e.g. once per API
+        call), its durations are accumulated into `stage_durations`.
+        """
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for hook in self.stage_hooks:
+                    stack.enter_context(hook(name))
+                yield
+        finally:
+            self.stage_durations[name] += time.perf_counter() - start
+
+    @contextmanager
+    def api_call(self, label: str):
+        """Isolate the fetching and processing of a single API call.
+
+        An exception raised within the block is logged and recorded, and the
+        import continues with the next call. The data written for the failed
+        call is rolled back and its responses are not cached, so that they are
+        processed again in the next import. The import is reported as incomplete
+        at the end.
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            # The responses are cached after the transaction has been committed
+            with http.deferred_cache_writes(), transaction.atomic():
+                yield
+        except Exception as e:
+            logger.exception(f"API call {label} of {type(self).__name__} failed")
+            error = repr(e)
+        finally:
+            self.api_calls.append(
+                ApiCallResult(label, time.perf_counter() - start, error)
+            )
+
     @abstractmethod
     def import_features(self):
         """This method should result in data being imported from a source into Features.
 
         - Creates a features.models.SourceType if one doesn't exists.
         - Creates or updates features.models.Feature instances.
+
+        Fetching, mapping and writing the data should be wrapped in the
+        corresponding `stage()`, and each API call in `api_call()`.
         """
 
 
@@ -0,0 +1,217 @@
+"""Offline benchmark harness for the feature importers.
+
+Recorded API responses are replayed to the importers instead of calling the actual
+APIs, so that the performance of the importers can be measured without network
+access and with repeatable input. The recorded responses can be scaled up by
+duplicating the places in them.
+"""
+import copy
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Type
+from unittest import mock
+
+import requests
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from features.importers import myhelsinki_places, venepaikka_harbors
+from features.importers.base import FeatureImporterBase
+from features.importers.myhelsinki_places.importer import (
+    MyHelsinkiImporter,
+    MyHelsinkiPlacesClient,
+)
+from features.importers.venepaikka_harbors.importer import (
+    VenepaikkaHarborsClient,
+    VenepaikkaImporter,
+)
+from utils.instrumentation import QueryRecorder
+
+# Responses recorded for the importer tests are used by default
+MYHELSINKI_RESPONSES = Path(myhelsinki_places.__file__).parent / "tests" / "responses"
+VENEPAIKKA_RESPONSES = Path(venepaikka_harbors.__file__).parent / "tests" / "responses"
+
+
+def _scaled_id(source_id: str, copy_number: int) -> str:
+    return source_id if copy_number == 0 else f"{source_id}-{copy_number}"
+
+
+def scale_myhelsinki_places(places: dict, scale: int) -> dict:
+    """Duplicate the places in a MyHelsinki places response `scale` times."""
+    scaled = copy.deepcopy(places)
+    scaled["data"] = []
+    for copy_number in range(scale):
+        for place in places["data"]:
+            place = copy.deepcopy(place)
+            place["id"] = _scaled_id(place["id"], copy_number)
+            scaled["data"].append(place)
+    return scaled
+
+
+def scale_venepaikka_harbors(harbors: dict, scale: int) -> dict:
+    """Duplicate the harbors in a Venepaikka harbors response `scale` times."""
+    scaled = copy.deepcopy(harbors)
+    edges = scaled["data"]["harbors"]["edges"] = []
+    for copy_number in range(scale):
+        for edge in harbors["data"]["harbors"]["edges"]:
+            edge = copy.deepcopy(edge)
+            edge["node"]["id"] = _scaled_id(edge["node"]["id"], copy_number)
+            edges.append(edge)
+    return scaled
+
+
+def _read_response(responses_dir: Path, name: str) -> dict:
+    with open(responses_dir / name, "r") as f:
+        return json.loads(f.read())
+
+
+def _replayed_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+def _encode(payload: dict) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+@contextmanager
+def replay_myhelsinki_places(responses_dir: Path, scale: int):
+    """Replay recorded Finnish, English and Swedish MyHelsinki places responses."""
+    recorded = {
+        "fi": _read_response(responses_dir, "places_response.json"),
+        "en": _read_response(responses_dir, "places_en.json"),
+        "sv": _read_response(responses_dir, "places_sv.json"),
+    }
+    contents = {
+        lang: _encode(scale_myhelsinki_places(places, scale))
+        for lang, places in recorded.items()
+    }
+
+    def fetch_places(client, lang: str, parameters: dict = None):
+        return _replayed_response(contents[lang])
+
+    with override_settings(
+        MYHELSINKI_PLACES_API_CALLS=[{}],
+        MYHELSINKI_PLACES_ADDITIONAL_LANGUAGES=["en", "sv"],
+    ), mock.patch.object(MyHelsinkiPlacesClient, "fetch_places", fetch_places):
+        yield len(recorded["fi"]["data"]) * scale
+
+
+@contextmanager
+def replay_venepaikka_harbors(responses_dir: Path, scale: int):
+    """Replay a recorded Venepaikka harbors response."""
+    recorded = _read_response(responses_dir, "harbors_response.json")
+    content = _encode(scale_venepaikka_harbors(recorded, scale))
+
+    def fetch_harbors(client, query: str):
+        return _replayed_response(content)
+
+    with mock.patch.object(VenepaikkaHarborsClient, "fetch_harbors", fetch_harbors):
+        yield len(recorded["data"]["harbors"]["edges"]) * scale
+
+
+class ReplayConfig:
+    def __init__(
+        self,
+        importer_class: Type[FeatureImporterBase],
+        replay: Callable,
+        responses_dir: Path,
+    ):
+        self.importer_class = importer_class
+        self.replay = replay
+        self.responses_dir = responses_dir
+
+
+replays = {
+    "myhelsinki_places": ReplayConfig(
+        MyHelsinkiImporter, replay_myhelsinki_places, MYHELSINKI_RESPONSES
+    ),
+    "venepaikka_harbors": ReplayConfig(
+        VenepaikkaImporter, replay_venepaikka_harbors, VENEPAIKKA_RESPONSES
+    ),
+}
+
+
+class StageMeasurement:
+    """Measurements of a single import stage, accumulated over its runs.
+
+    Peak memory is the highest amount of memory allocated by Python during a
+    single run of the stage. Tracing the memory allocations slows down execution,
+    so it can be disabled when only the wall times are of interest.
+    """
+
+    def __init__(self, name: str, trace_memory: bool = True):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.duration = 0.0
+        self.peak_memory = None
+        self.queries = QueryRecorder()
+
+    @contextmanager
+    def measure(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(self.queries):
+                yield
+        finally:
+            self.duration += time.perf_counter() - start
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.peak_memory = max(self.peak_memory or 0, peak)
+
+
+class ImporterBenchmark:
+    """Run an importer against replayed responses and measure its stages.
+
+    The data written by the importer is rolled back after the run unless `keep`
+    is set.
+    """
+
+    def __init__(
+        self,
+        identifier: str,
+        scale: int = 1,
+        keep: bool = False,
+        responses_dir: str = None,
+        trace_memory: bool = True,
+    ):
+        self.identifier = identifier
+        self.config: ReplayConfig = replays[identifier]
+        self.scale = scale
+        self.keep = keep
+        self.trace_memory = trace_memory
+        self.responses_dir = (
+            Path(responses_dir) if responses_dir else self.config.responses_dir
+        )
+        self.stages: Dict[str, StageMeasurement] = {}
+        self.duration = 0.0
+        self.record_count = 0
+
+    def _measure_stage(self, name: str):
+        if name not in self.stages:
+            self.stages[name] = StageMeasurement(name, self.trace_memory)
+        return self.stages[name].measure()
+
+    def run(self) -> "ImporterBenchmark":
+        with self.config.replay(
+            self.responses_dir, self.scale
+        ) as record_count, transaction.atomic():
+            self.record_count = record_count
+            importer = self.config.importer_class()
+            importer.stage_hooks.append(self._measure_stage)
+
+            start = time.perf_counter()
+            importer.import_features()
+            self.duration = time.perf_counter() - start
+
+            if not self.keep:
+                transaction.set_rollback(True)
+        return self
@@ -0,0 +1,224 @@
+"""HTTP layer of the importer clients.
+
+Responses are cached on disk when `IMPORTER_HTTP_CACHE_DIR` is set. Requests for
+responses with validators (`ETag`, `Last-Modified`) are sent conditionally and a
+`304 Not Modified` response is answered with the cached payload, flagged with
+`not_modified` so that the importers can skip processing unchanged data.
+Within `deferred_cache_writes()` the responses are cached only after the block
+has succeeded, so that a response whose data failed to be imported is not
+answered with `304 Not Modified` in the next import.
+
+With `IMPORTER_HTTP_CACHE_REPLAY` the cached payloads are returned without
+sending requests at all, for debugging and replaying imports.
+
+Requests are sent through a pooled session of the process. Timeouts, connection
+errors and 5xx responses are retried `IMPORTER_HTTP_RETRIES` times with jittered
+exponential backoff starting from `IMPORTER_HTTP_BACKOFF` seconds.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_sessions = {}
+
+# Cache writes of the active deferred_cache_writes() blocks, innermost last
+_deferred_writes = []
+
+
+def not_modified(response: requests.Response) -> bool:
+    """Return True if the response is a cached payload which has not changed."""
+    return getattr(response, "not_modified", False)
+
+
+def transferred_bytes(response: requests.Response) -> int:
+    """Return the size of the response body received over the network."""
+    if getattr(response, "from_cache", False):
+        return 0
+    return len(response.content)
+
+
+class CachedPayload:
+    def __init__(self, content: bytes, etag: str = None, last_modified: str = None):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, url: str, not_modified: bool) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.content
+        response.not_modified = not_modified
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """Cache of response payloads and their validators stored in a directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(method: str, url: str, params: dict = None, json_data=None) -> str:
+        request = json.dumps([method.upper(), url, params, json_data], sort_keys=True)
+        return hashlib.sha1(request.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[CachedPayload]:
+        try:
+            with open(self.directory / f"{key}.json") as f:
+                meta = json.load(f)
+            content = (self.directory / f"{key}.body").read_bytes()
+        except (OSError, ValueError):
+            return None
+        return CachedPayload(content, meta.get("etag"), meta.get("last_modified"))
+
+    def store(self, key: str, response: requests.Response):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": response.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        # Write to temporary files first so that a concurrent reader never sees
+        # a partially written payload
+        for suffix, content in (
+            ("body", response.content),
+            ("json", json.dumps(meta).encode("utf-8")),
+        ):
+            path = self.directory / f"{key}.{suffix}"
+            temporary_path = path.with_suffix(f".{suffix}.tmp")
+            temporary_path.write_bytes(content)
+            os.replace(temporary_path, path)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    if not settings.IMPORTER_HTTP_CACHE_DIR:
+        return None
+    return ResponseCache(settings.IMPORTER_HTTP_CACHE_DIR)
+
+
+@contextmanager
+def deferred_cache_writes():
+    """Cache the responses received within the block when the block exits.
+
+    Nothing is cached if the block raises an exception.
+    """
+    writes = []
+    _deferred_writes.append(writes)
+    try:
+        yield
+    finally:
+        _deferred_writes.pop()
+    for write in writes:
+        write()
+
+
+def get_session() -> requests.Session:
+    """Return the pooled session of the current process.
+
+    Sessions are not shared with forked processes, since the pooled connections
+    can't be used by several processes.
+    """
+    pid = os.getpid()
+    if pid not in _sessions:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _sessions.clear()
+        _sessions[pid] = session
+    return _sessions[pid]
+
+
+def get_backoff(attempt: int) -> float:
+    """Return a random delay (full jitter) before retrying the attempt."""
+    return random.uniform(0, settings.IMPORTER_HTTP_BACKOFF * 2 ** attempt)
+
+
+def send(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request, retrying on timeouts, connection errors and 5xx responses.
+
+    The response of the last attempt is returned as is, error statuses are not
+    raised.
+    """
+    retries = settings.IMPORTER_HTTP_RETRIES
+    for attempt in range(retries + 1):
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            if attempt == retries:
+                raise
+            reason = repr(e)
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                return response
+            reason = f"status {response.status_code}"
+
+        delay = get_backoff(attempt)
+        logger.warning(
+            f"{method} {url} failed ({reason}), retrying in {delay:.1f} s "
+            f"({attempt + 1}/{retries})"
+        )
+        time.sleep(delay)
+
+
+def request(
+    method: str,
+    url: str,
+    params: dict = None,
+    json_data=None,
+    headers: dict = None,
+    timeout: float = None,
+) -> requests.Response:
+    """Send a request, conditionally if a response to it has been cached."""
+    cache = get_response_cache()
+    key = cache.key(method, url, params, json_data) if cache else None
+    cached = cache.load(key) if cache else None
+
+    if cached and settings.IMPORTER_HTTP_CACHE_REPLAY:
+        return cached.to_response(url, not_modified=False)
+
+    headers = dict(headers or {})
+    if cached:
+        headers.update(cached.conditional_headers())
+
+    response = send(
+        method, url, params=params, json=json_data, headers=headers, timeout=timeout
+    )
+    if cached and response.status_code == 304:
+        return cached.to_response(response.url, not_modified=True)
+
+    response.raise_for_status()
+    response.not_modified = False
+    if cache:
+        write = partial(cache.store, key, response)
+        if _deferred_writes:
+            _deferred_writes[-1].append(write)
+        else:
+            write()
+    return response
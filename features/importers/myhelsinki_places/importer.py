@@ -1,4 +1,6 @@
-from typing import Iterable
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlencode
 
 import jmespath
 import requests
@@ -8,6 +10,7 @@ from django.utils import timezone
 from django.utils.dateparse import parse_datetime, parse_time
 
 from features.enums import FeatureTagSource, Weekday
+from features.importers import http
 from features.importers.base import CategoryMapper, FeatureImporterBase, TagMapper
 from features.importers.myhelsinki_places import app_settings
 from features.models import (
@@ -19,6 +22,7 @@ from features.models import (
     OpeningHoursPeriod,
     SourceType,
 )
+from features.opening_hours import refresh_opening_hours_intervals
 
 feature_expression = jmespath.compile(
     """
@@ -63,69 +67,178 @@ class MyHelsinkiImporter(FeatureImporterBase):
     source_type = "place"
     main_lang = "fi"
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.tag_mapper = TagMapper(app_settings.TAG_CONFIG)
         self.category_mapper = CategoryMapper(app_settings.CATEGORY_CONFIG)
 
     def import_features(self):
+        """Import the places changed since the previous import.
+
+        Places whose `modified_at` equals the `source_modified_at` of the existing
+        feature are skipped in all languages, unless a full import is requested.
+        Only places modified before the watermark of the source type can be
+        skipped. The watermark is advanced to the most recent `modified_at` after
+        an import in which all the API calls succeeded.
+        """
         source_type = self.get_source_type()
         mhc = MyHelsinkiPlacesClient()
+        watermark = source_type.watermark
 
         for call_parameters in app_settings.API_CALLS:
-            places = mhc.fetch_places(
-                lang=self.main_lang, parameters=call_parameters
-            ).json()
-            self._process_features(places, source_type)
+            with self.api_call(urlencode(call_parameters, doseq=True) or "all"):
+                watermark = self._import_places(
+                    mhc, call_parameters, source_type, watermark
+                )
 
-            for lang in app_settings.ADDITIONAL_LANGUAGES:
-                trans_places = mhc.fetch_places(
-                    lang=lang, parameters=call_parameters,
-                ).json()
-                self._process_features(trans_places, source_type, lang=lang)
+        incomplete = any(call.error for call in self.api_calls)
+        if not incomplete and watermark != source_type.watermark:
+            source_type.watermark = watermark
+            source_type.save(update_fields=["watermark"])
+
+    def _import_places(
+        self,
+        mhc: "MyHelsinkiPlacesClient",
+        call_parameters: dict,
+        source_type: SourceType,
+        watermark: Optional[datetime],
+    ) -> Optional[datetime]:
+        """Import the places of a single API call and return the new watermark."""
+        with self.stage("fetch"):
+            responses = {
+                lang: mhc.fetch_places(lang=lang, parameters=call_parameters)
+                for lang in [self.main_lang, *app_settings.ADDITIONAL_LANGUAGES]
+            }
+        self.counts["http_bytes"] += sum(
+            map(http.transferred_bytes, responses.values())
+        )
+        if not self.full and all(map(http.not_modified, responses.values())):
+            # Nothing has changed since the previous import of this call
+            self.counts["not_modified"] += 1
+            return watermark
+
+        with self.stage("map"):
+            responses = {
+                lang: feature_expression.search(response.json())
+                for lang, response in responses.items()
+            }
+            places = self._merge_translations(responses)
+        with self.stage("write"):
+            unchanged_ids = self._skip_unchanged_features(places, source_type)
+            places = [p for p in places if p["id"] not in unchanged_ids]
+            self._process_features(places, source_type)
+        return max(
+            filter(None, [watermark, *map(self._get_modified_at, places)]),
+            default=None,
+        )
 
-    def _process_features(
-        self, places: dict, source_type: SourceType, lang: str = "fi"
-    ):
-        """Import data for features represented in the source data.
+    def _merge_translations(self, responses: Dict[str, List[dict]]) -> List[dict]:
+        """Merge the places of each language into the places of the main language.
 
-        Translations are imported only for objects that have translations in
-        the source data.
+        The translated values of each language found in the responses are added to
+        the place under `translations`. Places missing from the main language are
+        ignored.
+        """
+        places = responses[self.main_lang]
+        places_by_id = {place["id"]: place for place in places}
+        for place in places:
+            place["translations"] = {}
+
+        for lang, translated_places in responses.items():
+            for translated_place in translated_places:
+                place = places_by_id.get(translated_place["id"])
+                if place is None:
+                    continue
+                place["translations"][lang] = {
+                    "name": translated_place["name"][lang],
+                    "description": translated_place["description"],
+                    "url": translated_place["url"],
+                    "opening_hours_comment": translated_place["opening_hours"][
+                        "comment"
+                    ],
+                }
+        return places
+
+    @staticmethod
+    def _get_modified_at(place: dict) -> Optional[datetime]:
+        return parse_datetime(place["modified_at"]) if place["modified_at"] else None
+
+    def _skip_unchanged_features(
+        self, places: Iterable[dict], source_type: SourceType
+    ) -> Set[str]:
+        """Return the ids of the places not modified since the previous import.
+
+        The features of the unchanged places are marked as mapped, but their data
+        is not written.
         """
-        for place in feature_expression.search(places):
-            feature = self._import_feature(place, source_type, lang=lang)
-            self._import_opening_hours(feature, place["opening_hours"], lang=lang)
+        if self.full or source_type.watermark is None:
+            return set()
+
+        modified_ats = {
+            place["id"]: modified_at
+            for place, modified_at in zip(places, map(self._get_modified_at, places))
+            if modified_at and modified_at <= source_type.watermark
+        }
+        source_modified_ats = Feature.objects.filter(
+            source_type=source_type, source_id__in=modified_ats.keys()
+        ).values_list("source_id", "source_modified_at")
+        unchanged_ids = {
+            source_id
+            for source_id, source_modified_at in source_modified_ats
+            if modified_ats[source_id] == source_modified_at
+        }
 
-            if lang == self.main_lang:
-                self._import_feature_images(feature, place["images"])
-                self._import_feature_tags(feature, place["tags"])
-                self._import_feature_category(feature, place["tags"])
-                self._import_feature_contact_info(feature, place["address"])
+        if unchanged_ids:
+            Feature.objects.filter(
+                source_type=source_type, source_id__in=unchanged_ids
+            ).update(mapped_at=timezone.now())
+        self.counts["skipped"] += len(unchanged_ids)
+        return unchanged_ids
 
-    def _import_feature(self, place: dict, st: SourceType, lang: str) -> Feature:
-        """Imports basic information for a feature.
+    def _process_features(self, places: Iterable[dict], source_type: SourceType):
+        """Import data for features represented in the merged source data.
 
-        Only translated fields are updated when importing translations.
+        Each feature is written once with all its translations. Translations are
+        imported only for objects that have translations in the source data.
         """
-        values = {
-            "name": place["name"][lang],
-            "description": place["description"],
-            "url": place["url"],
+        existing_features = {
+            feature.source_id: feature
+            for feature in Feature.objects.filter(
+                source_type=source_type, source_id__in=[p["id"] for p in places]
+            )
+            .select_related("category")
+            .prefetch_related("translations")
         }
-
-        if lang == self.main_lang:
-            main_values = {
-                "mapped_at": timezone.now(),
-                "source_modified_at": parse_datetime(place["modified_at"]),
-                "geometry": Point(
-                    place["lon"], place["lat"], srid=settings.DEFAULT_SRID
-                ),
-            }
-            values.update(main_values)
-        feature, created = Feature.objects.language(lang).update_or_create(
-            source_type=st, source_id=place["id"], defaults=values,
-        )
-        return feature
+        feature_ids = []
+        for place in places:
+            self.counts["processed"] += 1
+            feature = existing_features.get(place["id"])
+            self.counts["updated" if feature else "created"] += 1
+            feature = feature or Feature(source_type=source_type, source_id=place["id"])
+            self._import_feature(feature, place)
+            self._import_opening_hours(
+                feature, place["opening_hours"], place["translations"]
+            )
+            self._import_feature_images(feature, place["images"])
+            self._import_feature_tags(feature, place["tags"])
+            self._import_feature_category(feature, place["tags"])
+            self._import_feature_contact_info(feature, place["address"])
+            feature_ids.append(feature.pk)
+        refresh_opening_hours_intervals(feature_ids)
+        self.changed_feature_ids.update(feature_ids)
+
+    def _import_feature(self, feature: Feature, place: dict):
+        """Imports basic information and translations for a feature."""
+        feature.mapped_at = timezone.now()
+        feature.source_modified_at = parse_datetime(place["modified_at"])
+        feature.geometry = Point(place["lon"], place["lat"], srid=settings.DEFAULT_SRID)
+        for lang, translation in place["translations"].items():
+            feature.set_current_language(lang)
+            feature.name = translation["name"]
+            feature.description = translation["description"]
+            feature.url = translation["url"]
+        feature.set_current_language(self.main_lang)
+        feature.save()
 
     def _import_feature_images(self, feature: Feature, images: Iterable[dict]):
         """Imports images for a feature and sets the image license.
@@ -212,11 +325,10 @@ class MyHelsinkiImporter(FeatureImporterBase):
                 },
             )
 
-    def _import_opening_hours(self, feature: Feature, opening_hours: dict, lang: str):
-        """Imports opening hours for the given feature.
-
-        Only translated fields are updated when importing translations.
-        """
+    def _import_opening_hours(
+        self, feature: Feature, opening_hours: dict, translations: dict
+    ):
+        """Imports opening hours and their translated comments for the given feature."""
 
         def has_data(hours):
             return bool(hours["opens"] or hours["closes"] or hours["all_day"])
@@ -225,22 +337,29 @@ class MyHelsinkiImporter(FeatureImporterBase):
             filter(has_data, opening_hours["hours"]) if opening_hours["hours"] else []
         )
         hours = list(filtered_hours)
+        comments = {
+            lang: translation["opening_hours_comment"]
+            for lang, translation in translations.items()
+        }
 
         if opening_hours["comment"] or hours:
-            ohps = OpeningHoursPeriod.objects.filter(feature=feature)
-            if ohps.count() > 1:
+            ohps = list(
+                OpeningHoursPeriod.objects.filter(feature=feature).prefetch_related(
+                    "translations"
+                )
+            )
+            if len(ohps) > 1:
                 # MyHelsinki places API provides only one set of opening hours,
                 # start from a clean state.
-                ohps.delete()
-
-            ohp, created = OpeningHoursPeriod.objects.language(lang).update_or_create(
-                feature=feature, defaults={"comment": opening_hours["comment"]}
-            )
+                OpeningHoursPeriod.objects.filter(feature=feature).delete()
+                ohps = []
 
-            if lang != self.main_lang:
-                # We only need to process translated fields if
-                # not the primary language
-                return
+            ohp = ohps[0] if ohps else OpeningHoursPeriod(feature=feature)
+            for lang, comment in comments.items():
+                ohp.set_current_language(lang)
+                ohp.comment = comment
+            ohp.set_current_language(self.main_lang)
+            ohp.save()
 
             for h in hours:
                 day = Weekday(h["day"])
@@ -277,11 +396,10 @@ class MyHelsinkiPlacesClient:
             params.update(parameters)
 
         headers = {"accept": "application/json"}
-        response = requests.get(
+        return http.request(
+            "GET",
             self.base_url + self.places_url,
             params=params,
             headers=headers,
             timeout=self.timeout,
         )
-        response.raise_for_status()
-        return response
@@ -1,12 +1,18 @@
 import datetime
 import math
 
+import pytest
 from django.contrib.gis.geos import Point
+from django.db import DatabaseError
 from django.utils.timezone import utc
 from freezegun import freeze_time
 
-from features.importers.myhelsinki_places.importer import MyHelsinkiPlacesClient
-from features.models import Feature, SourceType
+from features.importers.base import ImportIncomplete
+from features.importers.myhelsinki_places.importer import (
+    MyHelsinkiImporter,
+    MyHelsinkiPlacesClient,
+)
+from features.models import Feature, FeatureTranslation, SourceType
 from utils.pytest import pytest_regex
 
 PLACES_URL = MyHelsinkiPlacesClient.base_url + MyHelsinkiPlacesClient.places_url
@@ -57,3 +63,112 @@ def test_geometry_is_correct(requests_mock, importer, places_response):
     assert isinstance(feature.geometry, Point)
     assert math.isclose(feature.geometry.x, 25.052854537963867)
     assert math.isclose(feature.geometry.y, 60.10136032104492)
+
+
+def test_watermark_is_advanced(requests_mock, importer, places_response):
+    requests_mock.get(PLACES_URL, json=places_response)
+
+    importer.import_features()
+
+    source_type = SourceType.objects.get(system="myhelsinki", type="place")
+    assert source_type.watermark == datetime.datetime(2019, 10, 29, 11, 6, 56).replace(
+        tzinfo=utc
+    )
+
+
+def test_unchanged_features_are_skipped(requests_mock, importer, places_response):
+    requests_mock.get(PLACES_URL, json=places_response)
+    importer.import_features()
+    places_response["data"][0]["name"]["fi"] = "Changed without modified_at"
+
+    with freeze_time("2030-01-01 12:00:00"):
+        importer.import_features()
+
+    feature = Feature.objects.get(source_id="2792")
+    assert feature.name == "Isosaari"
+    assert importer.counts["skipped"] == 3
+    # Skipped features are still marked as mapped
+    assert feature.mapped_at == datetime.datetime(2030, 1, 1, 12).replace(tzinfo=utc)
+
+
+def test_modified_features_are_imported(requests_mock, importer, places_response):
+    requests_mock.get(PLACES_URL, json=places_response)
+    importer.import_features()
+    places_response["data"][0]["name"]["fi"] = "Modified"
+    places_response["data"][0]["modified_at"] = "2019-04-05T10:00:00.000Z"
+
+    importer.import_features()
+
+    assert Feature.objects.get(source_id="2792").name == "Modified"
+    assert importer.counts["skipped"] == 2
+
+
+def test_full_import_updates_unchanged_features(
+    requests_mock, importer, places_response
+):
+    requests_mock.get(PLACES_URL, json=places_response)
+    importer.import_features()
+    places_response["data"][0]["name"]["fi"] = "Changed without modified_at"
+
+    importer = MyHelsinkiImporter(full=True)
+    importer.import_features()
+
+    assert Feature.objects.get(source_id="2792").name == "Changed without modified_at"
+    assert importer.counts["skipped"] == 0
+
+
+def test_not_modified_calls_are_skipped(
+    requests_mock, importer, places_response, settings, tmp_path
+):
+    settings.IMPORTER_HTTP_CACHE_DIR = str(tmp_path)
+    requests_mock.get(
+        PLACES_URL,
+        [{"json": places_response, "headers": {"ETag": '"v1"'}}, {"status_code": 304}],
+    )
+    importer.import_features()
+    FeatureTranslation.objects.update(name="Not updated")
+
+    importer.import_features()
+
+    assert importer.counts["not_modified"] == 1
+    assert importer.counts["processed"] == 3
+    assert FeatureTranslation.objects.filter(name="Not updated").count() == 3
+
+
+def test_failed_call_is_processed_again(
+    requests_mock, importer, places_response, settings, tmp_path, mocker
+):
+    settings.IMPORTER_HTTP_CACHE_DIR = str(tmp_path)
+    requests_mock.get(PLACES_URL, json=places_response, headers={"ETag": '"v1"'})
+    mocker.patch.object(
+        importer, "_process_features", side_effect=DatabaseError("Write failed")
+    )
+    importer.import_features()
+    assert importer.api_calls[0].error
+
+    importer = MyHelsinkiImporter()
+    importer.import_features()
+
+    # The response of the failed call was not cached
+    assert "If-None-Match" not in requests_mock.request_history[1].headers
+    assert importer.counts["not_modified"] == 0
+    assert Feature.objects.count() == 3
+
+
+def test_failing_api_call_does_not_prevent_other_calls(
+    requests_mock, importer, places_response, settings
+):
+    settings.IMPORTER_HTTP_RETRIES = 0
+    settings.MYHELSINKI_PLACES_API_CALLS = [{"tags_search": "Island"}, {}]
+    requests_mock.get(PLACES_URL, json=places_response)
+    requests_mock.get(f"{PLACES_URL}?tags_search=Island", status_code=500)
+
+    with pytest.raises(ImportIncomplete):
+        importer.run("myhelsinki_places")
+
+    assert Feature.objects.count() == 3
+    assert [call.label for call in importer.api_calls] == ["tags_search=Island", "all"]
+    assert importer.api_calls[0].error
+    assert not importer.api_calls[1].error
+    # The watermark is not advanced after an incomplete import
+    assert SourceType.objects.get(system="myhelsinki").watermark is None
@@ -53,3 +53,40 @@ def test_feature_translations_are_imported(
     assert feature.description == pytest_regex("^Sveaborg är ett magnifikt Unescos.*")
     assert feature.url == "http://www.suomenlinna.fi"
     assert ohp.comment == pytest_regex("^Sveaborg är.*")
+
+
+def test_features_are_written_once_with_all_translations(
+    requests_mock, importer, places_response, translations_responses, mocker
+):
+    requests_mock.get(f"{PLACES_URL}?language_filter=fi", json=places_response)
+    requests_mock.get(
+        f"{PLACES_URL}?language_filter=en", json=translations_responses["en"]
+    )
+    requests_mock.get(
+        f"{PLACES_URL}?language_filter=sv", json=translations_responses["sv"]
+    )
+    save = mocker.spy(Feature, "save")
+
+    importer.import_features()
+
+    assert save.call_count == Feature.objects.count() == 3
+    assert importer.counts["processed"] == 3
+
+
+def test_places_missing_from_main_language_are_ignored(
+    requests_mock, importer, places_response, translations_responses
+):
+    translations_responses["en"]["data"].append(
+        {**translations_responses["en"]["data"][0], "id": "only-in-english"}
+    )
+    requests_mock.get(f"{PLACES_URL}?language_filter=fi", json=places_response)
+    requests_mock.get(
+        f"{PLACES_URL}?language_filter=en", json=translations_responses["en"]
+    )
+    requests_mock.get(
+        f"{PLACES_URL}?language_filter=sv", json=translations_responses["sv"]
+    )
+
+    importer.import_features()
+
+    assert not Feature.objects.filter(source_id="only-in-english").exists()
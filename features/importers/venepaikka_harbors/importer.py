@@ -1,16 +1,32 @@
-from typing import Iterable, Mapping
+from typing import Dict, Iterable, List, Mapping, Optional
 
 import jmespath
 import requests
 from django.conf import settings
 from django.contrib.gis.geos import Point
+from django.core.cache import cache
 from django.utils import timezone
+from parler.cache import get_translation_cache_key
 
 from categories.models import Category
 from features.enums import FeatureDetailsType, FeatureTagSource, HarborMooringType
+from features.importers import http
 from features.importers.base import FeatureImporterBase
 from features.importers.venepaikka_harbors import app_settings
-from features.models import ContactInfo, Feature, Image, License, SourceType, Tag
+from features.models import (
+    ContactInfo,
+    Feature,
+    FeatureDetails,
+    FeatureTag,
+    FeatureTranslation,
+    get_effective_name,
+    get_name_overrides,
+    Image,
+    License,
+    Link,
+    SourceType,
+    Tag,
+)
 
 query = """
 query Harbors {
@@ -93,8 +109,29 @@ class VenepaikkaImporter(FeatureImporterBase):
     def import_features(self):
         source_type = self.get_source_type()
         client = VenepaikkaHarborsClient()
-        harbors = client.fetch_harbors(query=query).json()
-
+        with self.api_call("harbors"):
+            with self.stage("fetch"):
+                response = client.fetch_harbors(query=query)
+            self.counts["http_bytes"] += http.transferred_bytes(response)
+            if not self.full and http.not_modified(response):
+                # Nothing has changed since the previous import
+                self.counts["not_modified"] += 1
+                return
+
+            with self.stage("map"):
+                harbors = feature_expression.search(response.json())
+            with self.stage("write"):
+                self._process_features(harbors, source_type)
+
+    def _process_features(self, harbors: Iterable[dict], source_type: SourceType):
+        """Import data for features represented in the mapped source data.
+
+        The existing features and their related objects are loaded in bulk, and
+        the changes are written with set-based inserts, updates and deletes, so
+        that the number of queries doesn't depend on the number of harbours. The
+        features whose names, locations, categories, tags or images changed are
+        added to `changed_feature_ids`.
+        """
         # Category, tag and image license is the same for all harbours
         category, created = Category.objects.language("fi").update_or_create(
             id=app_settings.CATEGORY_CONFIG["id"],
@@ -112,124 +149,282 @@ class VenepaikkaImporter(FeatureImporterBase):
                 name=app_settings.IMAGE_LICENSE
             )
 
-        for harbor in feature_expression.search(harbors):
-            feature = self._import_feature(harbor, source_type)
-            self._set_feature_category(feature, category)
-            self._set_feature_tag(feature, tag)
-            self._import_feature_contact_info(feature, harbor["address"])
-            self._import_service_map_url(feature, harbor["servicemap_id"])
-            self._import_feature_images(feature, harbor["images"], image_license)
-            self._import_harbor_details(feature, harbor["harbor_details"])
-
-    @staticmethod
-    def _import_feature(harbor: dict, st: SourceType) -> Feature:
-        values = {
-            "name": harbor["name"],
-            "mapped_at": timezone.now(),
-            "source_modified_at": timezone.now(),
-            "geometry": Point(harbor["lon"], harbor["lat"], srid=settings.DEFAULT_SRID),
+        # The last occurrence wins if a harbour is listed several times
+        harbors = list({harbor["id"]: harbor for harbor in harbors}.values())
+        self.counts["processed"] += len(harbors)
+        features = self._import_features(harbors, source_type, category)
+        self._import_feature_names(harbors, features)
+        self._set_feature_tags(features, tag)
+        self._import_contact_infos(harbors, features)
+        self._import_service_map_urls(harbors, features)
+        self._import_feature_images(harbors, features, image_license)
+        self._import_harbor_details(harbors, features)
+
+    def _import_features(
+        self, harbors: List[dict], st: SourceType, category: Category
+    ) -> Dict[str, Feature]:
+        """Create and update the features of the harbours.
+
+        Return the features by their source id. Pre-existing categories on
+        features are not updated.
+        """
+        existing_features = {
+            feature.source_id: feature
+            for feature in Feature.objects.filter(
+                source_type=st, source_id__in=[harbor["id"] for harbor in harbors]
+            )
         }
-        feature, created = Feature.objects.language("fi").update_or_create(
-            source_type=st, source_id=harbor["id"], defaults=values,
+        now = timezone.now()
+        features = {}
+        new_features = []
+        for harbor in harbors:
+            feature = existing_features.get(harbor["id"])
+            if feature is None:
+                feature = Feature(source_type=st, source_id=harbor["id"])
+                new_features.append(feature)
+            feature.mapped_at = now
+            feature.source_modified_at = now
+            # bulk_update() doesn't update auto_now fields
+            feature.modified_at = now
+            geometry = Point(harbor["lon"], harbor["lat"], srid=settings.DEFAULT_SRID)
+            if feature.pk and feature.geometry != geometry:
+                self.changed_feature_ids.add(feature.pk)
+            feature.geometry = geometry
+            # bulk_create() and bulk_update() don't call save()
+            feature.geography = feature.geometry
+            if category and not feature.category_id:
+                feature.category = category
+                if feature.pk:
+                    self.changed_feature_ids.add(feature.pk)
+            features[harbor["id"]] = feature
+
+        Feature.objects.bulk_create(new_features)
+        self.changed_feature_ids.update(feature.pk for feature in new_features)
+        Feature.objects.bulk_update(
+            existing_features.values(),
+            [
+                "mapped_at",
+                "source_modified_at",
+                "modified_at",
+                "geometry",
+                "geography",
+                "category",
+            ],
         )
-        return feature
+        self.counts["created"] += len(new_features)
+        self.counts["updated"] += len(existing_features)
+        return features
 
-    def _set_feature_category(self, feature: Feature, category: Category):
-        """Set category for the given Feature.
+    def _import_feature_names(self, harbors: List[dict], features: Dict[str, Feature]):
+        """Write the Finnish names of the features.
 
-        Pre-existing categories on features are not updated.
+        The translation cache of parler is not updated by bulk writes, so the
+        cached translations of the written names are deleted.
         """
-        if category and not feature.category:
-            feature.category = category
-            Feature.objects.filter(pk=feature.pk).update(category=category)
+        translations = {
+            translation.master_id: translation
+            for translation in FeatureTranslation.objects.filter(
+                master__in=features.values(), language_code="fi"
+            )
+        }
+        name_overrides = get_name_overrides(feature.pk for feature in features.values())
+        new_translations = []
+        changed_translations = []
+        for harbor in harbors:
+            feature = features[harbor["id"]]
+            translation = translations.get(feature.pk)
+            effective_name = get_effective_name(
+                harbor["name"], "fi", name_overrides.get(feature.pk, {})
+            )
+            if translation is None:
+                new_translations.append(
+                    FeatureTranslation(
+                        master=feature,
+                        language_code="fi",
+                        name=harbor["name"],
+                        effective_name=effective_name,
+                    )
+                )
+            elif (
+                translation.name != harbor["name"]
+                or translation.effective_name != effective_name
+            ):
+                translation.name = harbor["name"]
+                translation.effective_name = effective_name
+                changed_translations.append(translation)
+
+        FeatureTranslation.objects.bulk_create(new_translations)
+        FeatureTranslation.objects.bulk_update(
+            changed_translations, ["name", "effective_name"]
+        )
+        self.changed_feature_ids.update(
+            translation.master_id
+            for translation in new_translations + changed_translations
+        )
+        cache.delete_many(
+            [
+                get_translation_cache_key(
+                    FeatureTranslation, translation.master_id, "fi"
+                )
+                for translation in new_translations + changed_translations
+            ]
+        )
 
-    def _set_feature_tag(self, feature: Feature, tag: Tag):
-        """Set tags for the given feature.
+    def _set_feature_tags(self, features: Dict[str, Feature], tag: Optional[Tag]):
+        """Set the mapped tag for the features.
 
         Manually set tags for a feature are kept.
         """
-        feature_tags = [tag] if tag else []
+        feature_tags = FeatureTag.objects.filter(feature__in=features.values())
+        stale_feature_tags = feature_tags.filter(source=FeatureTagSource.MAPPING)
+        if tag:
+            stale_feature_tags = stale_feature_tags.exclude(tag=tag)
+        self.changed_feature_ids.update(
+            stale_feature_tags.values_list("feature_id", flat=True)
+        )
+        stale_feature_tags.delete()
+
+        if tag:
+            tagged_feature_ids = set(
+                feature_tags.filter(tag=tag).values_list("feature_id", flat=True)
+            )
+            new_feature_tags = [
+                FeatureTag(feature=feature, tag=tag)
+                for feature in features.values()
+                if feature.pk not in tagged_feature_ids
+            ]
+            FeatureTag.objects.bulk_create(new_feature_tags)
+            self.changed_feature_ids.update(
+                feature_tag.feature_id for feature_tag in new_feature_tags
+            )
+
+    @staticmethod
+    def _import_contact_infos(harbors: List[dict], features: Dict[str, Feature]):
+        """Imports contact info for the features.
 
-        manually_set_tags = [
-            ft.tag
-            for ft in feature.feature_tags.filter(
-                source=FeatureTagSource.MANUAL
-            ).select_related("tag")
+        The contact info is deleted if source doesn't provide this information.
+        """
+        existing_contact_infos = {
+            contact_info.feature_id: contact_info
+            for contact_info in ContactInfo.objects.filter(
+                feature__in=features.values()
+            )
+        }
+        fields = [
+            "street_address",
+            "postal_code",
+            "municipality",
+            "phone_number",
+            "email",
         ]
-        feature_tags.extend(manually_set_tags)
-        feature.tags.set(feature_tags)
+        new_contact_infos = []
+        changed_contact_infos = []
+        stale_contact_infos = []
+        for harbor in harbors:
+            feature = features[harbor["id"]]
+            contact_info = existing_contact_infos.get(feature.pk)
+            values = {field: harbor["address"][field] or "" for field in fields}
+            if not any(values.values()):
+                if contact_info:
+                    stale_contact_infos.append(contact_info.pk)
+            elif contact_info is None:
+                new_contact_infos.append(ContactInfo(feature=feature, **values))
+            elif any(getattr(contact_info, f) != v for f, v in values.items()):
+                for field, value in values.items():
+                    setattr(contact_info, field, value)
+                changed_contact_infos.append(contact_info)
+
+        ContactInfo.objects.filter(pk__in=stale_contact_infos).delete()
+        ContactInfo.objects.bulk_create(new_contact_infos)
+        ContactInfo.objects.bulk_update(changed_contact_infos, fields)
+
+    def _import_service_map_urls(
+        self, harbors: List[dict], features: Dict[str, Feature]
+    ):
+        existing_links = {
+            link.feature_id: link
+            for link in Link.objects.filter(
+                feature__in=features.values(), type=self.servicemap_link_type
+            )
+        }
+        new_links = []
+        changed_links = []
+        stale_links = []
+        for harbor in harbors:
+            feature = features[harbor["id"]]
+            link = existing_links.get(feature.pk)
+            if not harbor["servicemap_id"]:
+                if link:
+                    stale_links.append(link.pk)
+                continue
+            url = f"{self.servicemap_url}{harbor['servicemap_id']}"
+            if link is None:
+                new_links.append(
+                    Link(feature=feature, type=self.servicemap_link_type, url=url)
+                )
+            elif link.url != url:
+                link.url = url
+                changed_links.append(link)
+
+        Link.objects.filter(pk__in=stale_links).delete()
+        Link.objects.bulk_create(new_links)
+        Link.objects.bulk_update(changed_links, ["url"])
 
     def _import_feature_images(
-        self, feature: Feature, images: Iterable[dict], license: License
+        self, harbors: List[dict], features: Dict[str, Feature], license: License
     ):
-        """Imports images for a feature and sets the image license.
+        """Imports images for the features and sets the image license.
 
         Stale images no longer available in the source are removed.
         """
-        processed_images = []
-        if not images:
-            images = []
-
-        for url in images:
-            if not url:
-                continue
-
-            Image.objects.update_or_create(
-                feature=feature,
-                url=url,
-                defaults={
-                    "copyright_owner": self.image_copyright_owner,
-                    "license": license,
-                },
-            )
-            processed_images.append(url)
+        existing_images = {
+            (image.feature_id, image.url): image
+            for image in Image.objects.filter(feature__in=features.values())
+        }
+        new_images = []
+        changed_images = []
+        for harbor in harbors:
+            feature = features[harbor["id"]]
+            for url in filter(None, dict.fromkeys(harbor["images"] or [])):
+                image = existing_images.pop((feature.pk, url), None)
+                if image is None:
+                    new_images.append(
+                        Image(
+                            feature=feature,
+                            url=url,
+                            copyright_owner=self.image_copyright_owner,
+                            license=license,
+                        )
+                    )
+                elif (
+                    image.copyright_owner != self.image_copyright_owner
+                    or image.license_id != license.pk
+                ):
+                    image.copyright_owner = self.image_copyright_owner
+                    image.license = license
+                    changed_images.append(image)
 
         # Remove images that are unusable or no longer available in the source
-        feature.images.exclude(url__in=processed_images).delete()
-
-    def _import_feature_contact_info(self, feature: Feature, address: dict):
-        """Imports contact info for the given feature."""
-        if not (
-            address["street_address"]
-            or address["postal_code"]
-            or address["municipality"]
-            or address["phone_number"]
-            or address["email"]
-        ):
-            # Delete the contact info if source doesn't provide this information
-            if hasattr(feature, "contact_info"):
-                feature.contact_info.delete()
-        else:
-            ContactInfo.objects.update_or_create(
-                feature=feature,
-                defaults={
-                    "street_address": address["street_address"] or "",
-                    "postal_code": address["postal_code"] or "",
-                    "municipality": address["municipality"] or "",
-                    "phone_number": address["phone_number"] or "",
-                    "email": address["email"] or "",
-                },
-            )
-
-    def _import_service_map_url(self, feature: Feature, servicemap_id: str):
-        if not servicemap_id:
-            feature.links.filter(type=self.servicemap_link_type).delete()
-        else:
-            feature.links.update_or_create(
-                type=self.servicemap_link_type,
-                defaults={"url": f"{self.servicemap_url}{servicemap_id}"},
-            )
+        Image.objects.filter(
+            pk__in=[image.pk for image in existing_images.values()]
+        ).delete()
+        Image.objects.bulk_create(new_images)
+        self.changed_feature_ids.update(
+            image.feature_id for image in [*existing_images.values(), *new_images]
+        )
+        Image.objects.bulk_update(changed_images, ["copyright_owner", "license"])
 
     @staticmethod
-    def _import_harbor_details(feature: Feature, harbor_details: Mapping):
-        """Import mooring types and berth depths available on the given harbour."""
+    def _get_harbor_details_data(harbor_details: Mapping) -> dict:
+        """Return mooring types and berth depths available on the given harbour."""
         data = {}
 
         if harbor_details["berth_moorings"]:
             mapped_berth_moorings = []
             # Process and map external moorings into ahti internal ones
             # Unmapped moorings are ignored
-            berth_moorings = set(harbor_details["berth_moorings"])
+            # Sorted to compare the data with the previously imported data
+            berth_moorings = sorted(set(harbor_details["berth_moorings"]))
             for berth_mooring in berth_moorings:
                 mapped_string = app_settings.MOORING_MAPPING.get(berth_mooring)
 
@@ -245,12 +440,39 @@ class VenepaikkaImporter(FeatureImporterBase):
             data["berth_min_depth"] = min(harbor_details["berth_depths"])
             data["berth_max_depth"] = max(harbor_details["berth_depths"])
 
-        if data:
-            feature.details.update_or_create(
-                type=FeatureDetailsType.HARBOR, defaults={"data": data}
+        return data
+
+    def _import_harbor_details(self, harbors: List[dict], features: Dict[str, Feature]):
+        """Import the harbour details of the features."""
+        existing_details = {
+            details.feature_id: details
+            for details in FeatureDetails.objects.filter(
+                feature__in=features.values(), type=FeatureDetailsType.HARBOR
             )
-        else:
-            feature.details.filter(type=FeatureDetailsType.HARBOR).delete()
+        }
+        new_details = []
+        changed_details = []
+        stale_details = []
+        for harbor in harbors:
+            feature = features[harbor["id"]]
+            details = existing_details.get(feature.pk)
+            data = self._get_harbor_details_data(harbor["harbor_details"])
+            if not data:
+                if details:
+                    stale_details.append(details.pk)
+            elif details is None:
+                new_details.append(
+                    FeatureDetails(
+                        feature=feature, type=FeatureDetailsType.HARBOR, data=data
+                    )
+                )
+            elif details.data != data:
+                details.data = data
+                changed_details.append(details)
+
+        FeatureDetails.objects.filter(pk__in=stale_details).delete()
+        FeatureDetails.objects.bulk_create(new_details)
+        FeatureDetails.objects.bulk_update(changed_details, ["data"])
 
 
 class VenepaikkaHarborsClient:
@@ -258,6 +480,6 @@ class VenepaikkaHarborsClient:
     timeout = 20
 
     def fetch_harbors(self, query: str) -> requests.Response:
-        response = requests.post(self.url, json={"query": query}, timeout=self.timeout)
-        response.raise_for_status()
-        return response
+        return http.request(
+            "POST", self.url, json_data={"query": query}, timeout=self.timeout
+        )
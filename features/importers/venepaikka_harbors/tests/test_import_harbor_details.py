@@ -1,9 +1,14 @@
 import math
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from features.enums import FeatureDetailsType, HarborMooringType
-from features.importers.venepaikka_harbors.importer import VenepaikkaHarborsClient
+from features.importers.venepaikka_harbors.importer import (
+    VenepaikkaHarborsClient,
+    VenepaikkaImporter,
+)
 from features.models import Feature, FeatureDetails
 from features.tests.factories import FeatureDetailsFactory
 
@@ -67,6 +72,22 @@ def test_update_harbor_details(requests_mock, importer, harbors_response):
     assert "berth_moorings" in details.data
 
 
+def test_unchanged_harbor_details_are_not_updated(
+    requests_mock, importer, harbors_response
+):
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+    importer.import_features()
+
+    with CaptureQueriesContext(connection) as queries:
+        VenepaikkaImporter().import_features()
+
+    assert not [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith('UPDATE "features_featuredetails"')
+    ]
+
+
 def test_delete_harbor_details(requests_mock, importer, harbors_response):
     FeatureDetailsFactory(
         feature__source_type=importer.get_source_type(),
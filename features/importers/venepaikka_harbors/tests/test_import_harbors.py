@@ -1,13 +1,21 @@
+import copy
 import datetime
+import json
 import math
 
 from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import utc
 from freezegun import freeze_time
 
-from features.importers.venepaikka_harbors.importer import VenepaikkaHarborsClient
-from features.models import Feature, SourceType
-from features.tests.factories import LinkFactory
+from features.enums import ImportRunStatus, OverrideFieldType
+from features.importers.venepaikka_harbors.importer import (
+    VenepaikkaHarborsClient,
+    VenepaikkaImporter,
+)
+from features.models import Feature, ImportRun, SourceType
+from features.tests.factories import LinkFactory, OverrideFactory
 
 HARBORS_URL = VenepaikkaHarborsClient.url
 HARBOR_ID = "SGFyYm9yTm9kZTpiNzE0ODE1NC1kYmE5LTRlM2ItOWQ2ZS1jNTYzNmEyNWFhMzk="
@@ -87,3 +95,93 @@ def test_geometry_is_correct(requests_mock, importer, harbors_response):
     assert isinstance(feature.geometry, Point)
     assert math.isclose(feature.geometry.x, 24.884083)
     assert math.isclose(feature.geometry.y, 60.193653)
+
+
+def test_import_run_is_recorded(requests_mock, importer, harbors_response):
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+    importer.run("venepaikka_harbors")
+
+    VenepaikkaImporter().run("venepaikka_harbors")
+
+    first_run, second_run = ImportRun.objects.order_by("started_at")
+    assert first_run.status == ImportRunStatus.SUCCEEDED
+    assert first_run.records_seen == 2
+    assert first_run.records_created == 2
+    assert second_run.records_created == 0
+    assert second_run.records_updated == 2
+    assert second_run.http_bytes == len(json.dumps(harbors_response))
+    assert second_run.sql_statements > 0
+    assert second_run.finished_at >= second_run.started_at
+    assert [call["label"] for call in second_run.api_calls] == ["harbors"]
+
+
+def test_feature_name_is_updated(requests_mock, importer, harbors_response):
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+    importer.import_features()
+    # Cache the translation of the name
+    assert Feature.objects.get(source_id=HARBOR_ID).name.startswith("Ramsaynrannan")
+    for harbor in harbors_response["data"]["harbors"]["edges"]:
+        harbor["node"]["properties"]["name"] = "Uusi nimi"
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+
+    importer.import_features()
+
+    assert Feature.objects.get(source_id=HARBOR_ID).name == "Uusi nimi"
+
+
+def test_feature_name_override_is_applied(requests_mock, importer, harbors_response):
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+    importer.import_features()
+    feature = Feature.objects.get(source_id=HARBOR_ID)
+    OverrideFactory(
+        feature=feature, field=OverrideFieldType.NAME, string_value="Ohitettu"
+    )
+    for harbor in harbors_response["data"]["harbors"]["edges"]:
+        harbor["node"]["properties"]["name"] = "Uusi nimi"
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+
+    importer.import_features()
+
+    feature = Feature.objects.get(source_id=HARBOR_ID)
+    assert feature.name == "Uusi nimi"
+    assert feature.effective_name == "Ohitettu"
+
+
+def test_only_changed_features_are_collected(requests_mock, importer, harbors_response):
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+    importer.import_features()
+    assert importer.changed_feature_ids == set(
+        Feature.objects.values_list("pk", flat=True)
+    )
+    importer.changed_feature_ids.clear()
+    harbor = harbors_response["data"]["harbors"]["edges"][0]["node"]
+    harbor["properties"]["name"] = "Uusi nimi"
+    requests_mock.post(HARBORS_URL, json=harbors_response)
+
+    importer.import_features()
+
+    assert importer.changed_feature_ids == {
+        Feature.objects.get(source_id=harbor["id"]).pk
+    }
+
+
+def test_number_of_queries_does_not_depend_on_harbors(
+    requests_mock, importer, harbors_response
+):
+    def import_harbors(count):
+        response = copy.deepcopy(harbors_response)
+        edges = response["data"]["harbors"]["edges"]
+        response["data"]["harbors"]["edges"] = [
+            {"node": {**edge["node"], "id": f"{edge['node']['id']}-{i}"}}
+            for i in range(count)
+            for edge in edges
+        ]
+        requests_mock.post(HARBORS_URL, json=response)
+        with CaptureQueriesContext(connection) as queries:
+            importer.import_features()
+        return len(queries)
+
+    # Create the shared objects (category, tag, license) first
+    import_harbors(1)
+
+    assert import_harbors(2) == import_harbors(10)
@@ -0,0 +1,85 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from features.importers.benchmark import ImporterBenchmark, replays
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the importers by replaying recorded API responses. "
+        "Reports wall time, SQL statements, rows written and peak memory per stage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--single", help="Benchmark a single importer with identifier"
+        )
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=1,
+            help="Duplicate the places in the recorded responses this many times",
+        )
+        parser.add_argument(
+            "--responses",
+            help="Directory containing the recorded responses to replay "
+            "(defaults to the responses recorded for the importer tests)",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the imported data instead of rolling it back",
+        )
+        parser.add_argument(
+            "--no-memory",
+            action="store_true",
+            help="Don't trace memory allocations (tracing slows down execution)",
+        )
+
+    def handle(self, *args, **options):
+        single_importer = options["single"]
+        identifiers = list(replays.keys())
+
+        if single_importer:
+            if single_importer not in replays:
+                self.stderr.write(
+                    self.style.ERROR(
+                        f"{single_importer} doesn't support replaying responses."
+                    )
+                )
+                sys.exit(1)
+            identifiers = [single_importer]
+
+        for identifier in identifiers:
+            benchmark = ImporterBenchmark(
+                identifier,
+                scale=options["scale"],
+                keep=options["keep"],
+                responses_dir=options["responses"],
+                trace_memory=not options["no_memory"],
+            ).run()
+            self.write_report(benchmark)
+
+    def write_report(self, benchmark: ImporterBenchmark):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{benchmark.identifier}: {benchmark.record_count} records "
+                f"in {benchmark.duration:.3f} s"
+            )
+        )
+        self.stdout.write(
+            f"{'stage':<8}{'wall (s)':>12}{'SQL':>10}{'SQL (s)':>12}"
+            f"{'rows written':>14}{'peak memory (KiB)':>20}"
+        )
+        for stage in benchmark.stages.values():
+            peak_memory = (
+                f"{stage.peak_memory / 1024:.1f}"
+                if stage.peak_memory is not None
+                else "-"
+            )
+            self.stdout.write(
+                f"{stage.name:<8}{stage.duration:>12.3f}{stage.queries.count:>10}"
+                f"{stage.queries.duration:>12.3f}{stage.queries.rows_written:>14}"
+                f"{peak_memory:>20}"
+            )
@@ -1,13 +1,65 @@
 import logging
+import multiprocessing
 import sys
+import time
+from typing import NamedTuple, Optional, Tuple
 
 from django.core.management.base import BaseCommand
+from django.db import connections
 
+from features.importers.base import ApiCallResult, ImportSkipped
 from features.importers.registry import importers
 
 logging.getLogger(__name__)
 
 
+class ImportResult(NamedTuple):
+    identifier: str
+    duration: float
+    error: Optional[str] = None
+    # Reason for skipping the import
+    skipped: Optional[str] = None
+    calls: Tuple[ApiCallResult, ...] = ()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def run_importer(
+    identifier: str, full: bool = False, lock_timeout: float = 0
+) -> ImportResult:
+    """Run the importer registered with the identifier and time it."""
+    importer_class = importers.registry[identifier]
+    importer = importer_class(full=full, lock_timeout=lock_timeout)
+    start = time.perf_counter()
+    try:
+        importer.run(identifier)
+    except ImportSkipped as e:
+        return ImportResult(identifier, time.perf_counter() - start, skipped=str(e))
+    except Exception as e:
+        logging.exception(f"Importer {importer_class} failed to import data")
+        return ImportResult(
+            identifier,
+            time.perf_counter() - start,
+            repr(e),
+            calls=tuple(importer.api_calls),
+        )
+    return ImportResult(
+        identifier, time.perf_counter() - start, calls=tuple(importer.api_calls)
+    )
+
+
+def run_importer_in_process(
+    identifier: str, full: bool = False, lock_timeout: float = 0
+) -> ImportResult:
+    try:
+        return run_importer(identifier, full, lock_timeout)
+    finally:
+        # The worker process exits after the import
+        connections.close_all()
+
+
 class Command(BaseCommand):
     help = "Import features using the configured importers"
 
@@ -21,6 +73,26 @@ class Command(BaseCommand):
             action="store_true",
             help="List all the configured importer identifiers",
         )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Import all the data, including data unchanged since the "
+            "previous import",
+        )
+        parser.add_argument(
+            "-p",
+            "--parallel",
+            type=int,
+            default=1,
+            help="Number of importers run concurrently in separate processes",
+        )
+        parser.add_argument(
+            "--lock-timeout",
+            type=float,
+            default=0,
+            help="Seconds to wait for a running import of the same source to "
+            "finish before skipping the importer (default: skip immediately)",
+        )
 
     def handle(self, *args, **options):
         single_importer = options["single"]
@@ -43,13 +115,92 @@ class Command(BaseCommand):
                 lambda values: values[0] == single_importer, enabled_importers,
             )
 
-        for identifier, importer_class in enabled_importers:
+        identifiers = [identifier for identifier, _ in enabled_importers]
+        start = time.perf_counter()
+        if options["parallel"] > 1 and len(identifiers) > 1:
+            results = self.run_parallel(identifiers, options["parallel"], options)
+        else:
+            results = self.run_sequential(identifiers, options)
+        duration = time.perf_counter() - start
+
+        self.write_summary(results, duration)
+        if not all(result.succeeded for result in results):
+            sys.exit(1)
+
+    def run_sequential(self, identifiers, options):
+        results = []
+        for identifier in identifiers:
             self.stdout.write(self.style.SUCCESS(f"Importing {identifier}"))
-            try:
-                importer_class().import_features()
-            except Exception:
-                message = f"Importer {importer_class} failed to import data"
-                logging.exception(message)
-                self.stderr.write(self.style.ERROR(message))
-
-        self.stdout.write(self.style.SUCCESS("Feature importers completed"))
+            result = run_importer(identifier, options["full"], options["lock_timeout"])
+            self.write_result(result)
+            results.append(result)
+        return results
+
+    def run_parallel(self, identifiers, processes, options):
+        """Run the importers in forked processes with their own DB connections."""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Importing {', '.join(identifiers)} in {processes} processes"
+            )
+        )
+        # Connections must not be shared with the forked processes
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes, maxtasksperchild=1) as pool:
+            pending = [
+                pool.apply_async(
+                    run_importer_in_process,
+                    (identifier, options["full"], options["lock_timeout"]),
+                )
+                for identifier in identifiers
+            ]
+            results = []
+            for identifier, async_result in zip(identifiers, pending):
+                try:
+                    result = async_result.get()
+                except Exception as e:
+                    # The result could not be returned from the worker process
+                    result = ImportResult(identifier, 0.0, repr(e))
+                self.write_result(result)
+                results.append(result)
+        return results
+
+    def write_result(self, result: ImportResult):
+        for call in result.calls:
+            if call.error:
+                self.stderr.write(
+                    f"{result.identifier} {call.label}: failed after "
+                    f"{call.duration:.1f} s: {call.error}"
+                )
+            else:
+                self.stdout.write(
+                    f"{result.identifier} {call.label}: {call.duration:.1f} s"
+                )
+        if result.skipped:
+            self.stdout.write(
+                self.style.WARNING(f"{result.identifier} skipped: {result.skipped}")
+            )
+        elif result.succeeded:
+            self.stdout.write(
+                f"{result.identifier} imported in {result.duration:.1f} s"
+            )
+        else:
+            self.stderr.write(
+                self.style.ERROR(
+                    f"{result.identifier} failed after {result.duration:.1f} s: "
+                    f"{result.error}"
+                )
+            )
+
+    def write_summary(self, results, duration: float):
+        failed = [result.identifier for result in results if not result.succeeded]
+        skipped = [result.identifier for result in results if result.skipped]
+        message = (
+            f"Feature importers completed in {duration:.1f} s: "
+            f"{len(results) - len(failed) - len(skipped)} succeeded, "
+            f"{len(skipped)} skipped, {len(failed)} failed"
+        )
+        if failed:
+            self.stderr.write(self.style.ERROR(f"{message} ({', '.join(failed)})"))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from features.cards import refresh_feature_cards
+from features.models import Feature
+
+
+class Command(BaseCommand):
+    help = "Rebuild the feature cards of all the features"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of features refreshed in a transaction",
+        )
+
+    def handle(self, *args, **options):
+        feature_ids = list(Feature.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = options["batch_size"]
+        for start in range(0, len(feature_ids), batch_size):
+            end = start + batch_size
+            refresh_feature_cards(feature_ids[start:end])
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed the cards of {len(feature_ids)} features")
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.3 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0022_add_draft_visibility_for_feature"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sourcetype",
+            name="watermark",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Most recent modification time imported from the source",
+                null=True,
+                verbose_name="watermark",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.0.3 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0023_sourcetype_watermark"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="feature",
+            name="visibility",
+            field=models.SmallIntegerField(
+                choices=[
+                    (0, "Hidden"),
+                    (1, "Visible"),
+                    (2, "Draft"),
+                    (3, "Removed from source"),
+                ],
+                default=1,
+            ),
+        ),
+    ]
@@ -0,0 +1,170 @@
+# Generated by Django 3.0.3 on 2026-10-19 16:20
+
+import django.contrib.postgres.fields.jsonb
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0024_feature_visibility_removed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportRun",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "importer",
+                    models.CharField(
+                        help_text="Identifier of the importer",
+                        max_length=200,
+                        verbose_name="importer",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("RUNNING", "Running"),
+                            ("SUCCEEDED", "Succeeded"),
+                            ("INCOMPLETE", "Incomplete"),
+                            ("FAILED", "Failed"),
+                            ("SKIPPED", "Skipped"),
+                        ],
+                        default="RUNNING",
+                        max_length=16,
+                        verbose_name="status",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="error")),
+                (
+                    "started_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="started at"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="finished at"
+                    ),
+                ),
+                (
+                    "duration",
+                    models.FloatField(
+                        default=0,
+                        help_text="Wall time in seconds",
+                        verbose_name="duration",
+                    ),
+                ),
+                (
+                    "fetch_duration",
+                    models.FloatField(default=0, verbose_name="fetch duration"),
+                ),
+                (
+                    "map_duration",
+                    models.FloatField(default=0, verbose_name="map duration"),
+                ),
+                (
+                    "write_duration",
+                    models.FloatField(default=0, verbose_name="write duration"),
+                ),
+                (
+                    "reconcile_duration",
+                    models.FloatField(default=0, verbose_name="reconcile duration"),
+                ),
+                (
+                    "records_seen",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of records in the source data",
+                        verbose_name="records seen",
+                    ),
+                ),
+                (
+                    "records_created",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="records created"
+                    ),
+                ),
+                (
+                    "records_updated",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="records updated"
+                    ),
+                ),
+                (
+                    "records_unchanged",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of records skipped as unchanged since "
+                        "the last import",
+                        verbose_name="records unchanged",
+                    ),
+                ),
+                (
+                    "records_removed",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of features hidden or deleted as missing "
+                        "from the source",
+                        verbose_name="records removed",
+                    ),
+                ),
+                (
+                    "http_bytes",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Size of the response bodies received from the "
+                        "source",
+                        verbose_name="HTTP bytes",
+                    ),
+                ),
+                (
+                    "sql_statements",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="SQL statements"
+                    ),
+                ),
+                (
+                    "api_calls",
+                    django.contrib.postgres.fields.jsonb.JSONField(
+                        default=list,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Label, duration and error of each API call",
+                        verbose_name="API calls",
+                    ),
+                ),
+                (
+                    "source_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="import_runs",
+                        to="features.SourceType",
+                        verbose_name="source type",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "import run",
+                "verbose_name_plural": "import runs",
+                "ordering": ("-started_at",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="importrun",
+            index=models.Index(
+                fields=["importer", "-started_at"], name="import_run_importer_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,144 @@
+# Generated by Django 3.0.3 on 2026-10-19 17:05
+
+from datetime import timedelta
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+from psycopg2.extras import DateRange, NumericRange
+
+# The conversion of features.opening_hours as of this migration
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def get_validity(valid_from, valid_to, days=0):
+    return DateRange(
+        valid_from + timedelta(days=days) if valid_from else None,
+        valid_to + timedelta(days=days + 1) if valid_to else None,
+        "[)",
+    )
+
+
+def get_intervals(valid_from, valid_to, opening_hours):
+    validity = get_validity(valid_from, valid_to)
+    intervals = []
+    for hours in opening_hours:
+        start_of_day = (hours.day - 1) * MINUTES_PER_DAY
+        end_of_day = start_of_day + MINUTES_PER_DAY
+        if hours.all_day:
+            intervals.append((NumericRange(start_of_day, end_of_day), validity))
+            continue
+        if hours.opens is None or hours.closes is None:
+            continue
+
+        opens = start_of_day + to_minutes(hours.opens)
+        closes = start_of_day + to_minutes(hours.closes)
+        if closes > opens:
+            intervals.append((NumericRange(opens, closes), validity))
+            continue
+
+        intervals.append((NumericRange(opens, end_of_day), validity))
+        if closes > start_of_day:
+            next_day = end_of_day % MINUTES_PER_WEEK
+            intervals.append(
+                (
+                    NumericRange(next_day, next_day + closes - start_of_day),
+                    get_validity(valid_from, valid_to, days=1),
+                )
+            )
+    return intervals
+
+
+def create_opening_hours_intervals(apps, schema_editor):
+    OpeningHoursInterval = apps.get_model("features", "OpeningHoursInterval")
+    OpeningHoursPeriod = apps.get_model("features", "OpeningHoursPeriod")
+
+    periods = OpeningHoursPeriod.objects.prefetch_related("opening_hours")
+    OpeningHoursInterval.objects.bulk_create(
+        [
+            OpeningHoursInterval(
+                feature_id=period.feature_id,
+                period=period,
+                minutes=minutes,
+                validity=validity,
+            )
+            for period in periods
+            for minutes, validity in get_intervals(
+                period.valid_from, period.valid_to, period.opening_hours.all()
+            )
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0025_importrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OpeningHoursInterval",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "minutes",
+                    django.contrib.postgres.fields.ranges.IntegerRangeField(
+                        help_text="Minutes of the week (from Monday 00:00) when open",
+                        verbose_name="minutes",
+                    ),
+                ),
+                (
+                    "validity",
+                    django.contrib.postgres.fields.ranges.DateRangeField(
+                        help_text="Dates on which the interval applies",
+                        verbose_name="validity",
+                    ),
+                ),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="opening_hours_intervals",
+                        to="features.Feature",
+                        verbose_name="feature",
+                    ),
+                ),
+                (
+                    "period",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="intervals",
+                        to="features.OpeningHoursPeriod",
+                        verbose_name="opening hours period",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "opening hours interval",
+                "verbose_name_plural": "opening hours intervals",
+                "ordering": ("id",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="openinghoursinterval",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["minutes", "validity"], name="opening_hours_interval_idx"
+            ),
+        ),
+        migrations.RunPython(create_opening_hours_intervals, migrations.RunPython.noop),
+    ]
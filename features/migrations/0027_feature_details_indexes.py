@@ -0,0 +1,39 @@
+# Generated by Django 3.0.3 on 2026-10-19 17:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0026_openinghoursinterval"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="featuredetails",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["data"],
+                name="feature_details_data_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        # Indexes of FeatureDetailsQuerySet.harbor_depths() expressions
+        migrations.RunSQL(
+            [
+                "CREATE INDEX feature_details_berth_min_depth_idx "
+                "ON features_featuredetails "
+                "(((data ->> 'berth_min_depth')::double precision)) "
+                "WHERE type = 'HARBOR'",
+                "CREATE INDEX feature_details_berth_max_depth_idx "
+                "ON features_featuredetails "
+                "(((data ->> 'berth_max_depth')::double precision)) "
+                "WHERE type = 'HARBOR'",
+            ],
+            [
+                "DROP INDEX feature_details_berth_min_depth_idx",
+                "DROP INDEX feature_details_berth_max_depth_idx",
+            ],
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 3.0.3 on 2026-10-19 18:15
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0001_initial"),
+        ("features", "0027_feature_details_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeatureCard",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "language_code",
+                    models.CharField(max_length=15, verbose_name="language"),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of the feature, overridden name if overridden",
+                        max_length=200,
+                        verbose_name="name",
+                    ),
+                ),
+                (
+                    "category_name",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="category name"
+                    ),
+                ),
+                (
+                    "tag_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(max_length=200),
+                        default=list,
+                        size=None,
+                        verbose_name="tag ids",
+                    ),
+                ),
+                (
+                    "image_url",
+                    models.URLField(
+                        blank=True,
+                        help_text="URL of the first image of the feature",
+                        max_length=2000,
+                        verbose_name="image url",
+                    ),
+                ),
+                (
+                    "location",
+                    django.contrib.gis.db.models.fields.PointField(
+                        help_text="A point on the geometry of the feature",
+                        srid=4326,
+                        verbose_name="location",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="categories.Category",
+                        verbose_name="category",
+                    ),
+                ),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cards",
+                        to="features.Feature",
+                        verbose_name="feature",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "feature card",
+                "verbose_name_plural": "feature cards",
+                "ordering": ("feature_id",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="featurecard",
+            constraint=models.UniqueConstraint(
+                fields=("language_code", "feature"), name="unique_feature_card"
+            ),
+        ),
+    ]
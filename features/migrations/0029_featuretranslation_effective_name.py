@@ -0,0 +1,46 @@
+# Generated by Django 3.0.3 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+# Name overrides in the language of the translation or in the default language
+SET_EFFECTIVE_NAMES = """
+UPDATE features_feature_translation AS translation
+SET effective_name = COALESCE(
+    (
+        SELECT LEFT(override_translation.string_value, 200)
+        FROM features_override AS override
+        JOIN features_override_translation AS override_translation
+            ON override_translation.master_id = override.id
+        WHERE override.feature_id = translation.master_id
+            AND override.field = 'NAME'
+            AND override_translation.string_value <> ''
+            AND override_translation.language_code
+                IN (translation.language_code, 'fi')
+        ORDER BY override_translation.language_code = translation.language_code DESC
+        LIMIT 1
+    ),
+    translation.name
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0028_featurecard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="featuretranslation",
+            name="effective_name",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Name of the feature, overridden name if overridden",
+                max_length=200,
+                verbose_name="effective name",
+            ),
+        ),
+        migrations.RunSQL(SET_EFFECTIVE_NAMES, migrations.RunSQL.noop),
+    ]
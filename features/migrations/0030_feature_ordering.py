@@ -0,0 +1,59 @@
+# Generated by Django 3.0.3 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+# The ICU collations of the languages, predefined in databases built with ICU
+CREATE_COLLATIONS = [
+    f'CREATE COLLATION IF NOT EXISTS "{language_code}-x-icu" '
+    f"(provider = icu, locale = '{language_code}')"
+    for language_code in ("fi", "sv", "en")
+]
+
+SET_OVERRIDES_MODIFIED_AT = """
+UPDATE features_feature AS feature
+SET overrides_modified_at = (
+    SELECT MAX(override.modified_at)
+    FROM features_override AS override
+    WHERE override.feature_id = feature.id
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0029_featuretranslation_effective_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feature",
+            name="overrides_modified_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Most recent time when the overrides of the feature were "
+                "modified",
+                null=True,
+                verbose_name="overrides modified at",
+            ),
+        ),
+        migrations.RunSQL(SET_OVERRIDES_MODIFIED_AT, migrations.RunSQL.noop),
+        migrations.RunSQL(CREATE_COLLATIONS, migrations.RunSQL.noop),
+        # Indexes of the FeatureQuerySet.order_by_keys() expressions
+        migrations.RunSQL(
+            [
+                "CREATE INDEX feature_translation_name_idx "
+                "ON features_feature_translation "
+                '((effective_name COLLATE "fi-x-icu"), master_id) '
+                "WHERE language_code = 'fi'",
+                "CREATE INDEX feature_effective_modified_at_idx "
+                "ON features_feature "
+                "((GREATEST(source_modified_at, overrides_modified_at)), id)",
+            ],
+            [
+                "DROP INDEX feature_translation_name_idx",
+                "DROP INDEX feature_effective_modified_at_idx",
+            ],
+        ),
+    ]
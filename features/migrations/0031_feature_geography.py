@@ -0,0 +1,41 @@
+# Generated by Django 3.0.3 on 2026-10-19 19:30
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0030_feature_ordering"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feature",
+            name="geography",
+            field=django.contrib.gis.db.models.fields.GeometryField(
+                editable=False,
+                geography=True,
+                help_text="Geometry of the feature for measuring distances in meters",
+                null=True,
+                srid=4326,
+                verbose_name="geography",
+            ),
+        ),
+        migrations.RunSQL(
+            "UPDATE features_feature SET geography = geometry::geography",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="feature",
+            name="geography",
+            field=django.contrib.gis.db.models.fields.GeometryField(
+                editable=False,
+                geography=True,
+                help_text="Geometry of the feature for measuring distances in meters",
+                srid=4326,
+                verbose_name="geography",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.0.3 on 2026-10-19 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("features", "0031_feature_geography"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feature",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Key given by the client that created the feature via "
+                "the API",
+                max_length=64,
+                null=True,
+                verbose_name="idempotency key",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="feature",
+            constraint=models.UniqueConstraint(
+                fields=("source_type", "idempotency_key"),
+                name="unique_feature_idempotency_key",
+            ),
+        ),
+    ]
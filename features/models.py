@@ -1,9 +1,31 @@
+from collections import defaultdict
 from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
 
 from django.contrib.gis.db import models
-from django.contrib.postgres.fields import JSONField
+from django.contrib.gis.db.models.functions import GeometryDistance
+from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.postgres.fields import (
+    ArrayField,
+    DateRangeField,
+    IntegerRangeField,
+    JSONField,
+)
+from django.contrib.postgres.fields.jsonb import KeyTextTransform
+from django.contrib.postgres.indexes import GinIndex, GistIndex
 from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
+from django.db.models import (
+    F,
+    FilteredRelation,
+    Func,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from parler.models import TranslatedFields
@@ -12,6 +34,7 @@ from ahti import settings
 from features.enums import (
     FeatureDetailsType,
     FeatureTagSource,
+    ImportRunStatus,
     OverrideFieldType,
     Visibility,
     Weekday,
@@ -28,6 +51,12 @@ class SourceType(models.Model):
     type = models.CharField(
         verbose_name=_("type"), max_length=200, help_text=_("Type of the source")
     )
+    watermark = models.DateTimeField(
+        verbose_name=_("watermark"),
+        blank=True,
+        null=True,
+        help_text=_("Most recent modification time imported from the source"),
+    )
 
     class Meta:
         verbose_name = _("source type")
@@ -43,6 +72,35 @@ class SourceType(models.Model):
         return f"{self.system}:{self.type}"
 
 
+EFFECTIVE_NAME_MAX_LENGTH = 200
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+
+def get_effective_name(name: str, language_code: str, name_overrides: dict) -> str:
+    """Return the name overridden in the language or in the default language."""
+    effective_name = (
+        name_overrides.get(language_code)
+        or name_overrides.get(settings.PARLER_DEFAULT_LANGUAGE_CODE)
+        or name
+    )
+    # Overrides are not limited in length like the names
+    return effective_name[:EFFECTIVE_NAME_MAX_LENGTH]
+
+
+# Collations for sorting the names in each language. The collations are created
+# by a migration if the database doesn't provide them.
+NAME_COLLATIONS = {"fi": "fi-x-icu", "sv": "sv-x-icu", "en": "en-x-icu"}
+
+
+class Collate(Func):
+    """Expression compared with the rules of the given collation."""
+
+    template = '%(expressions)s COLLATE "%(collation)s"'
+
+    def __init__(self, expression, collation: str):
+        super().__init__(expression, collation=collation)
+
+
 class FeatureQuerySet(TranslatableQuerySet):
     def ahti_id(self, ahti_id: str):
         """Return a single Feature matching the given ahti_id."""
@@ -58,6 +116,94 @@ class FeatureQuerySet(TranslatableQuerySet):
             source_id=parts[2],
         )
 
+    def order_by_keys(
+        self, keys: List[str], language_code: str, point: Optional[GEOSGeometry] = None,
+    ):
+        """Order the features by name, effective modification time or distance.
+
+        The keys are `name`, `modified_at` and `distance` (from the point),
+        prefixed with `-` for descending order. The features are ordered by id
+        after the keys, except after distance, so that the first key can use its
+        index. Each ordering has an index:
+
+        - names in the default language `feature_translation_name_idx`. Names in
+          the other languages fall back to the default language and are sorted
+          without an index.
+        - effective modification times `feature_effective_modified_at_idx`
+        - distances the spatial index of the geographies (KNN)
+        """
+        queryset = self
+        ordering = []
+        descending = False
+        for key in keys:
+            descending = key.startswith("-")
+            key = key.lstrip("-")
+            if key == "name":
+                queryset, expression = queryset._with_ordering_name(language_code)
+            elif key == "modified_at":
+                expression = self.effective_modified_at()
+            elif key == "distance":
+                expression = self.distance_from(point)
+            else:
+                raise ValueError(f"Unknown ordering key {key}")
+            ordering.append(expression.desc() if descending else expression.asc())
+        if ordering and key != "distance":
+            ordering.append(F("id").desc() if descending else F("id").asc())
+        return queryset.order_by(*ordering)
+
+    def nearest(self, point: GEOSGeometry):
+        """Return the features ordered by distance from the point, nearest first.
+
+        The features are ordered with the KNN operator using the spatial index
+        and annotated with `distance`, their distance from the point in meters.
+        """
+        return self.annotate(distance=self.distance_from(point)).order_by("distance")
+
+    @staticmethod
+    def distance_from(point: GEOSGeometry):
+        """Return the KNN distance expression of the features from the point.
+
+        The distance between geographies is measured in meters on a sphere.
+        """
+        return GeometryDistance(
+            "geography",
+            Value(
+                point,
+                output_field=models.GeometryField(
+                    srid=settings.DEFAULT_SRID, geography=True
+                ),
+            ),
+        )
+
+    @staticmethod
+    def effective_modified_at():
+        """Return the expression of `Feature.effective_modified_at`.
+
+        GREATEST ignores null values in PostgreSQL.
+        """
+        return Greatest("source_modified_at", "overrides_modified_at")
+
+    def _with_ordering_name(self, language_code: str):
+        """Return the features joined with their names and the name to sort by.
+
+        Every feature has a translation in the default language.
+        """
+        default_language_code = settings.PARLER_DEFAULT_LANGUAGE_CODE
+        queryset = self.annotate(
+            default_translation=FilteredRelation(
+                "translations",
+                condition=Q(translations__language_code=default_language_code),
+            )
+        ).filter(default_translation__language_code=default_language_code)
+        name = F("default_translation__effective_name")
+        if language_code != default_language_code:
+            translations = self.model._parler_meta.root_model.objects.filter(
+                master=OuterRef("pk"), language_code=language_code
+            ).exclude(effective_name="")
+            name = Coalesce(Subquery(translations.values("effective_name")), name)
+        collation = NAME_COLLATIONS.get(language_code)
+        return queryset, Collate(name, collation) if collation else name
+
 
 class Feature(TranslatableModel, TimestampedModel):
     source_id = models.CharField(
@@ -91,12 +237,26 @@ class Feature(TranslatableModel, TimestampedModel):
             blank=True,
             help_text=_("Description of the feature"),
         ),
+        effective_name=models.CharField(
+            verbose_name=_("effective name"),
+            max_length=EFFECTIVE_NAME_MAX_LENGTH,
+            blank=True,
+            editable=False,
+            help_text=_("Name of the feature, overridden name if overridden"),
+        ),
     )
     geometry = models.GeometryField(
         verbose_name=_("geometry"),
         srid=settings.DEFAULT_SRID,
         help_text=_("Geometry of the feature"),
     )
+    geography = models.GeometryField(
+        verbose_name=_("geography"),
+        geography=True,
+        srid=settings.DEFAULT_SRID,
+        editable=False,
+        help_text=_("Geometry of the feature for measuring distances in meters"),
+    )
     source_modified_at = models.DateTimeField(
         verbose_name=_("source modified at"),
         help_text=_("Time when the feature was modified in the source data"),
@@ -128,6 +288,21 @@ class Feature(TranslatableModel, TimestampedModel):
     visibility = models.SmallIntegerField(
         choices=Visibility.choices, default=Visibility.VISIBLE
     )
+    overrides_modified_at = models.DateTimeField(
+        verbose_name=_("overrides modified at"),
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("Most recent time when the overrides of the feature were modified"),
+    )
+    idempotency_key = models.CharField(
+        verbose_name=_("idempotency key"),
+        max_length=IDEMPOTENCY_KEY_MAX_LENGTH,
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("Key given by the client that created the feature via the API"),
+    )
 
     objects = FeatureQuerySet.as_manager()
 
@@ -139,6 +314,11 @@ class Feature(TranslatableModel, TimestampedModel):
             models.UniqueConstraint(
                 fields=["source_type", "source_id"], name="unique_source_feature"
             ),
+            # Retried requests are detected by the key
+            models.UniqueConstraint(
+                fields=["source_type", "idempotency_key"],
+                name="unique_feature_idempotency_key",
+            ),
         ]
 
     def __str__(self):
@@ -148,6 +328,110 @@ class Feature(TranslatableModel, TimestampedModel):
     def ahti_id(self):
         return f"{self.source_type.system}:{self.source_type.type}:{self.source_id}"
 
+    def save(self, *args, **kwargs):
+        self.geography = self.geometry
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "geometry" in update_fields:
+            kwargs["update_fields"] = [*update_fields, "geography"]
+        super().save(*args, **kwargs)
+
+    @property
+    def effective_modified_at(self):
+        """Time when the feature was modified in the source or overridden."""
+        if self.overrides_modified_at:
+            return max(self.source_modified_at, self.overrides_modified_at)
+        return self.source_modified_at
+
+    def update_overrides_modified_at(self):
+        """Store the modification time of the overrides after they have changed."""
+        self.overrides_modified_at = self.overrides.aggregate(
+            modified_at=Max("modified_at")
+        )["modified_at"]
+        Feature.objects.filter(pk=self.pk).update(
+            overrides_modified_at=self.overrides_modified_at
+        )
+
+    def get_name_overrides(self) -> dict:
+        """Return the values of the name override of the feature by language."""
+        return get_name_overrides([self.pk]).get(self.pk, {})
+
+    def get_effective_name_in(
+        self, language_code: str, name_overrides: Optional[dict] = None
+    ) -> str:
+        """Return the name of the feature in the language with the override applied.
+
+        The effective names are stored on the translations. A name overridden in a
+        language the feature has no translation in is looked up from the
+        overrides, or from `name_overrides` if given.
+        """
+        if (
+            not self.overrides_modified_at
+            or language_code in self.get_available_languages()
+        ):
+            return self.safe_translation_getter(
+                "effective_name", "", language_code=language_code
+            )
+        if name_overrides is None:
+            name_overrides = self.get_name_overrides()
+        return get_effective_name(
+            self.safe_translation_getter("name", "", language_code=language_code),
+            language_code,
+            name_overrides,
+        )
+
+    def save_translations(self, *args, **kwargs):
+        # Fetched once for all the saved translations
+        self._name_overrides = self.get_name_overrides()
+        try:
+            super().save_translations(*args, **kwargs)
+        finally:
+            del self._name_overrides
+
+    def save_translation(self, translation, *args, **kwargs):
+        if translation.pk is None or translation.is_modified:
+            name_overrides = getattr(self, "_name_overrides", None)
+            if name_overrides is None:
+                name_overrides = self.get_name_overrides()
+            translation.effective_name = get_effective_name(
+                translation.name, translation.language_code, name_overrides
+            )
+        super().save_translation(translation, *args, **kwargs)
+
+    def prepare_translations(self, translations):
+        name_overrides = self.get_name_overrides()
+        for translation in translations:
+            translation.effective_name = get_effective_name(
+                translation.name, translation.language_code, name_overrides
+            )
+
+    def update_effective_names(self):
+        """Recalculate the effective names after the name override has changed."""
+        name_overrides = self.get_name_overrides()
+        for translation in self.translations.all():
+            effective_name = get_effective_name(
+                translation.name, translation.language_code, name_overrides
+            )
+            if translation.effective_name != effective_name:
+                translation.effective_name = effective_name
+                # Saved one by one to update the translation cache
+                translation.save(update_fields=["effective_name"])
+
+
+class FeatureDetailsQuerySet(models.QuerySet):
+    def harbor_depths(self):
+        """Return harbor details annotated with their berth depths.
+
+        The expressions match the expression indexes on the depth keys.
+        """
+        return self.filter(type=FeatureDetailsType.HARBOR).annotate(
+            berth_min_depth=Cast(
+                KeyTextTransform("berth_min_depth", "data"), models.FloatField()
+            ),
+            berth_max_depth=Cast(
+                KeyTextTransform("berth_max_depth", "data"), models.FloatField()
+            ),
+        )
+
 
 class FeatureDetails(models.Model):
     feature = models.ForeignKey(
@@ -170,6 +454,8 @@ class FeatureDetails(models.Model):
         encoder=DjangoJSONEncoder,
     )
 
+    objects = FeatureDetailsQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("feature details")
         verbose_name_plural = _("feature details")
@@ -179,6 +465,14 @@ class FeatureDetails(models.Model):
                 fields=["feature", "type"], name="unique_feature_detail_type"
             ),
         ]
+        indexes = [
+            # Indexes containment (@>) lookups, e.g. harbors by mooring type
+            GinIndex(
+                fields=["data"],
+                opclasses=["jsonb_path_ops"],
+                name="feature_details_data_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{gettext(FeatureDetailsType(self.type).label)}"
@@ -473,6 +767,55 @@ class OpeningHours(models.Model):
         return f"{gettext(Weekday(self.day).label)}: {hours_string}"
 
 
+class OpeningHoursInterval(models.Model):
+    """Opening hours of a period as a range of minutes of the week.
+
+    Minutes are counted from Monday 00:00 in local time. The intervals are
+    computed from the opening hours with `refresh_opening_hours_intervals()`.
+    """
+
+    feature = models.ForeignKey(
+        Feature,
+        on_delete=models.CASCADE,
+        related_name="opening_hours_intervals",
+        verbose_name=_("feature"),
+    )
+    period = models.ForeignKey(
+        OpeningHoursPeriod,
+        on_delete=models.CASCADE,
+        related_name="intervals",
+        verbose_name=_("opening hours period"),
+    )
+    minutes = IntegerRangeField(
+        verbose_name=_("minutes"),
+        help_text=_("Minutes of the week (from Monday 00:00) when open"),
+    )
+    validity = DateRangeField(
+        verbose_name=_("validity"), help_text=_("Dates on which the interval applies")
+    )
+
+    class Meta:
+        verbose_name = _("opening hours interval")
+        verbose_name_plural = _("opening hours intervals")
+        ordering = ("id",)
+        indexes = [
+            GistIndex(
+                fields=["minutes", "validity"], name="opening_hours_interval_idx"
+            ),
+        ]
+
+
+def get_name_overrides(feature_ids: Iterable[int]) -> Dict[int, dict]:
+    """Return the values of the name overrides by feature and language."""
+    name_overrides = defaultdict(dict)
+    values = Override._parler_meta.root_model.objects.filter(
+        master__feature__in=feature_ids, master__field=OverrideFieldType.NAME
+    ).values_list("master__feature_id", "language_code", "string_value")
+    for feature_id, language_code, value in values:
+        name_overrides[feature_id][language_code] = value
+    return dict(name_overrides)
+
+
 class Override(TranslatableModel, TimestampedModel):
     feature = models.ForeignKey(
         Feature,
@@ -501,6 +844,17 @@ class Override(TranslatableModel, TimestampedModel):
             return self.safe_translation_getter("string_value", "")
         return None
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.feature.update_overrides_modified_at()
+        self.feature.update_effective_names()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.feature.update_overrides_modified_at()
+        self.feature.update_effective_names()
+        return result
+
     class Meta:
         verbose_name = _("override")
         verbose_name_plural = _("overrides")
@@ -510,3 +864,144 @@ class Override(TranslatableModel, TimestampedModel):
                 fields=["feature", "field"], name="unique_override_feature_field"
             ),
         ]
+
+
+class FeatureCard(models.Model):
+    """Summary of a visible feature in one language, for listing features.
+
+    The cards are denormalized from the features and their related objects by
+    `refresh_feature_cards()`.
+    """
+
+    feature = models.ForeignKey(
+        Feature,
+        on_delete=models.CASCADE,
+        related_name="cards",
+        verbose_name=_("feature"),
+    )
+    language_code = models.CharField(max_length=15, verbose_name=_("language"))
+    name = models.CharField(
+        max_length=200,
+        verbose_name=_("name"),
+        help_text=_("Name of the feature, overridden name if overridden"),
+    )
+    category = models.ForeignKey(
+        "categories.Category",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        verbose_name=_("category"),
+    )
+    category_name = models.CharField(
+        max_length=200, blank=True, verbose_name=_("category name")
+    )
+    tag_ids = ArrayField(
+        models.CharField(max_length=200), default=list, verbose_name=_("tag ids")
+    )
+    image_url = models.URLField(
+        max_length=2000,
+        blank=True,
+        verbose_name=_("image url"),
+        help_text=_("URL of the first image of the feature"),
+    )
+    location = models.PointField(
+        verbose_name=_("location"),
+        srid=settings.DEFAULT_SRID,
+        help_text=_("A point on the geometry of the feature"),
+    )
+
+    class Meta:
+        verbose_name = _("feature card")
+        verbose_name_plural = _("feature cards")
+        ordering = ("feature_id",)
+        constraints = [
+            # Also the index of listing the cards of a language
+            models.UniqueConstraint(
+                fields=["language_code", "feature"], name="unique_feature_card"
+            ),
+        ]
+
+
+class ImportRun(models.Model):
+    """A run of an importer, for following the import performance over time."""
+
+    importer = models.CharField(
+        max_length=200,
+        verbose_name=_("importer"),
+        help_text=_("Identifier of the importer"),
+    )
+    source_type = models.ForeignKey(
+        SourceType,
+        on_delete=models.CASCADE,
+        related_name="import_runs",
+        verbose_name=_("source type"),
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=ImportRunStatus.choices,
+        default=ImportRunStatus.RUNNING,
+        verbose_name=_("status"),
+    )
+    error = models.TextField(blank=True, verbose_name=_("error"))
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name=_("started at"))
+    finished_at = models.DateTimeField(
+        blank=True, null=True, verbose_name=_("finished at")
+    )
+    duration = models.FloatField(
+        default=0, verbose_name=_("duration"), help_text=_("Wall time in seconds")
+    )
+    fetch_duration = models.FloatField(default=0, verbose_name=_("fetch duration"))
+    map_duration = models.FloatField(default=0, verbose_name=_("map duration"))
+    write_duration = models.FloatField(default=0, verbose_name=_("write duration"))
+    reconcile_duration = models.FloatField(
+        default=0, verbose_name=_("reconcile duration")
+    )
+    records_seen = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("records seen"),
+        help_text=_("Number of records in the source data"),
+    )
+    records_created = models.PositiveIntegerField(
+        default=0, verbose_name=_("records created")
+    )
+    records_updated = models.PositiveIntegerField(
+        default=0, verbose_name=_("records updated")
+    )
+    records_unchanged = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("records unchanged"),
+        help_text=_("Number of records skipped as unchanged since the last import"),
+    )
+    records_removed = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("records removed"),
+        help_text=_("Number of features hidden or deleted as missing from the source"),
+    )
+    http_bytes = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("HTTP bytes"),
+        help_text=_("Size of the response bodies received from the source"),
+    )
+    sql_statements = models.PositiveIntegerField(
+        default=0, verbose_name=_("SQL statements")
+    )
+    api_calls = JSONField(
+        default=list,
+        encoder=DjangoJSONEncoder,
+        verbose_name=_("API calls"),
+        help_text=_("Label, duration and error of each API call"),
+    )
+
+    class Meta:
+        verbose_name = _("import run")
+        verbose_name_plural = _("import runs")
+        ordering = ("-started_at",)
+        indexes = [
+            models.Index(
+                fields=["importer", "-started_at"], name="import_run_importer_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.importer} {self.started_at:%Y-%m-%d %H:%M:%S}"
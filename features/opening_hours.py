@@ -0,0 +1,104 @@
+"""Opening hours as weekly intervals for finding the features open at a given time.
+
+The opening hours of each day are converted into ranges of minutes of the week,
+counted from Monday 00:00 in local time (`TIME_ZONE`). Opening hours past
+midnight are split at midnight, and the part after midnight is valid on the
+days following the validity of the period.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+from psycopg2.extras import DateRange, NumericRange
+
+from features.models import OpeningHoursInterval, OpeningHoursPeriod
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def get_minute_of_week(value: datetime) -> Tuple[int, date]:
+    """Return the minute of the week and the date of the time in local time."""
+    local_value = timezone.localtime(value, timezone.get_default_timezone())
+    return (
+        local_value.weekday() * MINUTES_PER_DAY + to_minutes(local_value.time()),
+        local_value.date(),
+    )
+
+
+def get_validity(
+    valid_from: Optional[date], valid_to: Optional[date], days: int = 0
+) -> DateRange:
+    """Return the validity of a period as a date range, shifted by `days`."""
+    return DateRange(
+        valid_from + timedelta(days=days) if valid_from else None,
+        valid_to + timedelta(days=days + 1) if valid_to else None,
+        "[)",
+    )
+
+
+def get_intervals(
+    valid_from: Optional[date], valid_to: Optional[date], opening_hours: Iterable
+) -> List[Tuple[NumericRange, DateRange]]:
+    """Return the intervals (minutes of the week, validity) of the opening hours.
+
+    Opening hours without both the opening and the closing time are ignored,
+    since it can't be known when the feature is open. Closing at the same time
+    or before opening means closing on the next day.
+    """
+    validity = get_validity(valid_from, valid_to)
+    intervals = []
+    for hours in opening_hours:
+        start_of_day = (hours.day - 1) * MINUTES_PER_DAY
+        end_of_day = start_of_day + MINUTES_PER_DAY
+        if hours.all_day:
+            intervals.append((NumericRange(start_of_day, end_of_day), validity))
+            continue
+        if hours.opens is None or hours.closes is None:
+            continue
+
+        opens = start_of_day + to_minutes(hours.opens)
+        closes = start_of_day + to_minutes(hours.closes)
+        if closes > opens:
+            intervals.append((NumericRange(opens, closes), validity))
+            continue
+
+        intervals.append((NumericRange(opens, end_of_day), validity))
+        if closes > start_of_day:
+            next_day = end_of_day % MINUTES_PER_WEEK
+            intervals.append(
+                (
+                    NumericRange(next_day, next_day + closes - start_of_day),
+                    get_validity(valid_from, valid_to, days=1),
+                )
+            )
+    return intervals
+
+
+@transaction.atomic
+def refresh_opening_hours_intervals(feature_ids: Iterable[int]):
+    """Recompute the opening hours intervals of the features."""
+    feature_ids = list(feature_ids)
+    OpeningHoursInterval.objects.filter(feature_id__in=feature_ids).delete()
+    periods = OpeningHoursPeriod.objects.filter(
+        feature_id__in=feature_ids
+    ).prefetch_related("opening_hours")
+    OpeningHoursInterval.objects.bulk_create(
+        [
+            OpeningHoursInterval(
+                feature_id=period.feature_id,
+                period=period,
+                minutes=minutes,
+                validity=validity,
+            )
+            for period in periods
+            for minutes, validity in get_intervals(
+                period.valid_from, period.valid_to, period.opening_hours.all()
+            )
+        ]
+    )
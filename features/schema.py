@@ -1,27 +1,39 @@
 import uuid
+from typing import Iterable, List, Tuple
 
 import django_filters
 import graphene
 import graphql_geojson
 from django.apps import apps
-from django.db import transaction
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from graphene import ID, ObjectType, relay, String
 from graphene_django import DjangoObjectType
+from graphene_django.fields import DjangoConnectionField
 from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.settings import graphene_settings
+from graphene_django.utils import maybe_queryset
 from graphql import GraphQLError
-from graphql_geojson.filters import DistanceFilter
+from graphql_geojson.filters import DistanceFilter, GeometryFilter
+from graphql_geojson.types import Geometry
+from graphql_relay import to_global_id
+from graphql_relay.utils import base64, unbase64
 
 from categories.models import Category
 from features import models
-from features.enums import HarborMooringType, OverrideFieldType, Visibility, Weekday
-from utils.graphene import LanguageEnum, StringListFilter
+from features.cards import get_card_language, refresh_feature_cards
+from features.enums import FeatureDetailsType, HarborMooringType, Visibility, Weekday
+from features.opening_hours import get_minute_of_week
+from utils.graphene import generate_enum_filter_class, LanguageEnum, StringListFilter
 
 HarborMooringTypeEnum = graphene.Enum.from_enum(
     HarborMooringType, description=lambda e: e.label if e else ""
 )
+HarborMooringTypeFilter = generate_enum_filter_class(HarborMooringTypeEnum)
 
 WeekdayEnum = graphene.Enum.from_enum(
     Weekday, description=lambda e: e.label if e else ""
@@ -124,7 +136,7 @@ class FeatureTranslations(DjangoObjectType):
 
     class Meta:
         model = apps.get_model("features", "FeatureTranslation")
-        exclude = ("id", "master")
+        exclude = ("id", "master", "effective_name")
 
 
 class Image(DjangoObjectType):
@@ -259,11 +271,18 @@ class FeatureFilter(django_filters.FilterSet):
             "tagged_with_any",
             "tagged_with_all",
             "category",
+            "open_at",
+            "harbor_mooring",
+            "min_berth_depth",
+            "max_berth_depth",
+            "distance_from",
+            "order_by",
         ]
 
+    # ST_DWithin() on the geographies uses their spatial index
     distance_lte = DistanceFilter(
-        field_name="geometry",
-        lookup_expr="distance_lte",
+        field_name="geography",
+        lookup_expr="dwithin",
         label=_("Fetch features within a given distance from the given geometry"),
     )
     updated_since = django_filters.IsoDateTimeFilter(
@@ -281,11 +300,45 @@ class FeatureFilter(django_filters.FilterSet):
     category = StringListFilter(
         method="filter_category", label=_("Fetch features from included categories")
     )
+    open_at = django_filters.IsoDateTimeFilter(
+        method="filter_open_at",
+        label=_("Fetch features that are open at the specified time"),
+    )
+    harbor_mooring = HarborMooringTypeFilter(
+        choices=HarborMooringType.choices,
+        method="filter_harbor_mooring",
+        label=_("Fetch harbors with the specified mooring type"),
+    )
+    min_berth_depth = django_filters.NumberFilter(
+        method="filter_min_berth_depth",
+        label=_("Fetch harbors with berths at least this deep (in meters)"),
+    )
+    max_berth_depth = django_filters.NumberFilter(
+        method="filter_max_berth_depth",
+        label=_("Fetch harbors with berths at most this deep (in meters)"),
+    )
+
+    distance_from = GeometryFilter(
+        method="filter_distance_from",
+        label=_("Point from which the distance is measured when ordering by distance"),
+    )
+    order_by = django_filters.OrderingFilter(
+        fields=(
+            ("name", "name"),
+            ("modified_at", "modifiedAt"),
+            ("distance", "distance"),
+        ),
+        method="filter_order_by",
+        label=_(
+            "Order the features by name, modification time or distance from "
+            "`distanceFrom`. Prefix with `-` for descending order."
+        ),
+    )
 
     def filter_updated_since(self, queryset, name, value):
         return queryset.filter(
-            Q(overrides__modified_at__gt=value) | Q(source_modified_at__gt=value)
-        ).distinct()  # Distinct because filtering on ForeignKey relation.
+            Q(overrides_modified_at__gt=value) | Q(source_modified_at__gt=value)
+        )
 
     def filter_tagged_with_any(self, queryset, name, value):
         return queryset.filter(
@@ -300,6 +353,42 @@ class FeatureFilter(django_filters.FilterSet):
     def filter_category(self, queryset, name, value):
         return queryset.filter(category__in=value)
 
+    def filter_open_at(self, queryset, name, value):
+        minute, date = get_minute_of_week(value)
+        intervals = models.OpeningHoursInterval.objects.filter(
+            minutes__contains=minute, validity__contains=date
+        )
+        return queryset.filter(pk__in=intervals.values("feature_id"))
+
+    def filter_harbor_mooring(self, queryset, name, value):
+        details = models.FeatureDetails.objects.filter(
+            type=FeatureDetailsType.HARBOR, data__contains={"berth_moorings": [value]}
+        )
+        return queryset.filter(pk__in=details.values("feature_id"))
+
+    def filter_min_berth_depth(self, queryset, name, value):
+        details = models.FeatureDetails.objects.harbor_depths().filter(
+            berth_max_depth__gte=float(value)
+        )
+        return queryset.filter(pk__in=details.values("feature_id"))
+
+    def filter_max_berth_depth(self, queryset, name, value):
+        details = models.FeatureDetails.objects.harbor_depths().filter(
+            berth_min_depth__lte=float(value)
+        )
+        return queryset.filter(pk__in=details.values("feature_id"))
+
+    def filter_distance_from(self, queryset, name, value):
+        # Used by filter_order_by()
+        return queryset
+
+    def filter_order_by(self, queryset, name, value):
+        keys = [self.filters[name].get_ordering_value(param) for param in value]
+        point = self.form.cleaned_data.get("distance_from")
+        if point is None and any(key.lstrip("-") == "distance" for key in keys):
+            raise GraphQLError("You must provide `distanceFrom` to order by distance.")
+        return queryset.order_by_keys(keys, get_card_language(), point)
+
 
 class Feature(graphql_geojson.GeoJSONType):
     """Features in Ahti are structured according to GeoJSON specification.
@@ -370,18 +459,10 @@ class Feature(graphql_geojson.GeoJSONType):
         }
 
     def resolve_name(self: models.Feature, info, **kwargs):
-        name_override = self.overrides.filter(field=OverrideFieldType.NAME).first()
-        if name_override:
-            return name_override.value
-        return self.name
+        return self.get_effective_name_in(self.get_current_language())
 
     def resolve_modified_at(self: models.Feature, info, **kwargs):
-        latest_override = self.overrides.order_by("-modified_at").first()
-        return (
-            max(self.source_modified_at, latest_override.modified_at)
-            if latest_override
-            else self.source_modified_at
-        )
+        return self.effective_modified_at
 
     def resolve_details(self: models.Feature, info, **kwargs):
         details = {}
@@ -427,6 +508,105 @@ class Feature(graphql_geojson.GeoJSONType):
         )
 
 
+class NearestFeature(ObjectType):
+    """A feature near the given point and its distance from the point."""
+
+    feature = graphene.Field(Feature, required=True)
+    distance = graphene.Float(
+        required=True, description=_("Distance from the point in meters")
+    )
+
+    def resolve_feature(self: models.Feature, info, **kwargs):
+        return self
+
+    def resolve_distance(self: models.Feature, info, **kwargs):
+        return self.distance
+
+
+class FeatureCard(DjangoObjectType):
+    """Summary of a feature for listing features."""
+
+    class Meta:
+        model = models.FeatureCard
+        fields = ("name", "category_name", "tag_ids", "image_url")
+        use_connection = True
+
+    feature_id = graphene.ID(
+        required=True, description=_("The ID of the feature of the card")
+    )
+    category_id = graphene.String(description=_("ID of the category"))
+    coordinates = graphene.List(
+        graphene.NonNull(graphene.Float),
+        required=True,
+        description=_("Longitude and latitude of a point on the feature"),
+    )
+
+    def resolve_feature_id(self: models.FeatureCard, info, **kwargs):
+        return to_global_id(Feature._meta.name, self.feature_id)
+
+    def resolve_coordinates(self: models.FeatureCard, info, **kwargs):
+        return [self.location.x, self.location.y]
+
+
+class FeatureCardConnectionField(DjangoConnectionField):
+    """Connection of feature cards paginated by the feature id of the cards.
+
+    The cursors are the feature ids, so a page is fetched with a single query
+    using the index of the cards, without counting all the cards.
+    """
+
+    cursor_prefix = "feature"
+
+    @classmethod
+    def to_cursor(cls, card: models.FeatureCard) -> str:
+        return base64(f"{cls.cursor_prefix}:{card.feature_id}")
+
+    @classmethod
+    def from_cursor(cls, cursor: str) -> int:
+        try:
+            prefix, separator, feature_id = unbase64(cursor).partition(":")
+        except ValueError:
+            prefix = feature_id = ""
+        if prefix != cls.cursor_prefix or not feature_id.isdigit():
+            raise GraphQLError(f"Invalid cursor {cursor}.")
+        return int(feature_id)
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable):
+        queryset = maybe_queryset(iterable)
+        if args.get("after"):
+            queryset = queryset.filter(feature_id__gt=cls.from_cursor(args["after"]))
+        if args.get("before"):
+            queryset = queryset.filter(feature_id__lt=cls.from_cursor(args["before"]))
+        first, last = args.get("first"), args.get("last")
+        backwards = last is not None and first is None
+        limit = last if backwards else first
+        if limit is None:
+            limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        queryset = queryset.order_by("-feature_id" if backwards else "feature_id")
+        # The extra card tells whether there are more cards
+        cards = list(queryset[: limit + 1])
+        has_more = len(cards) > limit
+        cards = cards[:limit]
+        if backwards:
+            cards.reverse()
+
+        edges = [
+            connection.Edge(node=card, cursor=cls.to_cursor(card)) for card in cards
+        ]
+        result = connection(
+            edges=edges,
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=backwards and has_more,
+                has_next_page=not backwards and has_more,
+            ),
+        )
+        result.iterable = cards
+        return result
+
+
 class FeatureTranslationsInput(graphene.InputObjectType):
     language_code = LanguageEnum(required=True)
     name = graphene.String(required=True, description=_("Name of the feature"))
@@ -443,15 +623,29 @@ class ContactInfoInput(graphene.InputObjectType):
     email = graphene.String()
 
 
-class CreateFeatureMutation(relay.ClientIDMutation):
-    class Input:
-        translations = graphene.List(
-            graphene.NonNull(FeatureTranslationsInput), required=True
+class FeatureInputFields:
+    translations = graphene.List(
+        graphene.NonNull(FeatureTranslationsInput), required=True
+    )
+    geometry = graphql_geojson.Geometry(required=True)
+    contact_info = ContactInfoInput()
+    category_id = graphene.String()
+    tag_ids = graphene.List(graphene.String)
+    idempotency_key = graphene.String(
+        description=_(
+            "Unique key of the request. A retried request with the same key returns "
+            "the feature created by the first request instead of creating another."
         )
-        geometry = graphql_geojson.Geometry(required=True)
-        contact_info = ContactInfoInput()
-        category_id = graphene.String()
-        tag_ids = graphene.List(graphene.String)
+    )
+
+
+class FeatureInput(FeatureInputFields, graphene.InputObjectType):
+    pass
+
+
+class CreateFeatureMutation(relay.ClientIDMutation):
+    class Input(FeatureInputFields):
+        pass
 
     feature = graphene.Field(Feature)
 
@@ -460,20 +654,57 @@ class CreateFeatureMutation(relay.ClientIDMutation):
         st, created = models.SourceType.objects.get_or_create(system="ahti", type="api")
         return st
 
+    @staticmethod
+    def get_created_features(source_type, idempotency_keys) -> dict:
+        """Return the features created with the idempotency keys by key."""
+        return {
+            feature.idempotency_key: feature
+            for feature in models.Feature.objects.filter(
+                source_type=source_type, idempotency_key__in=idempotency_keys
+            )
+        }
+
+    @classmethod
+    def create_feature(cls, values) -> Tuple[models.Feature, bool]:
+        """Create the feature, unless a concurrent retry of the request has.
+
+        Return the feature and whether it was created.
+        """
+        try:
+            return models.Feature.objects.create_translatable_object(**values), True
+        except IntegrityError:
+            idempotency_key = values["idempotency_key"]
+            created = cls.get_created_features(values["source_type"], [idempotency_key])
+            if not created:
+                raise
+            return created[idempotency_key], False
+
     @classmethod
     @transaction.atomic
     def mutate_and_get_payload(cls, root, info, **kwargs):
+        kwargs.pop("client_mutation_id", None)
         contact_info_values = kwargs.pop("contact_info", None)
         tag_ids = kwargs.pop("tag_ids", None)
         category_id = kwargs.pop("category_id", None)
+        idempotency_key = kwargs.pop("idempotency_key", None)
+
+        for error in validate_idempotency_key(idempotency_key):
+            raise GraphQLError(error)
+        source_type = cls.get_source_type()
+        # A retried request returns the feature created by the first request
+        if idempotency_key:
+            created = cls.get_created_features(source_type, [idempotency_key])
+            if created:
+                return CreateFeatureMutation(feature=created[idempotency_key])
 
         now = timezone.now()
         values = {
-            "source_type": cls.get_source_type(),
+            "source_type": source_type,
             "source_id": uuid.uuid4(),
             "source_modified_at": now,
             "mapped_at": now,
             "visibility": Visibility.DRAFT,
+            "idempotency_key": idempotency_key or None,
         }
 
         values.update(kwargs)
@@ -486,7 +717,9 @@ class CreateFeatureMutation(relay.ClientIDMutation):
         else:
             tags = []
 
-        feature = models.Feature.objects.create_translatable_object(**values)
+        feature, created = cls.create_feature(values)
+        if not created:
+            return CreateFeatureMutation(feature=feature)
 
         if contact_info_values:
             ci = models.ContactInfo.objects.create(
@@ -498,9 +731,231 @@ class CreateFeatureMutation(relay.ClientIDMutation):
         if tags:
             feature.tags.set(tags)
 
+        refresh_feature_cards([feature.pk])
         return CreateFeatureMutation(feature=feature)
 
 
+CREATE_FEATURES_MAX = 500
+
+
+class CreateFeatureResult(ObjectType):
+    feature = graphene.Field(Feature, description=_("The created feature"))
+    errors = graphene.List(
+        graphene.NonNull(String),
+        required=True,
+        description=_("Reasons why the feature was not created"),
+    )
+
+
+class CreateFeaturesMutation(relay.ClientIDMutation):
+    class Input:
+        features = graphene.List(graphene.NonNull(FeatureInput), required=True)
+
+    results = graphene.List(
+        graphene.NonNull(CreateFeatureResult),
+        required=True,
+        description=_("Results of the features in the order of the input"),
+    )
+
+    @classmethod
+    @transaction.atomic
+    def mutate_and_get_payload(cls, root, info, features, **kwargs):
+        if len(features) > CREATE_FEATURES_MAX:
+            raise GraphQLError(
+                f"At most {CREATE_FEATURES_MAX} features can be created at once."
+            )
+
+        # The referenced categories and tags are validated with a query each
+        category_ids = set(
+            Category.objects.filter(
+                id__in={values.get("category_id") for values in features}
+            ).values_list("id", flat=True)
+        )
+        tag_ids = set(
+            models.Tag.objects.filter(
+                id__in={
+                    tag_id
+                    for values in features
+                    for tag_id in values.get("tag_ids") or []
+                }
+            ).values_list("id", flat=True)
+        )
+        errors = [cls.validate(values, category_ids, tag_ids) for values in features]
+
+        source_type = CreateFeatureMutation.get_source_type()
+        # Features created by previous requests with the idempotency keys
+        previously_created = CreateFeatureMutation.get_created_features(
+            source_type, {values.get("idempotency_key") for values in features}
+        )
+        # Index of the feature created for each idempotency key of this request
+        created_indexes = {}
+        created = {}
+        now = timezone.now()
+        for index, values in enumerate(features):
+            idempotency_key = values.get("idempotency_key")
+            if (
+                errors[index]
+                or idempotency_key in previously_created
+                or idempotency_key in created_indexes
+            ):
+                continue
+            if idempotency_key:
+                created_indexes[idempotency_key] = index
+            created[index] = cls.build_feature(values, source_type, now)
+        cls.insert_features(created, created_indexes, previously_created, source_type)
+        cls.create_related_objects(
+            [(feature, features[index]) for index, feature in created.items()]
+        )
+        refresh_feature_cards([feature.pk for feature in created.values()])
+
+        results = []
+        for index, values in enumerate(features):
+            idempotency_key = values.get("idempotency_key")
+            feature = None
+            if not errors[index]:
+                feature = previously_created.get(idempotency_key) or created.get(
+                    created_indexes.get(idempotency_key, index)
+                )
+            results.append(CreateFeatureResult(feature=feature, errors=errors[index]))
+        return CreateFeaturesMutation(results=results)
+
+    @staticmethod
+    def insert_features(created, created_indexes, previously_created, source_type):
+        """Insert the new features, except the ones a concurrent retry has created.
+
+        The features created by a concurrent retry of the request are moved from
+        `created` to `previously_created`.
+        """
+        while True:
+            try:
+                with transaction.atomic():
+                    models.Feature.objects.bulk_create(created.values())
+                return
+            except IntegrityError:
+                concurrently_created = CreateFeatureMutation.get_created_features(
+                    source_type, set(created_indexes)
+                )
+                if not concurrently_created:
+                    raise
+                previously_created.update(concurrently_created)
+                for idempotency_key in concurrently_created:
+                    del created[created_indexes.pop(idempotency_key)]
+
+    @staticmethod
+    def build_feature(values, source_type, now) -> models.Feature:
+        return models.Feature(
+            source_type=source_type,
+            source_id=uuid.uuid4(),
+            source_modified_at=now,
+            mapped_at=now,
+            visibility=Visibility.DRAFT,
+            geometry=values["geometry"],
+            # bulk_create() doesn't call save()
+            geography=values["geometry"],
+            category_id=values.get("category_id") or None,
+            idempotency_key=values.get("idempotency_key") or None,
+        )
+
+    @staticmethod
+    def create_related_objects(features: List[Tuple[models.Feature, dict]]):
+        """Insert the translations, contact infos and tags of the new features."""
+        translations = []
+        contact_infos = []
+        feature_tags = []
+        for feature, values in features:
+            for translation in values["translations"]:
+                translation = get_given_values(translation)
+                translations.append(
+                    models.FeatureTranslation(
+                        master=feature,
+                        effective_name=translation["name"],
+                        **translation,
+                    )
+                )
+            if values.get("contact_info"):
+                contact_infos.append(
+                    models.ContactInfo(
+                        feature=feature, **get_given_values(values["contact_info"])
+                    )
+                )
+            for tag_id in set(values.get("tag_ids") or []):
+                feature_tags.append(models.FeatureTag(feature=feature, tag_id=tag_id))
+        models.FeatureTranslation.objects.bulk_create(translations)
+        models.ContactInfo.objects.bulk_create(contact_infos)
+        models.FeatureTag.objects.bulk_create(feature_tags)
+
+    @classmethod
+    def validate(cls, values, category_ids, tag_ids) -> List[str]:
+        """Return the reasons why the feature can't be created."""
+        return [
+            *cls.validate_translations(values["translations"]),
+            *cls.validate_references(values, category_ids, tag_ids),
+            *cls.validate_contact_info(values.get("contact_info")),
+            *validate_idempotency_key(values.get("idempotency_key")),
+        ]
+
+    @staticmethod
+    def validate_translations(translations) -> Iterable[str]:
+        language_codes = [translation["language_code"] for translation in translations]
+        if settings.PARLER_DEFAULT_LANGUAGE_CODE not in language_codes:
+            yield (
+                f'Default translation "{settings.PARLER_DEFAULT_LANGUAGE_CODE}" '
+                f"is missing"
+            )
+        for language_code in sorted(
+            {code for code in language_codes if language_codes.count(code) > 1}
+        ):
+            yield f'Translation "{language_code}" is given more than once'
+        for translation in translations:
+            values = get_given_values(translation)
+            language_code = values.pop("language_code")
+            for field_name, value in values.items():
+                field = models.FeatureTranslation._meta.get_field(field_name)
+                try:
+                    field.clean(value, None)
+                except ValidationError as e:
+                    for message in e.messages:
+                        yield f"{field_name} ({language_code}): {message}"
+
+    @staticmethod
+    def validate_references(values, category_ids, tag_ids) -> Iterable[str]:
+        category_id = values.get("category_id")
+        if category_id and category_id not in category_ids:
+            yield f'Category "{category_id}" does not exist'
+        for tag_id in values.get("tag_ids") or []:
+            if tag_id not in tag_ids:
+                yield f'Tag "{tag_id}" does not exist'
+
+    @staticmethod
+    def validate_contact_info(contact_info_values) -> Iterable[str]:
+        if not contact_info_values:
+            return
+        contact_info = models.ContactInfo(**get_given_values(contact_info_values))
+        try:
+            contact_info.full_clean(exclude=["feature"])
+        except ValidationError as e:
+            for field, messages in e.message_dict.items():
+                for message in messages:
+                    yield f"{field}: {message}"
+
+
+def validate_idempotency_key(idempotency_key) -> Iterable[str]:
+    if idempotency_key and len(idempotency_key) > models.IDEMPOTENCY_KEY_MAX_LENGTH:
+        yield (
+            f"idempotencyKey: Ensure this value has at most "
+            f"{models.IDEMPOTENCY_KEY_MAX_LENGTH} characters."
+        )
+
+
+def get_given_values(input_values) -> dict:
+    """Return the values of an input object, without the ones given as null."""
+    return {key: value for key, value in input_values.items() if value is not None}
+
+
+NEAREST_FEATURES_DEFAULT = 10
+NEAREST_FEATURES_MAX = 100
+
+
 class Query(graphene.ObjectType):
     features = DjangoFilterConnectionField(
         Feature, description=_("Retrieve all features matching the given filters")
@@ -512,6 +967,33 @@ class Query(graphene.ObjectType):
         description=_("Retrieve a single feature"),
     )
     tags = graphene.List(Tag, description=_("Retrieve all tags"))
+    nearest_features = graphene.List(
+        graphene.NonNull(NearestFeature),
+        point=Geometry(
+            required=True, description=_("Point from which the distance is measured")
+        ),
+        first=graphene.Int(
+            default_value=NEAREST_FEATURES_DEFAULT,
+            description=_("Number of features to return"),
+        ),
+        category=graphene.List(
+            graphene.NonNull(String), description=_("Include only these categories")
+        ),
+        tagged_with_any=graphene.List(
+            graphene.NonNull(String),
+            description=_("Include only features tagged with any of these tags"),
+        ),
+        description=_(
+            "Retrieve the visible features nearest to the point, nearest first"
+        ),
+    )
+    feature_cards = FeatureCardConnectionField(
+        FeatureCard,
+        language=LanguageEnum(
+            description=_("Language of the cards (default: the request language)")
+        ),
+        description=_("Retrieve summaries of all the visible features"),
+    )
 
     def resolve_feature(self, info, id=None, ahti_id=None, **kwargs):
         if id:
@@ -528,6 +1010,28 @@ class Query(graphene.ObjectType):
     def resolve_tags(self, info, **kwargs):
         return models.Tag.objects.all()
 
+    def resolve_nearest_features(
+        self, info, point, first, category=None, tagged_with_any=None, **kwargs
+    ):
+        if not 0 < first <= NEAREST_FEATURES_MAX:
+            raise GraphQLError(f"`first` must be between 1 and {NEAREST_FEATURES_MAX}.")
+        if point.srid is None:
+            point.srid = settings.DEFAULT_SRID
+        queryset = Feature.get_queryset(models.Feature.objects, info)
+        if category:
+            queryset = queryset.filter(category__in=category)
+        if tagged_with_any:
+            # A subquery instead of a join, which would need DISTINCT and prevent
+            # ordering by the spatial index
+            feature_tags = models.FeatureTag.objects.filter(tag__in=tagged_with_any)
+            queryset = queryset.filter(pk__in=feature_tags.values("feature_id"))
+        return queryset.nearest(point)[:first]
+
+    def resolve_feature_cards(self, info, language=None, **kwargs):
+        return models.FeatureCard.objects.filter(
+            language_code=get_card_language(language)
+        )
+
 
 class Mutation(graphene.ObjectType):
     create_feature = CreateFeatureMutation.Field(
@@ -536,3 +1040,10 @@ class Mutation(graphene.ObjectType):
             "review before it is published into the API."
         )
     )
+    create_features = CreateFeaturesMutation.Field(
+        description=_(
+            "Create new features like createFeature. Invalid features are not "
+            "created and their errors are returned, without affecting the other "
+            "features."
+        )
+    )
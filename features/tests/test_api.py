@@ -1,7 +1,9 @@
 import datetime
 from decimal import Decimal
 
+import pytest
 from django.contrib.gis.geos import Point
+from django.utils import translation
 from freezegun import freeze_time
 from graphql_relay import to_global_id
 
@@ -484,6 +486,38 @@ def test_feature_name_override(api_client):
     )
 
 
+def test_feature_name_override_without_translation(api_client):
+    f = FeatureFactory(name="Original name")
+    override = OverrideFactory(
+        feature=f, field=OverrideFieldType.NAME, string_value="Override name"
+    )
+    override.set_current_language("en")
+    override.string_value = "Override name en"
+    override.save()
+
+    with translation.override("en"):
+        executed = api_client.execute(
+            """
+        query FeaturesOverrideName {
+          features {
+            edges {
+              node {
+                properties {
+                  name
+                }
+              }
+            }
+          }
+        }
+        """
+        )
+
+    assert (
+        executed["data"]["features"]["edges"][0]["node"]["properties"]["name"]
+        == "Override name en"
+    )
+
+
 def test_feature_harbour_details(snapshot, api_client):
     HarbourFeatureDetailsFactory(
         data__berth_min_depth=2.5,
@@ -609,3 +643,86 @@ def test_query_features_through_tags_query(snapshot, api_client):
     """
     )
     snapshot.assert_match(executed)
+
+
+NEAREST_FEATURES_QUERY = """
+query NearestFeatures($first: Int, $category: [String!], $taggedWithAny: [String!]) {
+  nearestFeatures(
+    point: "{'type': 'Point', 'coordinates': [24.93, 60.16]}",
+    first: $first,
+    category: $category,
+    taggedWithAny: $taggedWithAny
+  ) {
+    feature {
+      properties {
+        ahtiId
+      }
+    }
+    distance
+  }
+}
+"""
+
+
+@pytest.fixture
+def nearby_features():
+    st = SourceTypeFactory(system="test", type="test")
+    category = CategoryFactory(id="ahti:category:harbor")
+    tag = TagFactory(id="ahti:tag:sauna")
+    near = FeatureFactory(
+        source_type=st, source_id="near", geometry=Point(24.931, 60.16)
+    )
+    far = FeatureFactory(
+        source_type=st,
+        source_id="far",
+        geometry=Point(24.95, 60.16),
+        category=category,
+    )
+    far.tags.add(tag)
+    FeatureFactory(
+        source_type=st,
+        source_id="hidden",
+        geometry=Point(24.93, 60.16),
+        visibility=Visibility.HIDDEN,
+    )
+    return near, far
+
+
+def get_nearest_ahti_ids(executed):
+    return [
+        nearest["feature"]["properties"]["ahtiId"]
+        for nearest in executed["data"]["nearestFeatures"]
+    ]
+
+
+def test_nearest_features(api_client, nearby_features):
+    executed = api_client.execute(NEAREST_FEATURES_QUERY)
+
+    assert get_nearest_ahti_ids(executed) == ["test:test:near", "test:test:far"]
+    distances = [nearest["distance"] for nearest in executed["data"]["nearestFeatures"]]
+    # 0.001 and 0.02 degrees of longitude at 60° N
+    assert distances[0] == pytest.approx(55.6, rel=0.01)
+    assert distances[1] == pytest.approx(1112, rel=0.01)
+
+
+@pytest.mark.parametrize(
+    "variables,expected",
+    [
+        ({"first": 1}, ["test:test:near"]),
+        ({"category": ["ahti:category:harbor"]}, ["test:test:far"]),
+        ({"taggedWithAny": ["ahti:tag:sauna", "ahti:tag:other"]}, ["test:test:far"]),
+    ],
+)
+def test_nearest_features_filtering(api_client, nearby_features, variables, expected):
+    executed = api_client.execute(NEAREST_FEATURES_QUERY, variable_values=variables)
+
+    assert get_nearest_ahti_ids(executed) == expected
+
+
+@pytest.mark.parametrize("first", [0, 101])
+def test_nearest_features_first_is_limited(api_client, first):
+    executed = api_client.execute(
+        NEAREST_FEATURES_QUERY, variable_values={"first": first}
+    )
+
+    assert executed["errors"][0]["message"] == "`first` must be between 1 and 100."
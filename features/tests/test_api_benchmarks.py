@@ -0,0 +1,462 @@
+"""Performance budgets for representative GraphQL API operations.
+
+Every operation is executed once while counting the SQL queries and then
+benchmarked with pytest-benchmark. A test fails when the operation runs more
+queries than its budget allows or when its mean wall time exceeds the budget.
+
+Run only the benchmarks with `pytest -m benchmark` and skip them with
+`pytest --benchmark-skip`. Query count budgets are still checked when the
+benchmarks are disabled (`--benchmark-disable`).
+"""
+import pytest
+from django.contrib.gis.geos import Point
+
+from categories.tests.factories import CategoryFactory
+from features.enums import OverrideFieldType
+from features.tests.factories import (
+    ContactInfoFactory,
+    FeatureFactory,
+    FeatureTeaserFactory,
+    HarbourFeatureDetailsFactory,
+    ImageFactory,
+    LicenseFactory,
+    LinkFactory,
+    OpeningHoursFactory,
+    OpeningHoursPeriodFactory,
+    OverrideFactory,
+    PriceTagFactory,
+    SourceTypeFactory,
+    TagFactory,
+)
+
+pytestmark = pytest.mark.benchmark
+
+FEATURE_COUNT = 120
+PAGE_SIZE = 100
+CATEGORY_COUNT = 5
+TAG_COUNT = 10
+OVERRIDE_EVERY = 10
+BENCHMARK_ROUNDS = 5
+
+# Budgets for the operations. `queries` is the maximum number of SQL queries
+# executed by a single request, `seconds` the maximum mean wall time.
+BUDGETS = {
+    # Count, page and prefetches (20). Names and modification times are stored
+    # with the overrides applied.
+    "features_all_fields": {"queries": 22, "seconds": 3.0},
+    "features_map": {"queries": 22, "seconds": 1.0},
+    "features_updated_since": {"queries": 22, "seconds": 1.5},
+    "features_ordered_by_name": {"queries": 22, "seconds": 1.0},
+    "features_ordered_by_distance": {"queries": 22, "seconds": 1.0},
+    "nearest_features": {"queries": 22, "seconds": 0.5},
+    "features_tagged_with_all": {"queries": 22, "seconds": 1.0},
+    "features_distance_lte": {"queries": 22, "seconds": 1.0},
+    "feature_by_ahti_id": {"queries": 22, "seconds": 0.5},
+    "tags": {"queries": TAG_COUNT + 1, "seconds": 0.5},
+    "feature_categories": {"queries": CATEGORY_COUNT + 1, "seconds": 0.5},
+}
+
+FEATURE_FIELDS = """
+type
+geometry {
+  type
+  coordinates
+}
+properties {
+  ahtiId
+  name
+  oneLiner
+  description
+  url
+  createdAt
+  modifiedAt
+  source {
+    system
+    type
+    id
+  }
+  translations {
+    languageCode
+    name
+    description
+    oneLiner
+    url
+  }
+  category {
+    id
+    name
+  }
+  tags {
+    id
+    name
+  }
+  contactInfo {
+    email
+    phoneNumber
+    address {
+      streetAddress
+      postalCode
+      municipality
+    }
+  }
+  teaser {
+    header
+    main
+  }
+  images {
+    url
+    copyrightOwner
+    license {
+      name
+    }
+  }
+  links {
+    type
+    url
+  }
+  openingHoursPeriods {
+    validFrom
+    validTo
+    comment
+    openingHours {
+      day
+      opens
+      closes
+      allDay
+    }
+  }
+  details {
+    harbor {
+      moorings
+      depth {
+        min
+        max
+      }
+    }
+    priceList {
+      item
+      price
+      unit
+    }
+  }
+}
+"""
+
+
+@pytest.fixture
+def seeded_features():
+    """Seed a dataset resembling the production data.
+
+    Every feature has all of its relations populated so that each prefetch
+    used by the API is exercised.
+    """
+    st = SourceTypeFactory(system="bench", type="place")
+    categories = [CategoryFactory() for _ in range(CATEGORY_COUNT)]
+    tags = [TagFactory() for _ in range(TAG_COUNT)]
+    image_license = LicenseFactory()
+
+    features = []
+    for n in range(FEATURE_COUNT):
+        feature = FeatureFactory(
+            source_type=st,
+            source_id=f"sid{n}",
+            category=categories[n % CATEGORY_COUNT],
+            geometry=Point(24.915 + n * 0.0003, 60.154 + n * 0.0002),
+        )
+        feature.tags.set([tags[n % TAG_COUNT], tags[(n + 1) % TAG_COUNT]])
+        ContactInfoFactory(feature=feature)
+        FeatureTeaserFactory(feature=feature)
+        HarbourFeatureDetailsFactory(feature=feature)
+        ImageFactory.create_batch(2, feature=feature, license=image_license)
+        LinkFactory(feature=feature)
+        PriceTagFactory(feature=feature)
+        period = OpeningHoursPeriodFactory(feature=feature)
+        for day in range(1, 8):
+            OpeningHoursFactory(period=period, day=day)
+        if n % OVERRIDE_EVERY == 0:
+            OverrideFactory(
+                feature=feature,
+                field=OverrideFieldType.NAME,
+                string_value=f"Override {n}",
+            )
+        features.append(feature)
+
+    return features
+
+
+@pytest.fixture
+def assert_operation_within_budget(
+    benchmark, django_assert_max_num_queries, api_client
+):
+    """Execute a GraphQL operation and compare it against its budget."""
+
+    def _assert(operation_name, query):
+        budget = BUDGETS[operation_name]
+
+        with django_assert_max_num_queries(budget["queries"]):
+            executed = api_client.execute(query)
+        assert "errors" not in executed
+
+        benchmark.group = "graphql"
+        benchmark.name = operation_name
+        benchmark.pedantic(
+            api_client.execute, args=(query,), rounds=BENCHMARK_ROUNDS, warmup_rounds=1
+        )
+        if benchmark.stats:  # Not available when benchmarks are disabled
+            assert benchmark.stats.stats.mean <= budget["seconds"]
+
+        return executed
+
+    return _assert
+
+
+def test_features_page_with_all_fields(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "features_all_fields",
+        """
+    query FeaturesAllFields {
+      features(first: %d) {
+        edges {
+          node {
+            %s
+          }
+        }
+      }
+    }
+    """
+        % (PAGE_SIZE, FEATURE_FIELDS),
+    )
+
+    assert len(executed["data"]["features"]["edges"]) == PAGE_SIZE
+
+
+def test_features_map_query(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "features_map",
+        """
+    query FeaturesMap {
+      features(first: %d) {
+        edges {
+          node {
+            id
+            geometry {
+              type
+              coordinates
+            }
+            properties {
+              ahtiId
+              category {
+                id
+              }
+            }
+          }
+        }
+      }
+    }
+    """
+        % PAGE_SIZE,
+    )
+
+    assert len(executed["data"]["features"]["edges"]) == PAGE_SIZE
+
+
+def test_features_updated_since(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "features_updated_since",
+        """
+    query FeaturesUpdatedSince {
+      features(first: %d, updatedSince: "2000-01-01T00:00:00.0+00:00") {
+        edges {
+          node {
+            id
+            properties {
+              ahtiId
+              modifiedAt
+            }
+          }
+        }
+      }
+    }
+    """
+        % PAGE_SIZE,
+    )
+
+    assert len(executed["data"]["features"]["edges"]) == PAGE_SIZE
+
+
+def test_features_ordered_by_name(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "features_ordered_by_name",
+        """
+    query FeaturesOrderedByName {
+      features(first: %d, orderBy: "name") {
+        edges {
+          node {
+            id
+            properties {
+              name
+            }
+          }
+        }
+      }
+    }
+    """
+        % PAGE_SIZE,
+    )
+
+    assert len(executed["data"]["features"]["edges"]) == PAGE_SIZE
+
+
+def test_features_ordered_by_distance(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "features_ordered_by_distance",
+        """
+    query FeaturesOrderedByDistance {
+      features(
+        first: %d,
+        orderBy: "distance",
+        distanceFrom: "{'type': 'Point', 'coordinates': [24.93, 60.164]}"
+      ) {
+        edges {
+          node {
+            id
+            properties {
+              ahtiId
+            }
+          }
+        }
+      }
+    }
+    """
+        % PAGE_SIZE,
+    )
+
+    assert len(executed["data"]["features"]["edges"]) == PAGE_SIZE
+
+
+def test_nearest_features(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "nearest_features",
+        """
+    query NearestFeatures {
+      nearestFeatures(
+        point: "{'type': 'Point', 'coordinates': [24.93, 60.164]}",
+        first: 20
+      ) {
+        feature {
+          %s
+        }
+        distance
+      }
+    }
+    """
+        % FEATURE_FIELDS,
+    )
+
+    assert len(executed["data"]["nearestFeatures"]) == 20
+
+
+def test_features_tagged_with_all(seeded_features, assert_operation_within_budget):
+    tag_ids = [tag.id for tag in seeded_features[0].tags.all()]
+
+    executed = assert_operation_within_budget(
+        "features_tagged_with_all",
+        """
+    query FeaturesTaggedWithAll {
+      features(first: %d, taggedWithAll: ["%s"]) {
+        edges {
+          node {
+            id
+            properties {
+              ahtiId
+            }
+          }
+        }
+      }
+    }
+    """
+        % (PAGE_SIZE, '", "'.join(tag_ids)),
+    )
+
+    assert len(executed["data"]["features"]["edges"]) > 0
+
+
+def test_features_distance_lte(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "features_distance_lte",
+        """
+    query FeaturesByDistance {
+      features(
+        first: %d,
+        distanceLte: {
+          geometry: "{'type': 'Point', 'coordinates': [24.93, 60.164]}",
+          value: 1,
+          unit: km
+        }
+      ) {
+        edges {
+          node {
+            id
+            properties {
+              ahtiId
+            }
+          }
+        }
+      }
+    }
+    """
+        % PAGE_SIZE,
+    )
+
+    assert len(executed["data"]["features"]["edges"]) > 0
+
+
+def test_feature_by_ahti_id(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "feature_by_ahti_id",
+        """
+    query FeatureByAhtiId {
+      feature(ahtiId: "%s") {
+        %s
+      }
+    }
+    """
+        % (seeded_features[0].ahti_id, FEATURE_FIELDS),
+    )
+
+    assert executed["data"]["feature"]["properties"]["ahtiId"] == (
+        seeded_features[0].ahti_id
+    )
+
+
+def test_tags(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "tags",
+        """
+    query Tags {
+      tags {
+        id
+        name
+      }
+    }
+    """,
+    )
+
+    assert len(executed["data"]["tags"]) == TAG_COUNT
+
+
+def test_feature_categories(seeded_features, assert_operation_within_budget):
+    executed = assert_operation_within_budget(
+        "feature_categories",
+        """
+    query FeatureCategories {
+      featureCategories {
+        id
+        name
+        description
+      }
+    }
+    """,
+    )
+
+    assert len(executed["data"]["featureCategories"]) == CATEGORY_COUNT
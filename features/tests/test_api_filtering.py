@@ -1,12 +1,22 @@
+import datetime
+
 import pytest
 from django.contrib.gis.geos import Point
 from freezegun import freeze_time
 from graphql_relay import to_global_id
 
 from categories.tests.factories import CategoryFactory
-from features.enums import OverrideFieldType
+from features.enums import HarborMooringType, OverrideFieldType, Weekday
+from features.opening_hours import refresh_opening_hours_intervals
 from features.schema import Feature
-from features.tests.factories import FeatureFactory, OverrideFactory, TagFactory
+from features.tests.factories import (
+    FeatureFactory,
+    HarbourFeatureDetailsFactory,
+    OpeningHoursFactory,
+    OpeningHoursPeriodFactory,
+    OverrideFactory,
+    TagFactory,
+)
 
 
 def get_response_ids(response):
@@ -181,3 +191,208 @@ def test_feature_filtering_category(api_client, category_id, found):
         assert to_global_id(Feature._meta.name, feature.id) in ids
     else:
         assert len(ids) == 0
+
+
+@pytest.mark.parametrize(
+    "open_at,found",
+    [
+        ("2020-06-05T23:30:00+03:00", True),
+        # Time zones are converted to Helsinki time
+        ("2020-06-05T20:30:00+00:00", True),
+        # Open past midnight on the last day of the period
+        ("2020-06-06T01:30:00+03:00", True),
+        ("2020-06-06T02:30:00+03:00", False),
+        ("2020-06-05T21:30:00+03:00", False),
+        # Outside the validity of the period
+        ("2020-05-29T23:30:00+03:00", False),
+    ],
+)
+def test_feature_filtering_open_at(api_client, open_at, found):
+    """Only fetch Features that are open at the given time."""
+    period = OpeningHoursPeriodFactory(
+        valid_from=datetime.date(2020, 6, 1), valid_to=datetime.date(2020, 6, 5)
+    )
+    OpeningHoursFactory(
+        period=period,
+        day=Weekday.FRIDAY,
+        opens=datetime.time(22),
+        closes=datetime.time(2),
+    )
+    refresh_opening_hours_intervals([period.feature_id])
+    # Without opening hours
+    FeatureFactory()
+
+    executed = api_client.execute(
+        """
+    query FeaturesOpenAt($openAt: DateTime!) {
+      features(openAt: $openAt) {
+        edges {
+          node {
+            id
+          }
+        }
+      }
+    }
+    """,
+        variable_values={"openAt": open_at},
+    )
+    ids = get_response_ids(executed)
+
+    if found:
+        assert ids == [to_global_id(Feature._meta.name, period.feature_id)]
+    else:
+        assert len(ids) == 0
+
+
+@pytest.fixture
+def harbors():
+    return {
+        "shallow": HarbourFeatureDetailsFactory(
+            data={
+                "berth_moorings": [HarborMooringType.SLIP],
+                "berth_min_depth": 1.0,
+                "berth_max_depth": 2.0,
+            }
+        ).feature,
+        "deep": HarbourFeatureDetailsFactory(
+            data={
+                "berth_moorings": [
+                    HarborMooringType.SLIP,
+                    HarborMooringType.STERN_BUOY,
+                ],
+                "berth_min_depth": 3.0,
+                "berth_max_depth": 6.5,
+            }
+        ).feature,
+        "other": FeatureFactory(),
+    }
+
+
+@pytest.mark.parametrize(
+    "filters,expected",
+    [
+        ("harborMooring: SLIP", ["shallow", "deep"]),
+        ("harborMooring: STERN_BUOY", ["deep"]),
+        ("harborMooring: QUAYSIDE", []),
+        ("minBerthDepth: 2.5", ["deep"]),
+        ("maxBerthDepth: 2.5", ["shallow"]),
+        ("minBerthDepth: 2, maxBerthDepth: 3", ["shallow", "deep"]),
+        ("minBerthDepth: 7", []),
+    ],
+)
+def test_feature_filtering_harbors(api_client, harbors, filters, expected):
+    """Filter harbors by mooring type and berth depth."""
+    executed = api_client.execute(
+        """
+    query Harbors {
+      features(%s) {
+        edges {
+          node {
+            id
+          }
+        }
+      }
+    }
+    """
+        % filters
+    )
+    ids = get_response_ids(executed)
+
+    assert ids == [
+        to_global_id(Feature._meta.name, harbors[name].id) for name in expected
+    ]
+
+
+def test_feature_filtering_unknown_harbor_mooring(api_client):
+    executed = api_client.execute(
+        """
+    query Harbors {
+      features(harborMooring: BOWLINE) {
+        edges {
+          node {
+            id
+          }
+        }
+      }
+    }
+    """
+    )
+
+    assert 'Expected type "HarborMooringType"' in executed["errors"][0]["message"]
+
+
+@pytest.fixture
+def ordered_features():
+    with freeze_time("2020-02-05 12:00:00"):
+        features = {
+            "aalto": FeatureFactory(name="Aalto", geometry=Point(24.95, 60.16)),
+            "aaninen": FeatureFactory(name="Ääninen", geometry=Point(24.93, 60.16)),
+            "zeta": FeatureFactory(name="Zeta", geometry=Point(24.94, 60.16)),
+        }
+    features["aalto"].source_modified_at = datetime.datetime(
+        2020, 2, 1, tzinfo=datetime.timezone.utc
+    )
+    features["aalto"].save()
+    with freeze_time("2020-02-10 12:00:00"):
+        OverrideFactory(
+            feature=features["zeta"], field=OverrideFieldType.NAME, string_value="Zeta",
+        )
+    return features
+
+
+@pytest.mark.parametrize(
+    "order_by,expected",
+    [
+        # Ä is sorted after Z in Finnish
+        ("name", ["aalto", "zeta", "aaninen"]),
+        ("-name", ["aaninen", "zeta", "aalto"]),
+        ("modifiedAt", ["aalto", "aaninen", "zeta"]),
+        ("-modifiedAt", ["zeta", "aaninen", "aalto"]),
+        ("distance", ["aaninen", "zeta", "aalto"]),
+        ("-distance", ["aalto", "zeta", "aaninen"]),
+    ],
+)
+def test_feature_ordering(api_client, ordered_features, order_by, expected):
+    """Order features by name, effective modification time or distance."""
+    executed = api_client.execute(
+        """
+    query FeaturesOrdered($orderBy: String) {
+      features(
+        orderBy: $orderBy,
+        distanceFrom: "{'type': 'Point', 'coordinates': [24.925, 60.16]}"
+      ) {
+        edges {
+          node {
+            id
+          }
+        }
+      }
+    }
+    """,
+        variable_values={"orderBy": order_by},
+    )
+    ids = get_response_ids(executed)
+
+    assert ids == [
+        to_global_id(Feature._meta.name, ordered_features[name].id) for name in expected
+    ]
+
+
+def test_feature_ordering_by_distance_requires_point(api_client):
+    executed = api_client.execute(
+        """
+    query FeaturesByDistance {
+      features(orderBy: "distance") {
+        edges {
+          node {
+            id
+          }
+        }
+      }
+    }
+    """
+    )
+
+    assert executed["errors"][0]["message"] == (
+        "You must provide `distanceFrom` to order by distance."
+    )
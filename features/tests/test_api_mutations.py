@@ -1,9 +1,14 @@
 from copy import deepcopy
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from graphql_relay import to_global_id
+
 from categories.tests.factories import CategoryFactory
 from features.enums import Visibility
 from features.models import Feature
-from features.tests.factories import TagFactory
+from features.schema import CreateFeatureMutation
+from features.tests.factories import FeatureFactory, TagFactory
 
 CREATE_FEATURE_MUTATION = """
 mutation createFeature($input: CreateFeatureMutationInput!) {
@@ -135,3 +140,252 @@ def test_test_create_feature_can_set_tags(api_client):
     feature = Feature.objects.first()
     assert tag_1 in feature.tags.all()
     assert tag_2 in feature.tags.all()
+
+
+CREATE_FEATURES_MUTATION = """
+mutation createFeatures($input: CreateFeaturesMutationInput!) {
+  createFeatures(input: $input) {
+    results {
+      feature {
+        properties {
+          translations {
+            languageCode
+            name
+          }
+          tags {
+            id
+          }
+          category {
+            id
+          }
+          contactInfo {
+            email
+          }
+        }
+      }
+      errors
+    }
+  }
+}
+"""
+
+
+def get_create_features_variables(*features):
+    return {
+        "input": {
+            "features": [
+                {**CREATE_FEATURE_VARIABLES["input"], **feature} for feature in features
+            ]
+        }
+    }
+
+
+def test_create_features(api_client):
+    category = CategoryFactory()
+    tag = TagFactory()
+    variables = get_create_features_variables(
+        {"categoryId": category.id, "tagIds": [tag.id]}, {}
+    )
+
+    executed = api_client.execute(CREATE_FEATURES_MUTATION, variable_values=variables)
+
+    results = executed["data"]["createFeatures"]["results"]
+    assert [result["errors"] for result in results] == [[], []]
+    properties = results[0]["feature"]["properties"]
+    assert properties["translations"] == [
+        {"languageCode": "FI", "name": "Feature name"}
+    ]
+    assert properties["tags"] == [{"id": tag.id}]
+    assert properties["category"] == {"id": category.id}
+    assert properties["contactInfo"] == {"email": "email@example.com"}
+    assert Feature.objects.filter(visibility=Visibility.DRAFT).count() == 2
+
+
+def test_create_features_returns_errors_of_invalid_features(api_client):
+    variables = get_create_features_variables(
+        {"categoryId": "unknown", "tagIds": ["unknown"]},
+        {
+            "translations": [
+                {"languageCode": "EN", "name": "Name"},
+                {"languageCode": "EN", "name": "Name"},
+            ]
+        },
+        {"contactInfo": {"email": "invalid"}},
+        {},
+    )
+
+    executed = api_client.execute(CREATE_FEATURES_MUTATION, variable_values=variables)
+
+    results = executed["data"]["createFeatures"]["results"]
+    assert [result["errors"] for result in results] == [
+        ['Category "unknown" does not exist', 'Tag "unknown" does not exist'],
+        [
+            'Default translation "fi" is missing',
+            'Translation "en" is given more than once',
+        ],
+        ["email: Enter a valid email address."],
+        [],
+    ]
+    assert [result["feature"] is not None for result in results] == [
+        False,
+        False,
+        False,
+        True,
+    ]
+    assert Feature.objects.count() == 1
+
+
+def test_create_features_validates_fields(api_client):
+    variables = get_create_features_variables(
+        {"categoryId": ""},
+        {
+            "translations": [
+                {"languageCode": "FI", "name": "Name", "url": "not a url"},
+                {"languageCode": "EN", "name": "x" * 201},
+            ]
+        },
+    )
+
+    executed = api_client.execute(CREATE_FEATURES_MUTATION, variable_values=variables)
+
+    results = executed["data"]["createFeatures"]["results"]
+    assert [result["errors"] for result in results] == [
+        [],
+        [
+            "url (fi): Enter a valid URL.",
+            "name (en): Ensure this value has at most 200 characters (it has 201).",
+        ],
+    ]
+    assert Feature.objects.get().category is None
+
+
+def test_number_of_queries_does_not_depend_on_features(api_client):
+    tags = [TagFactory() for _ in range(3)]
+    category = CategoryFactory()
+
+    def create_features(count):
+        variables = get_create_features_variables(
+            *[
+                {"categoryId": category.id, "tagIds": [tag.id for tag in tags]}
+                for _ in range(count)
+            ]
+        )
+        with CaptureQueriesContext(connection) as context:
+            api_client.execute(
+                """
+            mutation createFeatures($input: CreateFeaturesMutationInput!) {
+              createFeatures(input: $input) {
+                results {
+                  errors
+                }
+              }
+            }
+            """,
+                variable_values=variables,
+            )
+        return len(context.captured_queries)
+
+    # The source type is created by the first call
+    create_features(1)
+
+    assert create_features(1) == create_features(10)
+    assert Feature.objects.count() == 12
+
+
+CREATE_FEATURE_ID_MUTATION = """
+mutation createFeature($input: CreateFeatureMutationInput!) {
+  createFeature(input: $input) {
+    feature {
+      id
+    }
+  }
+}
+"""
+
+
+CREATE_FEATURES_ID_MUTATION = """
+mutation createFeatures($input: CreateFeaturesMutationInput!) {
+  createFeatures(input: $input) {
+    results {
+      feature {
+        id
+      }
+    }
+  }
+}
+"""
+
+
+def test_create_feature_retry_returns_created_feature(api_client):
+    variables = deepcopy(CREATE_FEATURE_VARIABLES)
+    variables["input"]["idempotencyKey"] = "5d1f3a9e"
+
+    first = api_client.execute(CREATE_FEATURE_ID_MUTATION, variable_values=variables)
+    retry = api_client.execute(CREATE_FEATURE_ID_MUTATION, variable_values=variables)
+
+    assert (
+        retry["data"]["createFeature"]["feature"]["id"]
+        == first["data"]["createFeature"]["feature"]["id"]
+    )
+    assert Feature.objects.count() == 1
+    assert Feature.objects.get().idempotency_key == "5d1f3a9e"
+
+
+def test_create_feature_without_idempotency_key_is_not_deduplicated(api_client):
+    api_client.execute(
+        CREATE_FEATURE_ID_MUTATION, variable_values=CREATE_FEATURE_VARIABLES
+    )
+    api_client.execute(
+        CREATE_FEATURE_ID_MUTATION, variable_values=CREATE_FEATURE_VARIABLES
+    )
+
+    assert Feature.objects.count() == 2
+
+
+def test_create_features_retry_returns_created_features(api_client):
+    variables = get_create_features_variables(
+        {"idempotencyKey": "first"}, {"idempotencyKey": "first"}, {}
+    )
+
+    first = api_client.execute(CREATE_FEATURES_ID_MUTATION, variable_values=variables)
+    variables["input"]["features"].insert(0, {**variables["input"]["features"][0]})
+    retry = api_client.execute(CREATE_FEATURES_ID_MUTATION, variable_values=variables)
+
+    # The duplicated key of the first request and the retried key of the second
+    # request return the same feature
+    first_results = first["data"]["createFeatures"]["results"]
+    retry_results = retry["data"]["createFeatures"]["results"]
+    assert first_results[0]["feature"] == first_results[1]["feature"]
+    assert retry_results[0]["feature"] == first_results[0]["feature"]
+    assert retry_results[3]["feature"] != first_results[2]["feature"]
+    assert Feature.objects.count() == 3
+
+
+def test_create_features_concurrent_retry_returns_created_features(api_client, mocker):
+    concurrent = FeatureFactory(
+        source_type=CreateFeatureMutation.get_source_type(), idempotency_key="first"
+    )
+    get_created_features = CreateFeatureMutation.get_created_features
+
+    def get_created_features_after_lookup(source_type, idempotency_keys):
+        # The concurrent retry commits after the created features are looked up
+        if lookup.call_count == 1:
+            return {}
+        return get_created_features(source_type, idempotency_keys)
+
+    lookup = mocker.patch.object(
+        CreateFeatureMutation,
+        "get_created_features",
+        side_effect=get_created_features_after_lookup,
+    )
+    variables = get_create_features_variables({"idempotencyKey": "first"}, {})
+
+    executed = api_client.execute(
+        CREATE_FEATURES_ID_MUTATION, variable_values=variables
+    )
+
+    results = executed["data"]["createFeatures"]["results"]
+    assert results[0]["feature"]["id"] == to_global_id("Feature", concurrent.pk)
+    assert results[1]["feature"] is not None
+    assert lookup.call_count == 2
+    assert Feature.objects.count() == 2
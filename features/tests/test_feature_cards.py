@@ -0,0 +1,163 @@
+from django.contrib.gis.geos import Point
+from graphql_relay import to_global_id
+
+from categories.tests.factories import CategoryFactory
+from features.cards import refresh_feature_cards
+from features.enums import OverrideFieldType, Visibility
+from features.models import FeatureCard
+from features.schema import Feature
+from features.tests.factories import (
+    FeatureFactory,
+    ImageFactory,
+    OverrideFactory,
+    TagFactory,
+)
+
+FEATURE_CARDS_QUERY = """
+query FeatureCards($language: Language) {
+  featureCards(first: 10, language: $language) {
+    edges {
+      node {
+        featureId
+        name
+        categoryId
+        categoryName
+        tagIds
+        imageUrl
+        coordinates
+      }
+    }
+  }
+}
+"""
+
+
+def test_feature_cards_are_refreshed():
+    category = CategoryFactory(name="Saaret")
+    feature = FeatureFactory(
+        name="Paikka", category=category, geometry=Point(24.9, 60.1)
+    )
+    feature.set_current_language("en")
+    feature.name = "Place"
+    feature.save()
+    feature.tags.add(TagFactory(id="ahti:tag:1"))
+    image = ImageFactory(feature=feature)
+    ImageFactory(feature=feature)
+
+    refresh_feature_cards([feature.pk])
+
+    cards = {card.language_code: card for card in feature.cards.all()}
+    assert set(cards) == {"fi", "sv", "en"}
+    assert cards["en"].name == "Place"
+    # Falls back to the default language
+    assert cards["sv"].name == "Paikka"
+    assert cards["fi"].category_name == "Saaret"
+    assert cards["fi"].tag_ids == ["ahti:tag:1"]
+    assert cards["fi"].image_url == image.url
+    assert cards["fi"].location.coords == (24.9, 60.1)
+
+
+def test_feature_card_name_is_overridden():
+    feature = FeatureFactory(name="Paikka")
+    OverrideFactory(
+        feature=feature, field=OverrideFieldType.NAME, string_value="Ohitettu"
+    )
+
+    refresh_feature_cards([feature.pk])
+
+    assert feature.cards.get(language_code="fi").name == "Ohitettu"
+
+
+def test_feature_card_name_is_overridden_without_translation(api_client):
+    feature = FeatureFactory(name="Paikka")
+    override = OverrideFactory(
+        feature=feature, field=OverrideFieldType.NAME, string_value="Ohitettu"
+    )
+    override.set_current_language("en")
+    override.string_value = "Overridden"
+    override.save()
+
+    refresh_feature_cards([feature.pk])
+
+    executed = api_client.execute(
+        FEATURE_CARDS_QUERY, variable_values={"language": "EN"}
+    )
+
+    node = executed["data"]["featureCards"]["edges"][0]["node"]
+    assert node["name"] == "Overridden"
+    # Falls back to the override in the default language
+    assert feature.cards.get(language_code="sv").name == "Ohitettu"
+
+
+def test_hidden_features_have_no_cards():
+    feature = FeatureFactory()
+    refresh_feature_cards([feature.pk])
+    feature.visibility = Visibility.HIDDEN
+    feature.save()
+
+    refresh_feature_cards([feature.pk])
+
+    assert not FeatureCard.objects.exists()
+
+
+def test_feature_cards_query(api_client, django_assert_max_num_queries):
+    features = FeatureFactory.create_batch(3, geometry=Point(24.9, 60.1))
+    refresh_feature_cards(feature.pk for feature in features)
+
+    # The page of cards, the cards are not counted
+    with django_assert_max_num_queries(1):
+        executed = api_client.execute(
+            FEATURE_CARDS_QUERY, variable_values={"language": "EN"}
+        )
+
+    nodes = [edge["node"] for edge in executed["data"]["featureCards"]["edges"]]
+    assert [node["featureId"] for node in nodes] == [
+        to_global_id(Feature._meta.name, feature.pk) for feature in features
+    ]
+    assert nodes[0]["name"] == features[0].name
+    assert nodes[0]["coordinates"] == [24.9, 60.1]
+
+
+FEATURE_CARDS_PAGE_QUERY = """
+query FeatureCards($after: String) {
+  featureCards(first: 2, after: $after) {
+    edges {
+      node {
+        featureId
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+
+def test_feature_cards_are_paginated(api_client):
+    features = FeatureFactory.create_batch(3)
+    refresh_feature_cards(feature.pk for feature in features)
+    feature_ids = [to_global_id(Feature._meta.name, feature.pk) for feature in features]
+
+    first_page = api_client.execute(FEATURE_CARDS_PAGE_QUERY)["data"]["featureCards"]
+    second_page = api_client.execute(
+        FEATURE_CARDS_PAGE_QUERY,
+        variable_values={"after": first_page["pageInfo"]["endCursor"]},
+    )["data"]["featureCards"]
+
+    def get_feature_ids(page):
+        return [edge["node"]["featureId"] for edge in page["edges"]]
+
+    assert get_feature_ids(first_page) == feature_ids[:2]
+    assert first_page["pageInfo"]["hasNextPage"]
+    assert get_feature_ids(second_page) == feature_ids[2:]
+    assert not second_page["pageInfo"]["hasNextPage"]
+
+
+def test_feature_cards_invalid_cursor(api_client):
+    executed = api_client.execute(
+        FEATURE_CARDS_PAGE_QUERY, variable_values={"after": "invalid"}
+    )
+
+    assert executed["errors"][0]["message"] == "Invalid cursor invalid."
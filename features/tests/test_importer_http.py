@@ -0,0 +1,146 @@
+import pytest
+import requests
+
+from features.importers import http
+
+URL = "https://api.example.com/places"
+
+
+@pytest.fixture
+def response_cache(settings, tmp_path):
+    settings.IMPORTER_HTTP_CACHE_DIR = str(tmp_path)
+    return http.ResponseCache(tmp_path)
+
+
+def test_request_without_cache(requests_mock):
+    requests_mock.get(URL, json={"data": 1}, headers={"ETag": '"v1"'})
+
+    response = http.request("GET", URL)
+
+    assert response.json() == {"data": 1}
+    assert not http.not_modified(response)
+
+
+def test_conditional_request(requests_mock, response_cache):
+    requests_mock.get(
+        URL, [{"json": {"data": 1}, "headers": {"ETag": '"v1"'}}, {"status_code": 304}]
+    )
+
+    first = http.request("GET", URL, params={"language": "fi"})
+    second = http.request("GET", URL, params={"language": "fi"})
+
+    assert not http.not_modified(first)
+    assert requests_mock.request_history[1].headers["If-None-Match"] == '"v1"'
+    assert http.not_modified(second)
+    assert second.json() == {"data": 1}
+
+
+def test_modified_response_replaces_cached(requests_mock, response_cache):
+    requests_mock.get(
+        URL,
+        [
+            {"json": {"data": 1}, "headers": {"Last-Modified": "Mon, 1 Jun 2020"}},
+            {"json": {"data": 2}, "headers": {"Last-Modified": "Tue, 2 Jun 2020"}},
+            {"status_code": 304},
+        ],
+    )
+
+    http.request("GET", URL)
+    modified = http.request("GET", URL)
+    not_modified = http.request("GET", URL)
+
+    history = requests_mock.request_history
+    assert history[1].headers["If-Modified-Since"] == "Mon, 1 Jun 2020"
+    assert history[2].headers["If-Modified-Since"] == "Tue, 2 Jun 2020"
+    assert not http.not_modified(modified)
+    assert not_modified.json() == {"data": 2}
+
+
+def test_deferred_responses_are_not_cached_on_error(requests_mock, response_cache):
+    requests_mock.get(URL, json={"data": 1}, headers={"ETag": '"v1"'})
+
+    with pytest.raises(ValueError):
+        with http.deferred_cache_writes():
+            http.request("GET", URL)
+            raise ValueError("Processing failed")
+    http.request("GET", URL)
+
+    assert "If-None-Match" not in requests_mock.request_history[1].headers
+
+
+def test_requests_are_cached_separately(requests_mock, response_cache):
+    requests_mock.post(URL, json={"data": 1}, headers={"ETag": '"v1"'})
+
+    http.request("POST", URL, json_data={"query": "a"})
+    http.request("POST", URL, json_data={"query": "b"})
+
+    assert "If-None-Match" not in requests_mock.request_history[1].headers
+
+
+def test_replay_cached_response(requests_mock, response_cache, settings):
+    requests_mock.get(URL, json={"data": 1})
+    http.request("GET", URL)
+    settings.IMPORTER_HTTP_CACHE_REPLAY = True
+
+    response = http.request("GET", URL)
+
+    assert requests_mock.call_count == 1
+    assert response.json() == {"data": 1}
+
+
+@pytest.fixture
+def sleep(mocker):
+    return mocker.patch("features.importers.http.time.sleep")
+
+
+def test_server_errors_are_retried(requests_mock, settings, sleep):
+    settings.IMPORTER_HTTP_RETRIES = 2
+    requests_mock.get(URL, [{"status_code": 503}, {"json": {"data": 1}}])
+
+    response = http.request("GET", URL)
+
+    assert response.json() == {"data": 1}
+    assert requests_mock.call_count == 2
+    assert sleep.call_count == 1
+
+
+def test_timeouts_are_retried(requests_mock, settings, sleep):
+    settings.IMPORTER_HTTP_RETRIES = 2
+    requests_mock.get(
+        URL, [{"exc": requests.exceptions.ConnectTimeout}, {"json": {"data": 1}}]
+    )
+
+    response = http.request("GET", URL)
+
+    assert response.json() == {"data": 1}
+
+
+def test_retries_are_limited(requests_mock, settings, sleep):
+    settings.IMPORTER_HTTP_RETRIES = 2
+    requests_mock.get(URL, status_code=500)
+
+    with pytest.raises(requests.HTTPError):
+        http.request("GET", URL)
+
+    assert requests_mock.call_count == 3
+    assert sleep.call_count == 2
+
+
+def test_client_errors_are_not_retried(requests_mock, settings, sleep):
+    settings.IMPORTER_HTTP_RETRIES = 2
+    requests_mock.get(URL, status_code=404)
+
+    with pytest.raises(requests.HTTPError):
+        http.request("GET", URL)
+
+    assert requests_mock.call_count == 1
+
+
+def test_backoff_grows_exponentially(settings, mocker):
+    settings.IMPORTER_HTTP_BACKOFF = 1.0
+    uniform = mocker.patch("features.importers.http.random.uniform", return_value=0)
+
+    http.get_backoff(0)
+    http.get_backoff(3)
+
+    uniform.assert_has_calls([mocker.call(0, 1.0), mocker.call(0, 8.0)])
@@ -1,6 +1,23 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from prometheus_client import REGISTRY
 
+from features.enums import ImportRunStatus, Visibility
+from features.importers.base import IMPORT_LOCK_NAMESPACE, ImportSkipped
+from features.importers.benchmark import (
+    ImporterBenchmark,
+    replays,
+    scale_myhelsinki_places,
+)
 from features.importers.registry import ImporterRegistry
+from features.models import Feature, FeatureCard, ImportRun
+from features.tests.factories import FeatureFactory, SourceTypeFactory
 
 
 def test_configured_importers_get_called(mocker):
@@ -40,3 +57,368 @@ def test_listing_importers_will_not_run_them(mocker):
 
     for import_method in mocked:
         assert not import_method.called
+
+
+def test_failing_importer_exits_with_error(mocker):
+    mocked = []
+    for identifier, cls in ImporterRegistry.registry.items():
+        mocked.append(
+            mocker.patch.object(
+                cls,
+                "import_features",
+                side_effect=Exception if identifier == "myhelsinki_places" else None,
+            )
+        )
+    err = StringIO()
+
+    with pytest.raises(SystemExit) as exc_info:
+        call_command("import_features", stderr=err)
+
+    assert exc_info.value.code == 1
+    assert "myhelsinki_places failed" in err.getvalue()
+    # The failure doesn't prevent the other importers from running
+    for import_method in mocked:
+        import_method.assert_called_once()
+
+
+def test_importers_are_run_in_parallel(transactional_db, mocker):
+    for cls in ImporterRegistry.registry.values():
+        mocker.patch.object(cls, "import_features")
+    out = StringIO()
+
+    call_command("import_features", parallel=2, stdout=out)
+
+    output = out.getvalue()
+    for identifier in ImporterRegistry.registry:
+        assert f"{identifier} imported in" in output
+    assert f"{len(ImporterRegistry.registry)} succeeded, 0 skipped, 0 failed" in output
+
+
+def test_scale_myhelsinki_places():
+    places = {"meta": {}, "data": [{"id": "1"}, {"id": "2"}]}
+
+    scaled = scale_myhelsinki_places(places, 3)
+
+    assert [place["id"] for place in scaled["data"]] == [
+        "1",
+        "2",
+        "1-1",
+        "2-1",
+        "1-2",
+        "2-2",
+    ]
+
+
+def test_benchmark_importers_reports_stages():
+    out = StringIO()
+
+    call_command("benchmark_importers", scale=2, stdout=out)
+
+    output = out.getvalue()
+    for identifier in replays:
+        assert identifier in output
+    for stage in ("fetch", "map", "write"):
+        assert stage in output
+    # Imported data is rolled back by default
+    assert Feature.objects.count() == 0
+
+
+def test_benchmark_measures_written_rows():
+    benchmark = ImporterBenchmark("venepaikka_harbors", scale=3, keep=True).run()
+
+    assert benchmark.record_count == 6
+    assert Feature.objects.count() == 6
+    assert set(benchmark.stages.keys()) == {"fetch", "map", "write"}
+    assert benchmark.stages["fetch"].queries.count == 0
+    assert benchmark.stages["write"].queries.rows_written > 6
+    assert benchmark.stages["write"].peak_memory > 0
+
+
+def test_import_metrics_are_recorded(mocker):
+    importer = ImporterRegistry.registry["venepaikka_harbors"]()
+    mocker.patch.object(importer, "import_features")
+    labels = {"importer": "test_metrics"}
+    before = REGISTRY.get_sample_value("ahti_importer_duration_seconds_count", labels)
+
+    importer.run("test_metrics")
+
+    assert (
+        REGISTRY.get_sample_value("ahti_importer_duration_seconds_count", labels)
+        == (before or 0) + 1
+    )
+    assert REGISTRY.get_sample_value("ahti_importer_failures_total", labels) is None
+
+
+def test_failed_import_metrics_are_recorded(mocker):
+    importer = ImporterRegistry.registry["venepaikka_harbors"]()
+    mocker.patch.object(
+        importer, "import_features", side_effect=RuntimeError("Source unavailable")
+    )
+    labels = {"importer": "test_failure_metrics"}
+
+    with pytest.raises(RuntimeError, match="Source unavailable"):
+        importer.run("test_failure_metrics")
+
+    assert REGISTRY.get_sample_value("ahti_importer_failures_total", labels) == 1
+    import_run = ImportRun.objects.get(importer="test_failure_metrics")
+    assert import_run.status == ImportRunStatus.FAILED
+    assert import_run.error == "RuntimeError('Source unavailable')"
+
+
+@pytest.fixture
+def other_session():
+    """A database session separate from the one used by the test."""
+    other_connection = connection.copy()
+    yield other_connection
+    other_connection.close()
+
+
+def hold_import_lock(session, source_type):
+    with session.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_lock(%s, %s)", [IMPORT_LOCK_NAMESPACE, source_type.pk]
+        )
+
+
+def test_import_is_skipped_when_another_import_is_running(mocker, other_session):
+    importer = ImporterRegistry.registry["venepaikka_harbors"]()
+    import_features = mocker.patch.object(importer, "import_features")
+    hold_import_lock(other_session, importer.get_source_type())
+
+    with pytest.raises(ImportSkipped):
+        importer.run("test_skipped")
+
+    assert not import_features.called
+    assert (
+        REGISTRY.get_sample_value(
+            "ahti_importer_skipped_total", {"importer": "test_skipped"}
+        )
+        == 1
+    )
+    assert ImportRun.objects.get(importer="test_skipped").status == (
+        ImportRunStatus.SKIPPED
+    )
+
+
+def test_import_waits_for_lock_until_timeout(mocker, other_session):
+    importer = ImporterRegistry.registry["venepaikka_harbors"](lock_timeout=0.5)
+    mocker.patch.object(importer, "import_features")
+    hold_import_lock(other_session, importer.get_source_type())
+    sleep = mocker.spy(time, "sleep")
+
+    with pytest.raises(ImportSkipped):
+        importer.run("test_lock_timeout")
+
+    assert sleep.called
+
+
+def test_import_lock_is_released(mocker, other_session):
+    importer = ImporterRegistry.registry["venepaikka_harbors"]()
+    mocker.patch.object(importer, "import_features")
+
+    importer.run("test_lock_released")
+
+    with other_session.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_lock(%s, %s)",
+            [IMPORT_LOCK_NAMESPACE, importer.get_source_type().pk],
+        )
+        assert cursor.fetchone()[0]
+
+
+def test_skipped_importers_are_reported(mocker):
+    for identifier, cls in ImporterRegistry.registry.items():
+        mocker.patch.object(
+            cls,
+            "run",
+            side_effect=ImportSkipped("Another import is in progress")
+            if identifier == "myhelsinki_places"
+            else None,
+        )
+    out = StringIO()
+
+    call_command("import_features", stdout=out)
+
+    output = out.getvalue()
+    assert "myhelsinki_places skipped: Another import is in progress" in output
+    assert "1 skipped, 0 failed" in output
+
+
+@pytest.fixture
+def importer_with_features(mocker):
+    """Importer which sees 9 visible features of its source type in an import.
+
+    The first 3 of the seen features are changed in the import.
+    """
+    importer = ImporterRegistry.registry["venepaikka_harbors"]()
+    source_type = importer.get_source_type()
+    importer.seen = FeatureFactory.create_batch(9, source_type=source_type)
+
+    def import_features():
+        Feature.objects.filter(pk__in=[f.pk for f in importer.seen]).update(
+            mapped_at=timezone.now()
+        )
+        importer.changed_feature_ids.update(f.pk for f in importer.seen[:3])
+
+    mocker.patch.object(importer, "import_features", side_effect=import_features)
+    return importer
+
+
+def test_stale_features_are_hidden(importer_with_features):
+    stale = FeatureFactory(source_type=importer_with_features.get_source_type())
+    other_source = FeatureFactory()
+
+    importer_with_features.run("test_stale")
+
+    stale.refresh_from_db()
+    other_source.refresh_from_db()
+    assert stale.visibility == Visibility.REMOVED
+    assert other_source.visibility == Visibility.VISIBLE
+    assert importer_with_features.counts["removed"] == 1
+
+
+def test_stale_features_are_deleted(importer_with_features, settings):
+    settings.IMPORTER_STALE_ACTION = "delete"
+    stale = FeatureFactory(source_type=importer_with_features.get_source_type())
+
+    importer_with_features.run("test_stale")
+
+    assert not Feature.objects.filter(pk=stale.pk).exists()
+    assert Feature.objects.count() == 9
+
+
+def test_stale_features_are_kept_above_threshold(importer_with_features):
+    source_type = importer_with_features.get_source_type()
+    FeatureFactory.create_batch(3, source_type=source_type)
+
+    importer_with_features.run("test_stale")
+
+    assert not Feature.objects.filter(visibility=Visibility.REMOVED).exists()
+
+
+def test_stale_features_are_kept_when_data_is_not_modified(importer_with_features):
+    importer_with_features.counts["not_modified"] = 1
+    FeatureFactory(source_type=importer_with_features.get_source_type())
+
+    importer_with_features.run("test_stale")
+
+    assert not Feature.objects.filter(visibility=Visibility.REMOVED).exists()
+
+
+def test_removed_features_are_restored_when_seen(importer_with_features):
+    # Seen but not changed in the import
+    removed = importer_with_features.seen[-1]
+    Feature.objects.filter(pk=removed.pk).update(visibility=Visibility.REMOVED)
+    hidden = importer_with_features.seen[1]
+    Feature.objects.filter(pk=hidden.pk).update(visibility=Visibility.HIDDEN)
+
+    importer_with_features.run("test_stale")
+
+    removed.refresh_from_db()
+    hidden.refresh_from_db()
+    assert removed.visibility == Visibility.VISIBLE
+    assert hidden.visibility == Visibility.HIDDEN
+    assert removed.cards.exists()
+
+
+@pytest.mark.parametrize("action", ["hide", "delete"])
+def test_hidden_features_are_kept_when_missing_from_source(
+    importer_with_features, settings, action
+):
+    settings.IMPORTER_STALE_ACTION = action
+    source_type = importer_with_features.get_source_type()
+    hidden = FeatureFactory(source_type=source_type, visibility=Visibility.HIDDEN)
+    draft = FeatureFactory(source_type=source_type, visibility=Visibility.DRAFT)
+
+    importer_with_features.run("test_stale")
+
+    hidden.refresh_from_db()
+    draft.refresh_from_db()
+    assert hidden.visibility == Visibility.HIDDEN
+    assert draft.visibility == Visibility.DRAFT
+
+    # The features appear in the source again
+    importer_with_features.seen += [hidden, draft]
+    importer_with_features.run("test_stale")
+
+    hidden.refresh_from_db()
+    draft.refresh_from_db()
+    assert hidden.visibility == Visibility.HIDDEN
+    assert draft.visibility == Visibility.DRAFT
+    assert importer_with_features.counts["removed"] == 0
+
+
+def test_invalid_stale_action_is_rejected(importer_with_features, settings):
+    settings.IMPORTER_STALE_ACTION = "remove"
+
+    with pytest.raises(ImproperlyConfigured, match="IMPORTER_STALE_ACTION"):
+        importer_with_features.run("test_stale")
+
+    importer_with_features.import_features.assert_not_called()
+
+
+def test_import_run_records_removed_features(importer_with_features):
+    FeatureFactory(source_type=importer_with_features.get_source_type())
+
+    importer_with_features.run("test_stale")
+
+    import_run = ImportRun.objects.get()
+    assert import_run.status == ImportRunStatus.SUCCEEDED
+    assert import_run.records_removed == 1
+    assert import_run.reconcile_duration > 0
+
+
+def test_feature_cards_are_refreshed_after_import(importer_with_features):
+    stale = FeatureFactory(source_type=importer_with_features.get_source_type())
+    unchanged = importer_with_features.seen[-1]
+    for feature in (stale, unchanged):
+        FeatureCard.objects.create(
+            feature=feature, language_code="fi", name="Old", location=feature.geometry
+        )
+
+    importer_with_features.run("test_stale")
+
+    changed_ids = {feature.pk for feature in importer_with_features.seen[:3]}
+    assert set(FeatureCard.objects.values_list("feature_id", flat=True)) == {
+        unchanged.pk,
+        *changed_ids,
+    }
+    # The cards of the features which were only seen are not rewritten
+    assert unchanged.cards.get().name == "Old"
+
+
+def test_import_runs_endpoint(admin_client):
+    ImportRun.objects.create(
+        importer="myhelsinki_places",
+        source_type=SourceTypeFactory(),
+        status=ImportRunStatus.INCOMPLETE,
+        error="1 of 2 API calls failed: all",
+        records_seen=10,
+        api_calls=[
+            {"label": "all", "duration": 1.5, "error": "HTTPError('https://...')"}
+        ],
+    )
+    ImportRun.objects.create(
+        importer="venepaikka_harbors", source_type=SourceTypeFactory()
+    )
+
+    response = admin_client.get("/import-runs", {"importer": "myhelsinki_places"})
+
+    assert response.status_code == 200
+    import_runs = response.json()["import_runs"]
+    assert len(import_runs) == 1
+    assert import_runs[0]["status"] == ImportRunStatus.INCOMPLETE
+    assert import_runs[0]["records_seen"] == 10
+    # The errors are not returned
+    assert "error" not in import_runs[0]
+    assert import_runs[0]["api_calls"] == [
+        {"label": "all", "duration": 1.5, "failed": True}
+    ]
+    assert admin_client.get("/import-runs", {"limit": "all"}).status_code == 400
+
+
+def test_import_runs_endpoint_requires_staff(client):
+    response = client.get("/import-runs")
+
+    assert response.status_code == 302
+    assert response.url.startswith("/admin/login/")
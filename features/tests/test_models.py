@@ -1,9 +1,14 @@
 import pytest
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from features.enums import OverrideFieldType
 from features.models import (
     ContactInfo,
     Feature,
     FeatureDetails,
+    FeatureTranslation,
     Image,
     License,
     Link,
@@ -49,6 +54,15 @@ def test_feature():
     assert Feature.objects.count() == 1
 
 
+def test_feature_geography_follows_geometry():
+    f = FeatureFactory(geometry=Point(24.93, 60.16))
+    f.geometry = Point(24.95, 60.17)
+    f.save(update_fields=["geometry"])
+
+    f.refresh_from_db()
+    assert f.geography.coords == (24.95, 60.17)
+
+
 def test_feature_ahti_id_field():
     f = FeatureFactory()
 
@@ -138,6 +152,101 @@ def test_override():
     assert Feature.objects.count() == 1
 
 
+def get_effective_names(feature):
+    return dict(
+        FeatureTranslation.objects.filter(master=feature).values_list(
+            "language_code", "effective_name"
+        )
+    )
+
+
+def test_feature_effective_name():
+    f = FeatureFactory(name="Original name")
+
+    assert get_effective_names(f) == {"fi": "Original name"}
+
+    f.set_current_language("en")
+    f.name = "Original name en"
+    f.save()
+
+    assert get_effective_names(f) == {"fi": "Original name", "en": "Original name en"}
+
+
+def test_feature_effective_name_override():
+    f = FeatureFactory(name="Original name")
+    f.set_current_language("en")
+    f.name = "Original name en"
+    f.save()
+
+    override = OverrideFactory(
+        feature=f, field=OverrideFieldType.NAME, string_value="Override name"
+    )
+
+    # The override in the default language applies to all the languages
+    assert get_effective_names(f) == {"fi": "Override name", "en": "Override name"}
+
+    override.set_current_language("en")
+    override.string_value = "Override name en"
+    override.save()
+
+    assert get_effective_names(f) == {"fi": "Override name", "en": "Override name en"}
+
+    override.delete()
+
+    assert get_effective_names(f) == {"fi": "Original name", "en": "Original name en"}
+
+
+def test_feature_effective_name_source_name_changed():
+    f = FeatureFactory(name="Original name")
+    OverrideFactory(feature=f, field=OverrideFieldType.NAME, string_value="")
+
+    f.name = "Changed name"
+    f.save()
+
+    # Empty overrides are not applied
+    assert get_effective_names(f) == {"fi": "Changed name"}
+
+
+def test_feature_create_or_update_translations():
+    f = FeatureFactory(name="Original name")
+    f.set_current_language("sv")
+    f.name = "Original name sv"
+    f.save()
+    OverrideFactory(feature=f, field=OverrideFieldType.NAME, string_value="Override")
+    # Fill the translation caches
+    assert f.safe_translation_getter("name", language_code="sv") == "Original name sv"
+
+    f.create_or_update_translations(
+        [
+            {"language_code": "fi", "name": "New name"},
+            {"language_code": "en", "name": "New name en"},
+            {"language_code": "de", "name": "Unsupported"},
+        ]
+    )
+
+    assert get_effective_names(f) == {"fi": "Override", "en": "Override"}
+    f = Feature.objects.get(pk=f.pk)
+    assert f.safe_translation_getter("name", language_code="en") == "New name en"
+    assert not f.has_translation("sv")
+
+
+def test_feature_create_or_update_translations_query_count():
+    f = FeatureFactory()
+    translations = [
+        {"language_code": language_code, "name": f"Name {language_code}"}
+        for language_code in ("fi", "sv", "en")
+    ]
+
+    with CaptureQueriesContext(connection) as single:
+        f.create_or_update_translations(translations[:1])
+    with CaptureQueriesContext(connection) as multiple:
+        f.create_or_update_translations(translations)
+
+    # The translations are written in bulk
+    assert len(multiple) == len(single)
+    assert set(get_effective_names(f)) == {"fi", "sv", "en"}
+
+
 def test_price_tag():
     PriceTagFactory()
 
@@ -0,0 +1,101 @@
+import datetime
+
+from psycopg2.extras import DateRange, NumericRange
+
+from features.enums import Weekday
+from features.models import OpeningHoursInterval
+from features.opening_hours import (
+    get_intervals,
+    get_minute_of_week,
+    refresh_opening_hours_intervals,
+)
+from features.tests.factories import OpeningHoursFactory, OpeningHoursPeriodFactory
+
+VALID_FROM = datetime.date(2020, 6, 1)
+VALID_TO = datetime.date(2020, 6, 30)
+
+
+def hours(day, opens=None, closes=None, all_day=False):
+    return OpeningHoursFactory.build(
+        day=day, opens=opens, closes=closes, all_day=all_day
+    )
+
+
+def test_intervals_of_a_day():
+    intervals = get_intervals(
+        VALID_FROM,
+        VALID_TO,
+        [
+            hours(Weekday.MONDAY, datetime.time(10), datetime.time(17)),
+            hours(Weekday.TUESDAY, all_day=True),
+        ],
+    )
+
+    validity = DateRange(VALID_FROM, datetime.date(2020, 7, 1), "[)")
+    assert intervals == [
+        (NumericRange(600, 1020), validity),
+        (NumericRange(1440, 2880), validity),
+    ]
+
+
+def test_intervals_past_midnight_are_split():
+    intervals = get_intervals(
+        VALID_FROM,
+        VALID_TO,
+        [hours(Weekday.SUNDAY, datetime.time(22), datetime.time(2))],
+    )
+
+    assert intervals == [
+        (
+            NumericRange(6 * 1440 + 22 * 60, 7 * 1440),
+            DateRange(VALID_FROM, datetime.date(2020, 7, 1), "[)"),
+        ),
+        # Monday morning after the days of the period
+        (
+            NumericRange(0, 120),
+            DateRange(datetime.date(2020, 6, 2), datetime.date(2020, 7, 2), "[)"),
+        ),
+    ]
+
+
+def test_intervals_closing_at_midnight():
+    intervals = get_intervals(
+        None, None, [hours(Weekday.MONDAY, datetime.time(20), datetime.time(0))]
+    )
+
+    assert intervals == [(NumericRange(1200, 1440), DateRange(None, None, "[)"))]
+
+
+def test_intervals_without_closing_time_are_ignored():
+    assert get_intervals(None, None, [hours(Weekday.MONDAY, datetime.time(8))]) == []
+
+
+def test_minute_of_week_is_in_local_time():
+    minute, date = get_minute_of_week(
+        datetime.datetime(2020, 6, 7, 21, 30, tzinfo=datetime.timezone.utc)
+    )
+
+    # Monday 00:30 in Helsinki
+    assert minute == 30
+    assert date == datetime.date(2020, 6, 8)
+
+
+def test_refresh_opening_hours_intervals():
+    period = OpeningHoursPeriodFactory()
+    OpeningHoursFactory(
+        period=period,
+        day=Weekday.MONDAY,
+        opens=datetime.time(10),
+        closes=datetime.time(17),
+    )
+    OpeningHoursInterval.objects.create(
+        feature=period.feature,
+        period=period,
+        minutes=NumericRange(0, 1),
+        validity=DateRange(None, None),
+    )
+
+    refresh_opening_hours_intervals([period.feature_id])
+
+    interval = OpeningHoursInterval.objects.get()
+    assert interval.minutes == NumericRange(600, 1020)
@@ -1,3 +1,58 @@
-from django.shortcuts import render  # noqa: F401
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 
-# Create your views here.
+from features.models import ImportRun
+
+# The errors are left out, since they can contain internal details such as
+# URLs and queries. They are shown in the admin.
+IMPORT_RUN_FIELDS = (
+    "importer",
+    "status",
+    "started_at",
+    "finished_at",
+    "duration",
+    "fetch_duration",
+    "map_duration",
+    "write_duration",
+    "reconcile_duration",
+    "records_seen",
+    "records_created",
+    "records_updated",
+    "records_unchanged",
+    "records_removed",
+    "http_bytes",
+    "sql_statements",
+    "api_calls",
+)
+
+MAX_IMPORT_RUNS = 500
+
+
+def get_api_call_summary(api_call: dict) -> dict:
+    return {
+        "label": api_call["label"],
+        "duration": api_call["duration"],
+        "failed": bool(api_call.get("error")),
+    }
+
+
+@staff_member_required
+def import_runs(request):
+    """Return the most recent import runs, newest first. Requires a staff user.
+
+    Query parameters:
+    - `importer`: only return the runs of the importer with the identifier
+    - `limit`: number of runs to return (default 50)
+    """
+    try:
+        limit = min(int(request.GET.get("limit", 50)), MAX_IMPORT_RUNS)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+
+    runs = ImportRun.objects.order_by("-started_at")
+    if request.GET.get("importer"):
+        runs = runs.filter(importer=request.GET["importer"])
+    runs = list(runs.values(*IMPORT_RUN_FIELDS)[: max(limit, 0)])
+    for run in runs:
+        run["api_calls"] = [get_api_call_summary(call) for call in run["api_calls"]]
+    return JsonResponse({"import_runs": runs})
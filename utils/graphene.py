@@ -1,8 +1,14 @@
+import threading
+from collections import OrderedDict
+
 import django.forms
 import django_filters
 import graphene
 from django.conf import settings
 from graphene_django.forms.converter import convert_form_field
+from graphql.backend import GraphQLBackend, GraphQLCoreBackend
+
+from utils import metrics
 
 LanguageEnum = graphene.Enum(
     "Language", [(lang[0].upper(), lang[0]) for lang in settings.LANGUAGES]
@@ -46,6 +52,21 @@ def _generate_list_filter_class(inner_type):
     return filter_class
 
 
+def generate_enum_filter_class(enum_type):
+    """Generate a ChoiceFilter class that resolves into the graphene `enum_type`.
+
+    The choices of the filter must be the values of the enum.
+    """
+    name = enum_type._meta.name
+    form_field = type(f"{name}FormField", (django.forms.ChoiceField,), {})
+    filter_class = type(
+        f"{name}Filter", (django_filters.ChoiceFilter,), {"field_class": form_field},
+    )
+    convert_form_field.register(form_field)(lambda x: enum_type(required=x.required))
+
+    return filter_class
+
+
 StringListFilter = _generate_list_filter_class(graphene.String)
 BooleanListFilter = _generate_list_filter_class(graphene.Boolean)
 FloatListFilter = _generate_list_filter_class(graphene.Float)
@@ -54,3 +75,44 @@ UUIDListFilter = _generate_list_filter_class(graphene.UUID)
 DateListFilter = _generate_list_filter_class(graphene.Date)
 DateTimeListFilter = _generate_list_filter_class(graphene.DateTime)
 TimeListFilter = _generate_list_filter_class(graphene.Time)
+
+
+class CachedDocumentBackend(GraphQLBackend):
+    """GraphQL backend which caches the parsed query documents.
+
+    Parsing is skipped for queries that have been seen before. The queries come
+    from the clients, so only the `max_size` most recently used documents are kept.
+    Documents with syntax errors are not cached.
+    """
+
+    cache_name = "graphql_documents"
+
+    def __init__(self, backend: GraphQLBackend = None, max_size: int = 500):
+        self.backend = backend or GraphQLCoreBackend()
+        self.max_size = max_size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def document_from_string(self, schema, request_string):
+        key = (schema, request_string)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+        metrics.observe_cache_request(self.cache_name, hit=document is not None)
+        if document is not None:
+            return document
+
+        document = self.backend.document_from_string(schema, request_string)
+        with self._lock:
+            self._documents[key] = document
+            if len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
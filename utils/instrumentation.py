@@ -0,0 +1,206 @@
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+from graphene_django.views import GraphQLView
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+OPERATION_NAME_PATTERN = re.compile(r"\b(?:query|mutation|subscription)\s+(\w+)")
+ANONYMOUS_OPERATION = "<anonymous>"
+
+
+class QueryRecorder:
+    """Record the SQL statements executed through a database connection.
+
+    Meant to be installed with `connection.execute_wrapper()`:
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            ...
+
+    Counts the executed statements, the time spent executing them and the number
+    of rows affected by data modifying statements.
+    """
+
+    write_statements = ("INSERT", "UPDATE", "DELETE")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.rows_written = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if sql.lstrip()[:6].upper() in self.write_statements:
+                self.rows_written += max(context["cursor"].rowcount, 0)
+
+
+def get_operation_name(query: str, operation_name: str = None) -> str:
+    """Return the name of the executed operation.
+
+    The name given with the request takes precedence over the name of the first
+    operation defined in the query.
+    """
+    if operation_name:
+        return operation_name
+    match = OPERATION_NAME_PATTERN.search(query or "")
+    return match.group(1) if match else ANONYMOUS_OPERATION
+
+
+class OperationRecord:
+    """Measurements of a single GraphQL operation."""
+
+    def __init__(self, name: str):
+        self.name = name
+        # Name under which the operation is aggregated
+        self.label = name
+        self.duration = 0.0
+        self.queries = QueryRecorder()
+        # Accumulated time spent in resolvers by "Type.field"
+        self.resolvers = defaultdict(float)
+
+    def slowest_resolvers(self, count: int = 5):
+        return sorted(self.resolvers.items(), key=lambda item: -item[1])[:count]
+
+
+class OperationStats:
+    """Aggregated measurements of the executed GraphQL operations by name.
+
+    Operation names come from the clients, so the number of distinct names is
+    capped. Operations beyond the cap are aggregated under `other`.
+    """
+
+    max_operations = 200
+    other = "<other>"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._aggregates = {}
+
+    @property
+    def current(self) -> Optional[OperationRecord]:
+        """The operation being executed in the current thread, if any."""
+        return getattr(self._local, "record", None)
+
+    @contextmanager
+    def record(self, name: str):
+        """Measure the operation executed within the block."""
+        record = OperationRecord(name)
+        self._local.record = record
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(record.queries):
+                yield record
+        finally:
+            record.duration = time.perf_counter() - start
+            self._local.record = None
+            self.add(record)
+            self.log_if_slow(record)
+
+    def add(self, record: OperationRecord):
+        with self._lock:
+            name = record.name
+            if name not in self._aggregates:
+                if len(self._aggregates) >= self.max_operations:
+                    name = record.label = self.other
+                self._aggregates.setdefault(
+                    name,
+                    {
+                        "count": 0,
+                        "duration_total": 0.0,
+                        "duration_max": 0.0,
+                        "sql_count_total": 0,
+                        "sql_count_max": 0,
+                        "sql_duration_total": 0.0,
+                    },
+                )
+            aggregate = self._aggregates[name]
+            aggregate["count"] += 1
+            aggregate["duration_total"] += record.duration
+            aggregate["duration_max"] = max(aggregate["duration_max"], record.duration)
+            aggregate["sql_count_total"] += record.queries.count
+            aggregate["sql_count_max"] = max(
+                aggregate["sql_count_max"], record.queries.count
+            )
+            aggregate["sql_duration_total"] += record.queries.duration
+
+    def log_if_slow(self, record: OperationRecord):
+        threshold = settings.GRAPHQL_SLOW_OPERATION_THRESHOLD
+        if threshold is None or record.duration < threshold:
+            return
+
+        resolvers = ", ".join(
+            f"{field}={duration:.3f}s" for field, duration in record.slowest_resolvers()
+        )
+        logger.warning(
+            f"Slow GraphQL operation {record.name}: {record.duration:.3f}s, "
+            f"{record.queries.count} SQL queries in {record.queries.duration:.3f}s, "
+            f"slowest resolvers: {resolvers}"
+        )
+
+    def snapshot(self) -> dict:
+        """Return a copy of the aggregated measurements by operation name."""
+        with self._lock:
+            return {name: dict(values) for name, values in self._aggregates.items()}
+
+    def reset(self):
+        with self._lock:
+            self._aggregates.clear()
+
+
+operation_stats = OperationStats()
+
+
+class ResolverTimingMiddleware:
+    """Record the time spent in resolvers for the operation being executed."""
+
+    def resolve(self, next, root, info, **args):
+        record = operation_stats.current
+        if record is None:
+            return next(root, info, **args)
+
+        start = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            record.resolvers[f"{info.parent_type.name}.{info.field_name}"] += (
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedGraphQLView(GraphQLView):
+    """GraphQL view which records measurements for each executed operation."""
+
+    def get_response(self, request, data, show_graphiql=False):
+        if show_graphiql:
+            return super().get_response(request, data, show_graphiql)
+
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        with operation_stats.record(
+            get_operation_name(query, operation_name)
+        ) as record:
+            result, status_code = super().get_response(request, data, show_graphiql)
+
+        metrics.observe_graphql_request(
+            record.label,
+            duration=record.duration,
+            response_size=len(result.encode("utf-8")) if result else 0,
+            db_queries=record.queries.count,
+            db_duration=record.queries.duration,
+        )
+        return result, status_code
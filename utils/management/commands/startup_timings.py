@@ -0,0 +1,94 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable
+
+from django.core.management.base import BaseCommand
+
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)$")
+
+# Code executed in a fresh interpreter for each startup target
+TARGETS = {
+    # A uwsgi worker loading the application and handling the first request
+    "wsgi": "import ahti.wsgi, ahti.urls",
+    # A management command run by cron
+    "import_features": (
+        "import django; django.setup(); "
+        "from django.core.management import load_command_class; "
+        "load_command_class('features', 'import_features')"
+    ),
+}
+
+
+def parse_import_times(lines: Iterable[str]) -> Dict[str, float]:
+    """Sum the self import times (in seconds) of `python -X importtime` output.
+
+    The times are summed by top level package, so that the time spent importing
+    e.g. `features.schema` and `features.models` is reported under `features`.
+    """
+    times = defaultdict(float)
+    for line in lines:
+        match = IMPORT_TIME_PATTERN.match(line.rstrip())
+        if match:
+            package = match.group(2).split(".")[0]
+            times[package] += int(match.group(1)) / 1e6
+    return dict(times)
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the startup time of a worker or a management command "
+        "and the time spent importing each app and package."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-t",
+            "--target",
+            choices=TARGETS.keys(),
+            default="wsgi",
+            help="Startup to measure",
+        )
+        parser.add_argument(
+            "-n",
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of the slowest packages to report",
+        )
+
+    def handle(self, *args, **options):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "ahti.settings"
+            ),
+            # The warm-up runs in the background and is not part of the startup
+            "WARM_UP_ON_START": "0",
+        }
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", TARGETS[options["target"]]],
+            env=env,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        duration = time.perf_counter() - start
+        if process.returncode:
+            self.stderr.write(process.stderr)
+            sys.exit(process.returncode)
+
+        times = parse_import_times(process.stderr.splitlines())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['target']}: started in {duration:.3f} s, "
+                f"{sum(times.values()):.3f} s spent importing"
+            )
+        )
+        self.stdout.write(f"{'package':<32}{'import (s)':>12}")
+        slowest = sorted(times.items(), key=lambda item: -item[1])
+        for package, package_time in slowest[: options["limit"]]:
+            self.stdout.write(f"{package:<32}{package_time:>12.3f}")
@@ -0,0 +1,137 @@
+"""Prometheus metrics of the API and the importers.
+
+When the application runs in several processes (uwsgi workers, importers run by
+cron), `prometheus_multiproc_dir` environment variable should point to a directory
+shared by the processes so that the metrics of all processes are exported.
+"""
+import os
+from typing import Mapping
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CollectorRegistry,
+    CONTENT_TYPE_LATEST,
+    Counter,
+    generate_latest,
+    Histogram,
+    multiprocess,
+    REGISTRY,
+)
+
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+IMPORT_DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+graphql_request_duration = Histogram(
+    "ahti_graphql_request_duration_seconds",
+    "Duration of GraphQL requests",
+    ["operation"],
+)
+graphql_response_size = Histogram(
+    "ahti_graphql_response_size_bytes",
+    "Size of GraphQL responses",
+    ["operation"],
+    buckets=SIZE_BUCKETS,
+)
+graphql_db_queries = Histogram(
+    "ahti_graphql_db_queries",
+    "Number of SQL queries executed by GraphQL requests",
+    ["operation"],
+    buckets=COUNT_BUCKETS,
+)
+graphql_db_duration = Histogram(
+    "ahti_graphql_db_duration_seconds",
+    "Time spent executing SQL queries by GraphQL requests",
+    ["operation"],
+)
+cache_requests = Counter(
+    "ahti_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+importer_duration = Histogram(
+    "ahti_importer_duration_seconds",
+    "Duration of feature imports",
+    ["importer"],
+    buckets=IMPORT_DURATION_BUCKETS,
+)
+importer_stage_duration = Histogram(
+    "ahti_importer_stage_duration_seconds",
+    "Duration of feature import stages (fetch, map, write)",
+    ["importer", "stage"],
+    buckets=IMPORT_DURATION_BUCKETS,
+)
+importer_api_call_duration = Histogram(
+    "ahti_importer_api_call_duration_seconds",
+    "Duration of fetching and processing an API call by importers",
+    ["importer", "call"],
+    buckets=IMPORT_DURATION_BUCKETS,
+)
+importer_records = Counter(
+    "ahti_importer_records_total", "Records processed by importers", ["importer"]
+)
+importer_rows_written = Counter(
+    "ahti_importer_rows_written_total",
+    "Database rows written by importers",
+    ["importer"],
+)
+importer_failures = Counter(
+    "ahti_importer_failures_total", "Failed feature imports", ["importer"]
+)
+importer_skipped = Counter(
+    "ahti_importer_skipped_total",
+    "Feature imports skipped because another import was running",
+    ["importer"],
+)
+
+
+def observe_graphql_request(
+    operation: str,
+    duration: float,
+    response_size: int,
+    db_queries: int,
+    db_duration: float,
+):
+    graphql_request_duration.labels(operation).observe(duration)
+    graphql_response_size.labels(operation).observe(response_size)
+    graphql_db_queries.labels(operation).observe(db_queries)
+    graphql_db_duration.labels(operation).observe(db_duration)
+
+
+def observe_cache_request(cache: str, hit: bool):
+    cache_requests.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_import(
+    importer: str,
+    duration: float,
+    stage_durations: Mapping[str, float],
+    records: int,
+    rows_written: int,
+    failed: bool = False,
+):
+    importer_duration.labels(importer).observe(duration)
+    for stage, stage_duration in stage_durations.items():
+        importer_stage_duration.labels(importer, stage).observe(stage_duration)
+    importer_records.labels(importer).inc(records)
+    importer_rows_written.labels(importer).inc(rows_written)
+    if failed:
+        importer_failures.labels(importer).inc()
+
+
+def observe_import_api_call(importer: str, call: str, duration: float):
+    importer_api_call_duration.labels(importer, call).observe(duration)
+
+
+def observe_import_skipped(importer: str):
+    importer_skipped.labels(importer).inc()
+
+
+def metrics(*args, **kwargs):
+    """Export the metrics in Prometheus text format."""
+    if "prometheus_multiproc_dir" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
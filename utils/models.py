@@ -1,7 +1,12 @@
+from collections import defaultdict
+from typing import List
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from graphql import GraphQLError
+from parler.cache import get_translation_cache_key
 from parler.managers import TranslatableQuerySet as ParlerTranslatableQuerySet
 from parler.models import TranslatableModel as ParlerTranslatableModel
 
@@ -31,6 +36,11 @@ class TranslatableModel(ParlerTranslatableModel):
 
     @transaction.atomic
     def create_or_update_translations(self, translations):
+        """Replace the translations with the given ones.
+
+        The existing translations are deleted with one query and the new ones are
+        created with another. Translations in unsupported languages are skipped.
+        """
         if settings.PARLER_DEFAULT_LANGUAGE_CODE not in [
             translation["language_code"] for translation in translations
         ]:
@@ -38,13 +48,38 @@ class TranslatableModel(ParlerTranslatableModel):
                 f'Default translation "{settings.PARLER_DEFAULT_LANGUAGE_CODE}" '
                 f"is missing"
             )
+        translation_model = self._parler_meta.root_model
+        new_translations = [
+            translation_model(master=self, **translation)
+            for translation in translations
+            if translation["language_code"] in settings.PARLER_SUPPORTED_LANGUAGE_CODES
+        ]
+        self.prepare_translations(new_translations)
+
         self.clear_translations()
-        for translation in translations:
-            language_code = translation.pop("language_code")
-            if language_code not in settings.PARLER_SUPPORTED_LANGUAGE_CODES:
-                continue
-            self.create_translation(language_code=language_code, **translation)
+        translation_model.objects.bulk_create(new_translations)
+        for translation in new_translations:
+            self._translations_cache[translation_model][
+                translation.language_code
+            ] = translation
+
+    def prepare_translations(self, translations: List):
+        """Set the derived fields of the translations before they are created.
+
+        The translations are created in bulk, without calling `save_translation`.
+        """
 
     def clear_translations(self):
-        for code in self.get_available_languages():
-            self.delete_translation(code)
+        translation_model = self._parler_meta.root_model
+        translation_model.objects.filter(master=self).delete()
+        cache.delete_many(
+            [
+                get_translation_cache_key(translation_model, self.pk, language_code)
+                for language_code in settings.PARLER_SUPPORTED_LANGUAGE_CODES
+            ]
+        )
+        self._translations_cache = defaultdict(dict)
+        try:
+            del self._prefetched_objects_cache[self._parler_meta.root_rel_name]
+        except (AttributeError, KeyError):
+            pass